@@ -1,70 +1,122 @@
 import re
 
-def extract_main_loop_region(text: str) -> str:
+# extract_main_loop_region / normalize_asm çıktısını değiştiren her değişiklikte artırılmalı.
+# Normalize cache'i (normalize_cache.py) bu sürümle anahtarlanır.
+# 2: işaretleri olmayan dosyalarda boş bölge yerine dosyanın tamamı kullanılır.
+# 3: birden fazla dosyalı teslimlerde n-gram'lar dosya sınırını aşmaz.
+NORMALIZER_VERSION = "3"
+
+MAIN_LOOP_START = '; Main loop here'
+MAIN_LOOP_END = '; Stack Pointer definition'
+
+
+def has_main_loop_markers(text: str) -> bool:
+    return MAIN_LOOP_START in text
+
+
+def iter_main_loop_lines(text: str):
     """
-    Tek bir .asm dosyasının içinden '; Main loop here' ile
-    '; Stack Pointer definition' arasını alır.
+    Main loop bölgesinin satırlarını sırayla üretir: '; Main loop here' ile
+    '; Stack Pointer definition' arası.
+
+    Dosyada başlangıç işareti yoksa (şablonu kullanmayan teslimler) bölge
+    boş kalmasın diye dosyanın bütün satırları üretilir.
     """
     lines = text.splitlines()
-    main_started = False
-    result = []
+    if not has_main_loop_markers(text):
+        yield from lines
+        return
 
+    main_started = False
     for line in lines:
-        if not main_started and '; Main loop here' in line:
+        if not main_started and MAIN_LOOP_START in line:
             main_started = True
             continue
 
         if main_started:
-            if '; Stack Pointer definition' in line:
+            if MAIN_LOOP_END in line:
                 break
-            result.append(line)
+            yield line
+
+
+def extract_main_loop_region(text: str) -> str:
+    """
+    Tek bir .asm dosyasının içinden '; Main loop here' ile
+    '; Stack Pointer definition' arasını alır.
+    İşaretler yoksa dosyanın tamamını döner.
+    """
+    return '\n'.join(iter_main_loop_lines(text))
 
-    return '\n'.join(result)
 
+# Label + opsiyonel komut (inner:, outer: gibi)
+_LABEL_RE = re.compile(r'^([A-Za-z_.$][\w.$]*)\s*:(.*)$')
 
-def normalize_asm(text: str):
+
+def match_label(line: str):
     """
-    Main loop bölgesini normalize eder:
+    Yorumu silinmiş satır label ile başlıyorsa (label, label'dan sonrası) döner,
+    yoksa None.
+    """
+    m = _LABEL_RE.match(line)
+    if m is None:
+        return None
+    return m.group(1), m.group(2).strip()
+
+# Register (R0..R15, sadece tam tokenlar) ve sayılar (16, #10, 0AH, #0AH, 0x1F vs.)
+# tek desende: ikisi hiçbir zaman çakışmaz ve yerlerine konan "R" / "IMM" kelime
+# sınırlarını korur, bu yüzden tek geçiş ardışık iki re.sub ile aynı sonucu verir.
+_OPERAND_RE = re.compile(r'\bR(?:1[0-5]|[0-9])\b|\b#?-?(?:0X[0-9A-F]+|[0-9]+|[0-9A-F]+H)\b')
+
+
+def _operand_repl(m):
+    return 'R' if m.group(0)[0] == 'R' else 'IMM'
+
+
+def tokenize_asm(text: str):
+    """
+    Main loop bölgesini tek geçişte normalize edip token dizisi olarak döner:
     - Yorumları siler
-    - Label'ları #BLOCK_START ile işaretler
+    - Label'ları ("#BLOCK_START",) satırı ile işaretler
     - Register'ları R yapar
     - Sayıları IMM yapar
+    - Boşluklara göre bölünmüş token'lar üretir (fazla boşluk kendiliğinden gider)
+
+    Dönüş: [("MOV.W", "IMM,R"), ("#BLOCK_START",), ...]
     """
-    lines = []
+    token_lines = []
+    append = token_lines.append
+    label_match = _LABEL_RE.match
+    operand_sub = _OPERAND_RE.sub
+
     for raw in text.splitlines():
         # Yorumları sil
-        line = raw.split(';', 1)[0]
-        line = line.strip()
+        line = raw.split(';', 1)[0].strip()
         if not line:
             continue
 
-        # Label + opsiyonel komut (inner:, outer: gibi)
-        m = re.match(r'^([A-Za-z_.$][\w.$]*)\s*:(.*)$', line)
+        m = label_match(line)
         if m:
             # Blok başlangıcı işareti
-            lines.append('#BLOCK_START')
-            rest = m.group(2).strip()
-            if not rest:
+            append(('#BLOCK_START',))
+            line = m.group(2).strip()
+            if not line:
                 continue
-            line = rest
-
-        # Büyük harfe çevir
-        line = line.upper()
 
-        # R0..R15 -> R (sadece tam tokenlar)
-        line = re.sub(r'\bR(1[0-5]|[0-9])\b', 'R', line)
+        tokens = tuple(operand_sub(_operand_repl, line.upper()).split())
+        if tokens:
+            append(tokens)
 
-        # Sayılar -> IMM (16, #10, 0AH, #0AH, 0x1F vs.)
-        line = re.sub(
-            r'\b#?-?(0X[0-9A-F]+|[0-9]+|[0-9A-F]+H)\b',
-            'IMM',
-            line
-        )
+    return token_lines
 
-        # Fazla boşlukları toparla
-        line = re.sub(r'\s+', ' ', line)
 
-        if line:
-            lines.append(line)
+def normalize_asm(text: str):
+    """
+    Main loop bölgesini normalize eder:
+    - Yorumları siler
+    - Label'ları #BLOCK_START ile işaretler
+    - Register'ları R yapar
+    - Sayıları IMM yapar
 
-    return lines
+    tokenize_asm çıktısının satırlarını tek boşlukla birleştirir.
+    """
+    return [' '.join(tokens) for tokens in tokenize_asm(text)]
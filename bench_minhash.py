@@ -0,0 +1,33 @@
+import argparse
+
+from minhash_engine import minhash_recall
+from student_io import load_all_students, get_fingerprints
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="MinHash/LSH engine'inin recall ve hızını tam Jaccard yoluyla karşılaştırır."
+    )
+    parser.add_argument("root_dir", help="Öğrenci klasörlerinin bulunduğu klasör")
+    parser.add_argument("--threshold", type=float, default=80.0, help="Eşik (yüzde)")
+    parser.add_argument("--k", type=int, default=3, help="Opcode n-gram uzunluğu")
+    parser.add_argument("--bands", type=int, nargs="+", default=[8, 16, 32], help="Denenecek bant sayıları")
+    parser.add_argument("--rows", type=int, nargs="+", default=[2, 4], help="Denenecek bant başına satır sayıları")
+    args = parser.parse_args()
+
+    students = load_all_students(args.root_dir, k=args.k)
+    fingerprints = get_fingerprints(students, sorted(students), k=args.k)
+    print(f"Öğrenci sayısı: {len(fingerprints)}  threshold: %{args.threshold:.1f}  k={args.k}")
+    print(f"{'bands':>5} {'rows':>4} {'exact':>7} {'found':>7} {'recall':>7} {'exact_s':>8} {'minhash_s':>9}")
+
+    for bands in args.bands:
+        for rows in args.rows:
+            r = minhash_recall(fingerprints, args.threshold, bands=bands, rows=rows)
+            print(
+                f"{bands:>5} {rows:>4} {r['exact_pairs']:>7} {r['minhash_pairs']:>7} "
+                f"{r['recall']:>7.3f} {r['exact_seconds']:>8.2f} {r['minhash_seconds']:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from html_report import generate_html_report
+from student_io import ENGINES, compute_pair_store, load_all_students, save_results
+from synthetic_cohort import generate_cohort
+
+
+# Baseline'a göre bu orandan fazla yavaşlayan aşama regresyon sayılır
+DEFAULT_TOLERANCE = 0.25
+
+
+def measure(func, track_memory=True):
+    """
+    func()'u çalıştırır. Dönüş: (sonuç, saniye, tepe bellek MB ya da None)
+
+    Süre tracemalloc kapalıyken ölçülür; bellek için fonksiyon
+    tracemalloc açıkken ikinci kez çalıştırılır.
+    """
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+
+    peak_mb = None
+    if track_memory:
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peak_mb = peak / (1024 * 1024)
+
+    return result, seconds, peak_mb
+
+
+def planted_recall(store, planted):
+    """Sentetik kopya çiftlerinden kaçının eşik üstünde bulunduğu (0..1)."""
+    if not planted:
+        return None
+    found = {frozenset((a, b)) for a, b, _ in store.iter_named_pairs()}
+    hits = sum(1 for item in planted if frozenset((item["copier"], item["source"])) in found)
+    return hits / len(planted)
+
+
+def run_one(root_dir: str, out_dir: str, size: int, engine: str, threshold: float, k: int,
+            report_mode: str, workers: int, planted=None, track_memory=True):
+    stages = {}
+
+    def record(stage, seconds, peak_mb):
+        stages[stage] = {"seconds": round(seconds, 4), "peak_mb": None if peak_mb is None else round(peak_mb, 2)}
+
+    students, seconds, peak = measure(lambda: load_all_students(root_dir, k=k), track_memory)
+    record("load", seconds, peak)
+
+    store, seconds, peak = measure(
+        lambda: compute_pair_store(students, threshold, k=k, engine=engine, workers=workers), track_memory
+    )
+    record("score", seconds, peak)
+    score_seconds = seconds
+
+    text_path = os.path.join(out_dir, f"results_{size}_{engine}.txt")
+    html_path = os.path.join(out_dir, f"report_{size}_{engine}.html")
+    _, seconds, peak = measure(lambda: save_results(store, text_path, threshold), track_memory)
+    record("text_report", seconds, peak)
+    _, seconds, peak = measure(
+        lambda: generate_html_report(students, store, html_path, threshold, k, mode=report_mode), track_memory
+    )
+    record("html_report", seconds, peak)
+
+    n = len(students)
+    total_pairs = n * (n - 1) // 2
+    return {
+        "size": size,
+        "engine": engine,
+        "students": n,
+        "flagged_pairs": len(store),
+        "total_pairs": total_pairs,
+        "pairs_per_second": round(total_pairs / score_seconds, 1) if score_seconds > 0 else None,
+        "planted_recall": planted_recall(store, planted),
+        "stages": stages,
+    }
+
+
+def compare_with_baseline(runs, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Dönüş: regresyon mesajları listesi (boşsa regresyon yok)."""
+    old = {(r["size"], r["engine"]): r for r in baseline.get("runs", [])}
+    problems = []
+    for run in runs:
+        prev = old.get((run["size"], run["engine"]))
+        if prev is None:
+            continue
+        for stage, values in run["stages"].items():
+            prev_seconds = prev["stages"].get(stage, {}).get("seconds")
+            if not prev_seconds:
+                continue
+            if values["seconds"] > prev_seconds * (1 + tolerance):
+                problems.append(
+                    f"size={run['size']} engine={run['engine']} {stage}: "
+                    f"{prev_seconds:.3f}s -> {values['seconds']:.3f}s"
+                )
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Sentetik MSP430 sınıfları üzerinde yükleme, skorlama ve rapor aşamalarını ölçer."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500], help="Sınıf büyüklükleri")
+    parser.add_argument("--engines", nargs="+", default=["exact", "prefix"], choices=ENGINES)
+    parser.add_argument("--threshold", type=float, default=80.0)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--copy-rate", type=float, default=0.2, help="Kopya öğrenci oranı")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--report-mode", default="lazy", choices=["inline", "lazy"])
+    parser.add_argument("--no-memory", action="store_true", help="tracemalloc ile bellek ölçme")
+    parser.add_argument("--output", default="benchmark_results.json", help="Sonuç JSON dosyası")
+    parser.add_argument("--baseline", help="Karşılaştırılacak eski sonuç JSON dosyası")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--keep-dir", help="Sentetik sınıfları silmeden bu klasörde tut")
+    args = parser.parse_args()
+
+    work_dir = args.keep_dir or tempfile.mkdtemp(prefix="asm_bench_")
+    runs = []
+    try:
+        for size in args.sizes:
+            cohort_dir = os.path.join(work_dir, f"cohort_{size}")
+            truth_path = os.path.join(cohort_dir, "ground_truth.json")
+            if os.path.exists(truth_path):
+                with open(truth_path, "r", encoding="utf-8") as f:
+                    planted = json.load(f)
+            else:
+                planted = generate_cohort(cohort_dir, size, copy_rate=args.copy_rate, seed=args.seed)
+            out_dir = os.path.join(work_dir, f"out_{size}")
+            os.makedirs(out_dir, exist_ok=True)
+
+            for engine in args.engines:
+                run = run_one(
+                    cohort_dir, out_dir, size, engine, args.threshold, args.k,
+                    args.report_mode, args.workers, planted=planted, track_memory=not args.no_memory,
+                )
+                runs.append(run)
+                stage_text = "  ".join(f"{name}={v['seconds']:.3f}s" for name, v in run["stages"].items())
+                print(f"[{size:>5} / {engine:<7}] {stage_text}  pairs/s={run['pairs_per_second']}", file=sys.stderr)
+    finally:
+        if not args.keep_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    result = {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "threshold": args.threshold,
+            "k": args.k,
+            "copy_rate": args.copy_rate,
+            "seed": args.seed,
+            "workers": args.workers,
+            "report_mode": args.report_mode,
+        },
+        "runs": runs,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"Benchmark sonuçları kaydedildi: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        problems = compare_with_baseline(runs, baseline, args.tolerance)
+        if problems:
+            print("Regresyon bulundu:")
+            for line in problems:
+                print("  " + line)
+            sys.exit(1)
+        print("Baseline'a göre regresyon yok.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+from array import array
+from collections import defaultdict
+
+from pair_store import PairStore
+
+
+class UnionFind:
+    """Yol yarılama + boyuta göre birleştirme; m kenar için ~O(m α(n))."""
+
+    def __init__(self, n: int):
+        self.parent = array("i", range(n))
+        self.size = array("i", [1]) * n
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> int:
+        ra = self.find(a)
+        rb = self.find(b)
+        if ra == rb:
+            return ra
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        return ra
+
+
+class Cluster:
+    """
+    Eşik üstü benzerlik grafiğinin bir bağlı bileşeni (en az iki öğrenci).
+
+    - members:  öğrenci adları (kaynak önce, sonra alfabetik)
+    - source:   muhtemel kaynak; küme içi benzerlik toplamı en yüksek öğrenci
+    - pairs:    [(a, b, sim_percent), ...] küme içi eşik üstü çiftler, azalan benzerlik
+    - density:  kenar sayısı / olası çift sayısı (1.0 => herkes herkese benziyor)
+    - mean_similarity / max_similarity: küme içi çiftlerin ortalama / en yüksek skoru
+    """
+
+    __slots__ = ("members", "source", "pairs", "density", "mean_similarity", "max_similarity")
+
+    def __init__(self, members, pairs):
+        strength = defaultdict(float)
+        for a, b, sim_percent in pairs:
+            strength[a] += sim_percent
+            strength[b] += sim_percent
+
+        self.source = max(sorted(members), key=lambda name: strength[name])
+        self.members = [self.source] + sorted(name for name in members if name != self.source)
+        self.pairs = sorted(pairs, key=lambda item: (-item[2], item[0], item[1]))
+
+        size = len(members)
+        self.density = len(pairs) / (size * (size - 1) / 2)
+        self.mean_similarity = sum(sim for _, _, sim in pairs) / len(pairs)
+        self.max_similarity = self.pairs[0][2]
+
+    @property
+    def size(self):
+        return len(self.members)
+
+    def __repr__(self):
+        return (f"Cluster(size={self.size}, source={self.source!r}, "
+                f"density={self.density:.2f}, mean={self.mean_similarity:.1f})")
+
+
+def cluster_pairs(names, pairs):
+    """
+    (i, j, sim_percent) kenarlarından union-find ile bağlı bileşenleri kurar.
+
+    Dönüş: Cluster listesi; büyükten küçüğe, eşit boyutta ortalama benzerliği
+    yüksek olan önce. Hiç eşleşmesi olmayan öğrenciler kümeye girmez.
+    """
+    edges = list(pairs)
+    uf = UnionFind(len(names))
+    for i, j, _ in edges:
+        uf.union(i, j)
+
+    members = defaultdict(set)
+    cluster_edges = defaultdict(list)
+    for i, j, sim_percent in edges:
+        root = uf.find(i)
+        members[root].update((names[i], names[j]))
+        cluster_edges[root].append((names[i], names[j], sim_percent))
+
+    clusters = [Cluster(members[root], cluster_edges[root]) for root in members]
+    clusters.sort(key=lambda c: (-c.size, -c.mean_similarity, c.source))
+    return clusters
+
+
+def clusters_from_results(results):
+    """
+    PairStore ya da sonuç sözlüğünden (compute_pairwise_similarities, top-K,
+    incremental) kümeleri çıkarır. Sözlükte bir çift iki yönde farklı skorla
+    geçiyorsa büyük olan alınır.
+    """
+    if isinstance(results, PairStore):
+        return cluster_pairs(results.names, results.iter_pairs())
+
+    names = sorted(set(results) | {other for matches in results.values() for other, _ in matches})
+    position = {name: idx for idx, name in enumerate(names)}
+    best = {}
+    for student, matches in results.items():
+        for other, sim_percent in matches:
+            if other == student:
+                continue
+            i, j = sorted((position[student], position[other]))
+            if sim_percent > best.get((i, j), -1.0):
+                best[(i, j)] = sim_percent
+    return cluster_pairs(names, ((i, j, sim) for (i, j), sim in sorted(best.items())))
+
+
+def write_cluster_report(clusters, output_path: str, threshold_percent: float):
+    """
+    save_results'un kümelere göre düzenlenmiş hali: önce kümelerin özeti,
+    sonra her kümenin çiftleri (her çift bir kez, küme içinde azalan benzerlik).
+    Dönüş: en az bir küme varsa True
+    """
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(f"Plagiarism results (threshold = {threshold_percent:.1f}%)\n")
+        f.write("=====================================================\n\n")
+
+        if not clusters:
+            f.write("No pairs above the threshold were found.\n")
+            return False
+
+        involved = sum(cluster.size for cluster in clusters)
+        f.write(f"Summary: {len(clusters)} cluster(s), {involved} student(s) involved\n")
+        f.write("--------------------------------------------------------\n")
+        for number, cluster in enumerate(clusters, start=1):
+            possible = cluster.size * (cluster.size - 1) // 2
+            f.write(
+                f"Cluster {number}: {cluster.size} students, {len(cluster.pairs)}/{possible} pairs "
+                f"(density {cluster.density:.2f}), mean {cluster.mean_similarity:.1f}%, "
+                f"max {cluster.max_similarity:.1f}%\n"
+            )
+            f.write(f"  Likely source: {cluster.source}\n")
+            f.write(f"  Members: {', '.join(cluster.members)}\n")
+
+        f.write("\n\n")
+        f.write("Detailed similar pairs by cluster (each pair listed only once)\n")
+        f.write("--------------------------------------------------------\n\n")
+        for number, cluster in enumerate(clusters, start=1):
+            f.write(f"Cluster {number} ({cluster.size} students, density {cluster.density:.2f})\n")
+            f.write(f"  Source: {cluster.source}\n")
+            for a, b, sim_percent in cluster.pairs:
+                f.write(f"  {a} <-> {b}   ({sim_percent:.1f}%)\n")
+            f.write("\n")
+    return True
@@ -0,0 +1,354 @@
+import argparse
+import mmap
+import os
+import sqlite3
+import sys
+import time
+from array import array
+from collections import defaultdict
+
+from asm_processing import NORMALIZER_VERSION
+from normalize_cache import CACHE_FORMAT
+from opcode_table import MAX_PACKED_K, StoredOpcodeIds
+from student_io import load_all_students, get_fingerprints
+
+
+FINGERPRINT_FILE = "fingerprints.bin"
+METADATA_FILE = "corpus.sqlite"
+
+# Dosya biçimi; paketlenmiş n-gram'lar makinenin bayt sırasıyla (array('Q')) yazılır
+STORE_FORMAT = "1"
+
+# Arşivde bir teslim için saklanan n-gram'ların biçimi (opcode ID + paketleme);
+# farklı biçimdeki kayıtlar karşılaştırmaya alınmaz
+FINGERPRINT_VERSION = f"{NORMALIZER_VERSION}/{CACHE_FORMAT}"
+
+
+class CorpusEntry:
+    """Arşivdeki bir teslimin metadata satırı; n-gram'lar CorpusStore.ngrams ile okunur."""
+
+    __slots__ = ("entry_id", "term", "student", "path", "sha256", "k", "offset", "count", "n_opcodes")
+
+    def __init__(self, entry_id, term, student, path, sha256, k, offset, count, n_opcodes):
+        self.entry_id = entry_id
+        self.term = term
+        self.student = student
+        self.path = path
+        self.sha256 = sha256
+        self.k = k
+        self.offset = offset
+        self.count = count
+        self.n_opcodes = n_opcodes
+
+    @property
+    def label(self):
+        return f"{self.term}/{self.student}"
+
+
+class CorpusStore:
+    """
+    Geçmiş dönemlerin teslimleri için kalıcı, sadece sona eklenen fingerprint arşivi.
+
+    corpus_dir altında:
+        fingerprints.bin -> her teslimin sıralı, paketlenmiş n-gram'ları (uint64)
+                            art arda; dosya mmap ile açılır, okumak kopyalamaz
+        corpus.sqlite    -> metadata: dönem, öğrenci, yol, içerik hash'i, k,
+                            fingerprints.bin içindeki konum / uzunluk ve
+                            bilinmeyen mnemonic'lerin arşivdeki ID'leri
+
+    Bilinmeyen mnemonic ID'leri çalıştırmaya özgü olduğundan n-gram'lar
+    arşivin kendi ID tablosuyla yazılır; süreç tablosuyla çakışan ID'ler
+    okurken / yazarken çevrilir (bkz. opcode_table.StoredOpcodeIds). Çeviri
+    gerekirken n-gram'ları hash'li (k > 4) kayıtlar karşılaştırmaya alınmaz.
+
+    Bir dönem bir kere add_students ile eklenir; sonraki çalıştırmalarda eski
+    .asm dosyaları okunmaz ve normalize edilmez. Önce veri yazılıp diske
+    alınır, sonra metadata commit edilir; yarıda kalan ekleme metadata'da
+    görünmez.
+    """
+
+    def __init__(self, corpus_dir: str):
+        os.makedirs(corpus_dir, exist_ok=True)
+        self.corpus_dir = corpus_dir
+        self.data_path = os.path.join(corpus_dir, FINGERPRINT_FILE)
+        self._conn = sqlite3.connect(os.path.join(corpus_dir, METADATA_FILE))
+        self._conn.execute("CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                entry_id    INTEGER PRIMARY KEY,
+                term        TEXT NOT NULL,
+                student     TEXT NOT NULL,
+                path        TEXT NOT NULL,
+                sha256      TEXT NOT NULL,
+                k           INTEGER NOT NULL,
+                fp_version  TEXT NOT NULL,
+                offset      INTEGER NOT NULL,
+                count       INTEGER NOT NULL,
+                n_opcodes   INTEGER NOT NULL,
+                added       REAL NOT NULL,
+                UNIQUE (term, student, k)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS mnemonics (name TEXT PRIMARY KEY, opcode_id INTEGER NOT NULL UNIQUE)"
+        )
+        self._check_info("format", STORE_FORMAT)
+        self._check_info("byteorder", sys.byteorder)
+        self._conn.commit()
+        self.opcode_ids = StoredOpcodeIds(
+            self._conn.execute("SELECT name, opcode_id FROM mnemonics ORDER BY opcode_id")
+        )
+
+        if not os.path.exists(self.data_path):
+            open(self.data_path, "wb").close()
+        self._file = None
+        self._mmap = None
+        self._raw_view = None
+        self._view = None
+        self._open_view()
+
+    def _check_info(self, key, value):
+        row = self._conn.execute("SELECT value FROM info WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._conn.execute("INSERT INTO info VALUES (?, ?)", (key, value))
+        elif row[0] != value:
+            raise ValueError(f"Arşiv uyumsuz ({key}: {row[0]!r} != {value!r}): {self.corpus_dir}")
+
+    def _open_view(self):
+        self._close_view()
+        self._file = open(self.data_path, "rb")
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._view = memoryview(b"").cast("Q")
+            return
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._raw_view = memoryview(self._mmap)
+        self._view = self._raw_view.cast("Q")
+
+    def _close_view(self):
+        # ngrams() dilimleri hâlâ tutuluyorsa mmap kapatılamaz (BufferError)
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._raw_view is not None:
+            self._raw_view.release()
+            self._raw_view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self._close_view()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def terms(self):
+        return [row[0] for row in self._conn.execute("SELECT DISTINCT term FROM entries ORDER BY term")]
+
+    def entries(self, k=None, terms=None):
+        """
+        Arşiv kayıtları (CorpusEntry), entry_id sırasında. Sadece güncel
+        fingerprint biçimindeki kayıtlar döner; k / terms verilirse onlarla süzülür.
+        """
+        query = ("SELECT entry_id, term, student, path, sha256, k, offset, count, n_opcodes "
+                 "FROM entries WHERE fp_version = ?")
+        params = [FINGERPRINT_VERSION]
+        if k is not None:
+            query += " AND k = ?"
+            params.append(k)
+        if not self.opcode_ids.identity:
+            query += " AND k <= ?"
+            params.append(MAX_PACKED_K)
+        if terms:
+            query += f" AND term IN ({', '.join('?' * len(terms))})"
+            params.extend(terms)
+        query += " ORDER BY entry_id"
+        return [CorpusEntry(*row) for row in self._conn.execute(query, params)]
+
+    def ngrams(self, entry: CorpusEntry):
+        """
+        Kaydın sıralı paketlenmiş n-gram'ları; mmap üzerinde kopyasız bir görünüm.
+        Arşivin ID'leri süreçtekilerden farklıysa çevrilmiş bir kopya döner.
+        """
+        view = self._view[entry.offset:entry.offset + entry.count]
+        if self.opcode_ids.identity:
+            return view
+        return array("Q", sorted(self.opcode_ids.process_ngrams(view, entry.k)))
+
+    def add_students(self, term: str, students: dict, k=3):
+        """
+        Yüklenmiş bir sınıfı (load_all_students çıktısı) term adıyla arşive ekler.
+        Arşivde aynı (term, öğrenci, k) zaten varsa o öğrenci atlanır.
+        Dönüş: eklenen kayıt sayısı.
+        """
+        existing = {
+            row[0] for row in self._conn.execute(
+                "SELECT student FROM entries WHERE term = ? AND k = ?", (term, k)
+            )
+        }
+        names = [name for name in sorted(students) if name not in existing]
+        if not names:
+            return 0
+
+        fingerprints = get_fingerprints(students, names, k=k)
+        added = []
+        for fp in fingerprints:
+            added.extend(self.opcode_ids.register(fp.opcodes))
+        if added:
+            # Tablo sadece sona eklenir; hiçbir kaydın kullanmadığı satırlar zararsızdır
+            self._conn.executemany("INSERT INTO mnemonics VALUES (?, ?)", added)
+            self._conn.commit()
+        if not self.opcode_ids.identity and k > MAX_PACKED_K:
+            raise ValueError(f"k={k} n-gram'ları hash'li, arşivin mnemonic ID'lerine çevrilemiyor: {self.corpus_dir}")
+
+        rows = []
+        with open(self.data_path, "ab") as f:
+            offset = f.tell() // 8
+            for name, fp in zip(names, fingerprints):
+                grams = array("Q", sorted(self.opcode_ids.store_ngrams(fp.ngrams, k)))
+                f.write(grams.tobytes())
+                submission = students[name]
+                rows.append((
+                    term, name, submission.path, submission.sha256, k, FINGERPRINT_VERSION,
+                    offset, len(grams), fp.n_opcodes, time.time(),
+                ))
+                offset += len(grams)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._conn.executemany(
+            "INSERT INTO entries (term, student, path, sha256, k, fp_version, offset, count, n_opcodes, added) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        self._conn.commit()
+        self._open_view()
+        return len(rows)
+
+
+def build_term(corpus_dir: str, term: str, root_dir: str, k=3, cache_dir=None):
+    """root_dir'deki sınıfı yükleyip term adıyla arşive ekler. Dönüş: eklenen kayıt sayısı."""
+    students = load_all_students(root_dir, k=k, cache_dir=cache_dir)
+    with CorpusStore(corpus_dir) as store:
+        return store.add_students(term, students, k=k)
+
+
+def archive_pairs(fingerprints, store: CorpusStore, threshold_percent: float, k=3, terms=None, stats=None):
+    """
+    Yeni sınıfın fingerprint'lerini arşivdeki her kayıtla karşılaştırır:
+    (i, CorpusEntry, sim_percent) üreteci, arşiv sırasında.
+
+    Yeni sınıfın n-gram'larından inverted index kurulur, arşiv kayıtları mmap
+    üzerinden sırayla taranır; arşiv için küme kurulmaz. Jaccard tamdır:
+    |A ∩ B| posting'lerden, |A| ve |B| boyutlardan gelir.
+    stats verilirse "entries" ve "seconds" yazılır.
+    """
+    start = time.perf_counter()
+    postings = defaultdict(list)
+    for idx, fp in enumerate(fingerprints):
+        for gram in fp.ngrams:
+            postings[gram].append(idx)
+
+    scanned = 0
+    for entry in store.entries(k=k, terms=terms):
+        scanned += 1
+        counts = defaultdict(int)
+        for gram in store.ngrams(entry):
+            for idx in postings.get(gram, ()):
+                counts[idx] += 1
+
+        if threshold_percent <= 0:
+            candidates = range(len(fingerprints))
+        else:
+            candidates = sorted(counts)
+        for idx in candidates:
+            inter = counts.get(idx, 0)
+            union = fingerprints[idx].n_ngrams + entry.count - inter
+            sim_percent = (inter / union if union else 0.0) * 100.0
+            if sim_percent >= threshold_percent:
+                yield idx, entry, sim_percent
+
+    if stats is not None:
+        stats["entries"] = scanned
+        stats["seconds"] = time.perf_counter() - start
+
+
+def compute_archive_similarities(students: dict, store: CorpusStore, threshold_percent: float, k=3,
+                                 terms=None, stats=None):
+    """
+    Yeni sınıf x arşiv: her öğrenci için eşik üstü arşiv teslimleri.
+
+    Dönüş:
+        {
+          "ogrenci1": [("2023-guz/ogrenciX", 91.2), ...],   # benzerliğe göre azalan
+          ...
+        }
+    Arşivde eşleşmesi olmayan öğrenciler sözlükte yer almaz.
+    """
+    names = sorted(students.keys())
+    fingerprints = get_fingerprints(students, names, k=k)
+    results = defaultdict(list)
+    for idx, entry, sim_percent in archive_pairs(
+        fingerprints, store, threshold_percent, k=k, terms=terms, stats=stats
+    ):
+        results[names[idx]].append((entry.label, sim_percent))
+    return {name: sorted(matches, key=lambda x: -x[1]) for name, matches in sorted(results.items())}
+
+
+def save_archive_results(results: dict, output_path: str, threshold_percent: float):
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(f"Archive matches (threshold = {threshold_percent:.1f}%)\n")
+        f.write("=====================================================\n\n")
+
+        if not results:
+            f.write("No archive submissions above the threshold were found.\n")
+            return
+
+        for student, matches in results.items():
+            f.write(f"Student: {student}\n")
+            for label, sim_percent in matches:
+                f.write(f"  -> Similar to archived: {label}   ({sim_percent:.1f}%)\n")
+            f.write("\n")
+
+    print(f"Arşiv sonuçları kaydedildi: {output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Geçmiş dönem teslimlerinin fingerprint arşivi")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    add = sub.add_parser("add", help="bir dönemin teslimlerini arşive ekle")
+    add.add_argument("corpus_dir", help="arşiv klasörü")
+    add.add_argument("term", help="dönem adı (ör. 2024-guz)")
+    add.add_argument("root_dir", help="o dönemin öğrenci klasörleri")
+    add.add_argument("--k", type=int, default=3, help="opcode n-gram uzunluğu")
+    add.add_argument("--cache-dir", default=None, help="normalize cache klasörü")
+
+    info = sub.add_parser("info", help="arşivdeki dönemleri listele")
+    info.add_argument("corpus_dir", help="arşiv klasörü")
+
+    args = parser.parse_args()
+    if args.command == "add":
+        added = build_term(args.corpus_dir, args.term, args.root_dir, k=args.k, cache_dir=args.cache_dir)
+        print(f"Arşive eklenen teslim sayısı: {added} ({args.term})")
+    else:
+        with CorpusStore(args.corpus_dir) as store:
+            print(f"Toplam kayıt: {len(store)}")
+            for term in store.terms():
+                print(f"  {term}: {len(store.entries(terms=[term]))} (güncel biçim)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,306 @@
-from difflib import HtmlDiff
+from concurrent.futures import ProcessPoolExecutor
+from difflib import HtmlDiff, SequenceMatcher
+import hashlib
 import html
+import json
+import os
 
+from pair_store import PairStore
+from winnowing import WinnowFingerprint, match_line_spans
 
-def generate_html_report(students: dict, results: dict, output_path: str, threshold_percent: float, ngram_k: int = 3):
+
+REPORT_MODES = ("inline", "lazy")
+
+# "full": iki normalize listenin tamamının diff'i, "spans": sadece winnowing ile
+# bulunan eşleşen satır aralıklarının diff'i (küçük rapor, kopyalanan yeri gösterir)
+DIFF_SCOPES = ("full", "spans")
+
+# spans modunda her eşleşen aralığın etrafında gösterilen ek satır sayısı
+SPAN_CONTEXT_LINES = 2
+
+# spans modunda eklenen stiller: eşleşen (aynı) satırlar vurgulanır
+_SPANS_CSS = """        table.diff td.span_eq {
+            background-color: #ffe3b3;
+        }
+        table.diff td.span_no {
+            color: #888;
+            text-align: right;
+            padding-right: 6px;
+        }
+"""
+
+# Kümelere göre düzenlenmiş raporun ek stilleri ve küme tablosu davranışı
+_CLUSTERS_CSS = """        .cluster-title {
+            font-size: 13px;
+            margin: 16px 0 4px 0;
+        }
+        table.clusters tr[data-student] {
+            cursor: pointer;
+        }
+"""
+
+_CLUSTERS_JS = """        // Küme tablosu: satıra tıklayınca kümenin kaynak öğrencisi seçilir
+        document.getElementById('clusterTable').addEventListener('click', function(e) {
+            const row = e.target.closest('tr[data-student]');
+            if (!row) return;
+            studentSelect.value = row.getAttribute('data-student');
+            showMatchesForStudent(studentSelect.value);
+        });
+
+"""
+
+# inline mod: tüm diff tabloları sayfada gizli div olarak durur, kopyalanıp gösterilir
+_INLINE_SHOW_DIFF_JS = """        function showDiff(pairId, s1, s2) {
+            const allDiffs = document.querySelectorAll('.diff-pair');
+            allDiffs.forEach(div => div.style.display = 'none');
+
+            const sourceDiv = document.getElementById(pairId);
+            if (!sourceDiv) {
+                diffContainer.innerHTML = '<p class="no-matches">Diff not found for this pair.</p>';
+                return;
+            }
+
+            const cloned = sourceDiv.cloneNode(true);
+            cloned.style.display = 'block';
+
+            diffContainer.innerHTML = '';
+            const title = document.createElement('div');
+            title.className = 'diff-pair-title';
+            title.textContent = 'Diff view: ' + s1 + ' ↔ ' + s2;
+            diffContainer.appendChild(title);
+            diffContainer.appendChild(cloned);
+        }
+
+"""
+
+# lazy mod: diff tabloları ayrı dosyalarda, "View diff" tıklanınca yüklenir
+_LAZY_SHOW_DIFF_JS = """        const diffFiles = {diff_files_js};
+        const diffCache = {{}};
+        let wantedPairId = null;
+        let wantedTitle = '';
+
+        // Diff parçaları ayrı .js dosyalarında; <script> ile yüklenince bunu çağırırlar
+        // (file:// altında fetch çalışmadığı için script etiketi kullanılıyor).
+        window.registerDiff = function(pairId, tableHtml) {{
+            diffCache[pairId] = tableHtml;
+            if (pairId === wantedPairId) {{
+                renderDiff(pairId);
+            }}
+        }};
+
+        function renderDiff(pairId) {{
+            diffContainer.innerHTML = '';
+            const title = document.createElement('div');
+            title.className = 'diff-pair-title';
+            title.textContent = 'Diff view: ' + wantedTitle;
+            diffContainer.appendChild(title);
+            const holder = document.createElement('div');
+            holder.innerHTML = diffCache[pairId];
+            diffContainer.appendChild(holder);
+        }}
+
+        function showDiff(pairId, s1, s2) {{
+            wantedPairId = pairId;
+            wantedTitle = s1 + ' ↔ ' + s2;
+
+            if (diffCache[pairId] !== undefined) {{
+                renderDiff(pairId);
+                return;
+            }}
+
+            const file = diffFiles[pairId];
+            if (!file) {{
+                diffContainer.innerHTML = '<p class="no-matches">Diff not found for this pair.</p>';
+                return;
+            }}
+
+            diffContainer.innerHTML = '<p class="no-matches">Loading diff...</p>';
+            const script = document.createElement('script');
+            script.src = file;
+            script.onerror = function() {{
+                if (wantedPairId === pairId) {{
+                    diffContainer.innerHTML = '<p class="no-matches">Diff file could not be loaded.</p>';
+                }}
+            }};
+            document.body.appendChild(script);
+        }}
+
+"""
+
+
+class _NumberedHtmlDiff(HtmlDiff):
+    """
+    HtmlDiff anchor id önekini (from<n>_ / to<n>_) süreç genelindeki bir sayaçtan
+    alır; tablolar süreç havuzunda üretilince aynı sayfada çakışırlardı.
+    Burada önek tablonun rapordaki sırasıdır: seri ve paralel çıktı aynıdır.
     """
-    Öğrenci benzerlik sonuçlarına göre tek bir HTML raporu üretir.
 
-    - Solda öğrenci seçimi (dropdown).
-    - Seçilen öğrenci için benzer bulunduğu diğer öğrenciler ve yüzdeleri listelenir.
-    - Bir çifte tıklayınca, aşağıda yan yana diff (normalize edilmiş kod) gösterilir.
+    def __init__(self, number, **kwargs):
+        super().__init__(**kwargs)
+        self._number = number
+
+    def _make_prefix(self):
+        self._prefix = [f"from{self._number}_", f"to{self._number}_"]
+
+
+def _make_diff_table(pair, number=0):
+    a, b, norm1, norm2 = pair
+    return _NumberedHtmlDiff(number, wrapcolumn=80).make_table(
+        norm1,
+        norm2,
+        fromdesc=a,
+        todesc=b,
+        context=True,
+        numlines=2
+    )
+
+
+def _make_span_diff_table(pair, number=0):
+    """
+    Sadece eşleşen aralıkların yan yana gösterimi: her (A aralığı, B aralığı)
+    için satırlar hizalanır, aynı olan satırlar vurgulanır. HtmlDiff'in satır
+    başına ürettiği işaretlemeden çok daha küçüktür.
+    Aralık bulunamadıysa tam diff'e düşülür.
     """
+    a, b, norm1, norm2, spans = pair
+    if not spans:
+        return _make_diff_table((a, b, norm1, norm2), number)
+
+    def cell(lines, idx, match):
+        if idx is None:
+            return '<td class="span_no"></td><td></td>'
+        css = ' class="span_eq"' if match else ""
+        return f'<td class="span_no">{idx + 1}</td><td{css}>{html.escape(lines[idx])}</td>'
+
+    rows = []
+    for (a_first, a_last), (b_first, b_last) in spans:
+        a_from = max(0, a_first - SPAN_CONTEXT_LINES)
+        a_to = min(len(norm1), a_last + 1 + SPAN_CONTEXT_LINES)
+        b_from = max(0, b_first - SPAN_CONTEXT_LINES)
+        b_to = min(len(norm2), b_last + 1 + SPAN_CONTEXT_LINES)
+        rows.append(
+            f'<tr><th colspan="2" class="diff_header">{html.escape(a)} (lines {a_from + 1}-{a_to})</th>'
+            f'<th colspan="2" class="diff_header">{html.escape(b)} (lines {b_from + 1}-{b_to})</th></tr>'
+        )
+        matcher = SequenceMatcher(None, norm1[a_from:a_to], norm2[b_from:b_to], autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            match = tag == "equal"
+            for offset in range(max(i2 - i1, j2 - j1)):
+                idx1 = a_from + i1 + offset if i1 + offset < i2 else None
+                idx2 = b_from + j1 + offset if j1 + offset < j2 else None
+                rows.append(f"<tr>{cell(norm1, idx1, match)}{cell(norm2, idx2, match)}</tr>")
+
+    return '<table class="diff spans">\n' + "\n".join(rows) + "\n</table>"
+
+
+def _make_pair_diff(pair, number=0):
+    if len(pair) == 5:
+        return _make_span_diff_table(pair, number)
+    return _make_diff_table(pair, number)
+
+
+def _diff_jobs(students: dict, pair_keys, diff_scope="full"):
+    """Her çift için _make_pair_diff girdisi; spans modunda eşleşen satır aralıklarıyla."""
+    if diff_scope == "full":
+        return [(a, b, students[a].norm, students[b].norm) for a, b in pair_keys]
+
+    winnow_fps = {}
+
+    def winnow_fp(name):
+        if name not in winnow_fps:
+            fp = students[name].fp
+            winnow_fps[name] = WinnowFingerprint(fp.opcodes, breaks=fp.breaks)
+        return winnow_fps[name]
+
+    jobs = []
+    for a, b in pair_keys:
+        norm1, norm2 = students[a].norm, students[b].norm
+        spans = match_line_spans(norm1, norm2, winnow_fp(a), winnow_fp(b))
+        jobs.append((a, b, norm1, norm2, spans))
+    return jobs
+
+
+def _make_diffs(jobs, workers=1):
+    """_diff_jobs çıktısının diff tabloları, aynı sırada; workers > 1 ise süreç havuzunda."""
+    if workers and workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_make_pair_diff, jobs, range(len(jobs)), chunksize=8))
+    return [_make_pair_diff(job, number) for number, job in enumerate(jobs)]
+
+
+def _diff_file_name(pair_id: str) -> str:
+    return hashlib.sha1(pair_id.encode("utf-8")).hexdigest()[:16] + ".js"
+
+
+def _script_json(value) -> str:
+    # <script> içine gömülen JSON'da "</script>" kapanışı olmasın
+    return json.dumps(value, ensure_ascii=False).replace("</", "<\\/")
+
+
+def _write_lazy_diffs(students: dict, pair_keys, output_path: str, workers=1, diff_scope="full"):
+    """
+    Her çift için diff tablosunu ayrı bir .js parçasına yazar:
+        <rapor adı>_files/<hash>.js  ->  registerDiff("diff-A--B", "<table ...>");
 
-    # 1) Öğrenci listesi
+    Dönüş: {"diff-A--B": "<rapor adı>_files/<hash>.js"} (rapora göre göreli yol)
+    """
+    base = os.path.splitext(os.path.basename(output_path))[0] + "_files"
+    fragments_dir = os.path.join(os.path.dirname(output_path) or ".", base)
+    os.makedirs(fragments_dir, exist_ok=True)
+
+    # Önceki çalıştırmadan kalan parçaları temizle
+    for old_name in os.listdir(fragments_dir):
+        if old_name.endswith(".js"):
+            os.remove(os.path.join(fragments_dir, old_name))
+
+    tables = _make_diffs(_diff_jobs(students, pair_keys, diff_scope), workers)
+
+    diff_files = {}
+    for (a, b), table_html in zip(pair_keys, tables):
+        pair_id = f"diff-{a}--{b}"
+        file_name = _diff_file_name(pair_id)
+        with open(os.path.join(fragments_dir, file_name), "w", encoding="utf-8") as f:
+            f.write(f"registerDiff({_script_json(pair_id)}, {_script_json(table_html)});\n")
+        diff_files[pair_id] = f"{base}/{file_name}"
+
+    return diff_files
+
+
+def _cluster_sections(clusters):
+    """Kümelere göre gruplanmış dropdown seçenekleri ve sol paneldeki küme tablosu."""
+    options = []
+    rows = []
+    for number, cluster in enumerate(clusters, start=1):
+        label = f"Cluster {number} · {cluster.size} students · density {cluster.density:.2f}"
+        options.append(f'                <optgroup label="{html.escape(label)}">')
+        for name in cluster.members:
+            text = f"{name} (source)" if name == cluster.source else name
+            options.append(f'                    <option value="{html.escape(name)}">{html.escape(text)}</option>')
+        options.append("                </optgroup>")
+        rows.append(
+            f'                <tr data-student="{html.escape(cluster.source)}"><td>{number}</td>'
+            f"<td>{cluster.size}</td><td>{cluster.density:.2f}</td>"
+            f"<td>{cluster.mean_similarity:.1f}</td><td>{html.escape(cluster.source)}</td></tr>"
+        )
+
+    table = "\n".join([
+        '            <h4 class="cluster-title">Clusters</h4>',
+        '            <table class="matches clusters" id="clusterTable">',
+        "                <thead><tr><th>#</th><th>Size</th><th>Density</th><th>Mean %</th><th>Source</th></tr></thead>",
+        "                <tbody>",
+        *rows,
+        "                </tbody>",
+        "            </table>",
+    ])
+    return "\n".join(options), table + "\n"
+
+
+def _dict_matches(results: dict):
+    """
+    Sonuç sözlüğünden (matched_students, pair_keys, student_matches):
+    match'i olan öğrenciler, her (A,B) çifti bir kez ve her öğrenci için
+    azalan benzerlikte [(diger, yuzde), ...] listeleri üreten iterable.
+    """
     all_student_names = sorted(results.keys())
 
     # Her öğrenci için: other -> max(similarity)
@@ -24,33 +313,95 @@ def generate_html_report(students: dict, results: dict, output_path: str, thresh
     # En az bir match'i olan öğrenciler
     matched_students = [s for s in all_student_names if cleaned_matches[s]]
 
-    # Eğer kimsenin match'i yoksa yine de boş bir rapor üretelim
-    # (dropdown boş olur, mesaj yazar)
-    # 2) Diff tabloları: her (A,B) çifti için bir tane
-    diff_maker = HtmlDiff(wrapcolumn=80)
-    pair_diffs_html = {}  # key: "A||B"
-
+    pair_keys = []
+    seen_pairs = set()
     for student in matched_students:
         for other, sim in cleaned_matches[student].items():
             if student == other:
                 continue
-            a, b = sorted((student, other))
-            pair_key = f"{a}||{b}"
-            if pair_key in pair_diffs_html:
+            pair = tuple(sorted((student, other)))
+            if pair in seen_pairs:
                 continue
+            seen_pairs.add(pair)
+            pair_keys.append(pair)
+
+    student_matches = (
+        (student, sorted(cleaned_matches[student].items(), key=lambda x: -x[1]))
+        for student in matched_students
+    )
+    return matched_students, pair_keys, student_matches
 
-            norm1 = students[a]["norm"]
-            norm2 = students[b]["norm"]
 
-            table_html = diff_maker.make_table(
-                norm1,
-                norm2,
-                fromdesc=a,
-                todesc=b,
-                context=True,
-                numlines=2
-            )
-            pair_diffs_html[pair_key] = table_html
+def _store_matches(store: PairStore):
+    """
+    _dict_matches ile aynı çıktı, simetrik sözlük kurmadan doğrudan depodan:
+    öğrenci listeleri CSR komşuluk dizilerinden sırayla, tek tek üretilir.
+    """
+    names = store.names
+    offsets, edges = store.adjacency()
+    matched = [idx for idx in range(len(names)) if offsets[idx + 1] > offsets[idx]]
+    pair_keys = [(a, b) for a, b, _ in store.iter_named_pairs()]
+
+    def student_matches():
+        left, right, score = store.left, store.right, store.score
+        for idx in matched:
+            matches = []
+            for e in edges[offsets[idx]:offsets[idx + 1]]:
+                other = right[e] if left[e] == idx else left[e]
+                matches.append((names[other], score[e]))
+            matches.sort(key=lambda x: -x[1])
+            yield names[idx], matches
+
+    return [names[idx] for idx in matched], pair_keys, student_matches()
+
+
+def generate_html_report(students: dict, results: dict, output_path: str, threshold_percent: float, ngram_k: int = 3,
+                         mode: str = "inline", workers: int = 1, diff_scope: str = "full", clusters=None):
+    """
+    Öğrenci benzerlik sonuçlarına göre tek bir HTML raporu üretir.
+
+    - Solda öğrenci seçimi (dropdown).
+    - Seçilen öğrenci için benzer bulunduğu diğer öğrenciler ve yüzdeleri listelenir.
+    - Bir çifte tıklayınca, aşağıda yan yana diff (normalize edilmiş kod) gösterilir.
+
+    mode:
+        "inline" -> tüm diff tabloları tek report.html içinde (küçük sınıflar için)
+        "lazy"   -> report.html sadece indeks sayfasıdır; her çiftin diff'i
+                    <rapor adı>_files/ altında ayrı bir dosyadır ve "View diff"
+                    tıklanınca yüklenir.
+    Diff tabloları iki modda da workers > 1 ise süreç havuzunda paralel üretilir.
+
+    diff_scope:
+        "full"  -> iki normalize listenin tamamı karşılaştırılır
+        "spans" -> sadece winnowing fingerprint'lerinin gösterdiği eşleşen satır
+                   aralıkları (± SPAN_CONTEXT_LINES) karşılaştırılır; eşleşme
+                   bulunamayan çiftlerde tam diff'e düşülür
+
+    clusters verilirse (clustering.clusters_from_results) öğrenci listesi
+    kümelere göre gruplanır (kaynak öğrenci işaretli) ve solda küme özeti
+    tablosu gösterilir; satıra tıklamak kümenin kaynağını seçer.
+    """
+    if mode not in REPORT_MODES:
+        raise ValueError(f"Bilinmeyen rapor modu: {mode!r} (seçenekler: {', '.join(REPORT_MODES)})")
+    if diff_scope not in DIFF_SCOPES:
+        raise ValueError(f"Bilinmeyen diff kapsamı: {diff_scope!r} (seçenekler: {', '.join(DIFF_SCOPES)})")
+
+    # 1) Match'i olan öğrenciler, (A,B) çiftleri ve öğrenci başına eşleşme listeleri.
+    # Eğer kimsenin match'i yoksa yine de boş bir rapor üretelim
+    # (dropdown boş olur, mesaj yazar)
+    if isinstance(results, PairStore):
+        matched_students, pair_keys, student_matches = _store_matches(results)
+    else:
+        matched_students, pair_keys, student_matches = _dict_matches(results)
+
+    # 2) Diff tabloları: her (A,B) çifti için bir tane
+    pair_diffs_html = {}  # key: "A||B"
+    diff_files = {}
+    if mode == "inline":
+        for (a, b), table_html in zip(pair_keys, _make_diffs(_diff_jobs(students, pair_keys, diff_scope), workers)):
+            pair_diffs_html[f"{a}||{b}"] = table_html
+    else:
+        diff_files = _write_lazy_diffs(students, pair_keys, output_path, workers=workers, diff_scope=diff_scope)
 
     # 3) JS için matchesData: yalnızca matched_students
     def js_escape(s: str) -> str:
@@ -59,13 +410,13 @@ def generate_html_report(students: dict, results: dict, output_path: str, thresh
     matches_js_lines = []
     matches_js_lines.append("{")
     first_student = True
-    for student in matched_students:
+    for student, matches in student_matches:
         if not first_student:
             matches_js_lines.append(",")
         first_student = False
         matches_js_lines.append(f"  '{js_escape(student)}': [")
         first = True
-        for other, sim in sorted(cleaned_matches[student].items(), key=lambda x: -x[1]):
+        for other, sim in matches:
             if not first:
                 matches_js_lines.append(",")
             first = False
@@ -86,11 +437,30 @@ def generate_html_report(students: dict, results: dict, output_path: str, thresh
         diff_divs.append("</div>")
     diff_divs_html = "\n".join(diff_divs)
 
+    if mode == "inline":
+        diff_section = f"""    <!-- Gizli diff tabloları -->
+    <div style="display:none;">
+{diff_divs_html}
+    </div>
+"""
+        show_diff_js = _INLINE_SHOW_DIFF_JS
+    else:
+        diff_section = ""
+        show_diff_js = _LAZY_SHOW_DIFF_JS.format(diff_files_js=_script_json(diff_files))
+
     # 5) Dropdown seçenekleri (sadece match'i olanlar)
-    options_html = "\n".join(
-        f'                <option value="{html.escape(name)}">{html.escape(name)}</option>'
-        for name in matched_students
-    )
+    if clusters:
+        options_html, clusters_html = _cluster_sections(clusters)
+        clusters_js = _CLUSTERS_JS
+    else:
+        options_html = "\n".join(
+            f'                <option value="{html.escape(name)}">{html.escape(name)}</option>'
+            for name in matched_students
+        )
+        clusters_html = ""
+        clusters_js = ""
+
+    extra_css = (_SPANS_CSS if diff_scope == "spans" else "") + (_CLUSTERS_CSS if clusters else "")
 
     # 6) Ana HTML
     html_content = f"""<!DOCTYPE html>
@@ -218,7 +588,7 @@ def generate_html_report(students: dict, results: dict, output_path: str, thresh
             font-weight: 600;
             margin: 8px 0;
         }}
-    </style>
+{extra_css}    </style>
 </head>
 <body>
     <header>
@@ -233,7 +603,7 @@ def generate_html_report(students: dict, results: dict, output_path: str, thresh
 {options_html}
             </select>
             <p class="summary-line" id="summaryLine"></p>
-        </div>
+{clusters_html}        </div>
         <div class="panel panel-right">
             <h3 style="margin-top:0;">Matches</h3>
             <div id="matchesContainer">
@@ -243,11 +613,7 @@ def generate_html_report(students: dict, results: dict, output_path: str, thresh
             </div>
         </div>
     </div>
-    <!-- Gizli diff tabloları -->
-    <div style="display:none;">
-{diff_divs_html}
-    </div>
-    <script>
+{diff_section}    <script>
         const matchesData = {matches_js_obj};
         const studentSelect = document.getElementById('studentSelect');
         const matchesContainer = document.getElementById('matchesContainer');
@@ -306,28 +672,7 @@ def generate_html_report(students: dict, results: dict, output_path: str, thresh
             matchesContainer.innerHTML = htmlTable;
         }}
 
-        function showDiff(pairId, s1, s2) {{
-            const allDiffs = document.querySelectorAll('.diff-pair');
-            allDiffs.forEach(div => div.style.display = 'none');
-
-            const sourceDiv = document.getElementById(pairId);
-            if (!sourceDiv) {{
-                diffContainer.innerHTML = '<p class="no-matches">Diff not found for this pair.</p>';
-                return;
-            }}
-
-            const cloned = sourceDiv.cloneNode(true);
-            cloned.style.display = 'block';
-
-            diffContainer.innerHTML = '';
-            const title = document.createElement('div');
-            title.className = 'diff-pair-title';
-            title.textContent = 'Diff view: ' + s1 + ' ↔ ' + s2;
-            diffContainer.appendChild(title);
-            diffContainer.appendChild(cloned);
-        }}
-
-        // Event: öğrenci seçimi
+{show_diff_js}{clusters_js}        // Event: öğrenci seçimi
         studentSelect.addEventListener('change', function() {{
             const student = this.value;
             showMatchesForStudent(student);
@@ -0,0 +1,245 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from asm_processing import NORMALIZER_VERSION
+from normalize_cache import NormalizeCache
+from plagiarism_core import jaccard_similarity
+from student_io import (
+    DEFAULT_LOAD_WORKERS,
+    build_student_record,
+    close_cache,
+    compute_pairwise_similarities,
+    find_student_files,
+    get_fingerprints,
+    load_cached_student,
+    pairs_to_results,
+    read_student_file,
+    submission_hash,
+)
+
+
+# 2: öğrenci başına bütün .asm dosyaları (paths + dosya başına mtime / size listeleri)
+STATE_FORMAT = 2
+
+
+def load_state(state_path: str):
+    """Önceki çalıştırmanın durumunu okur. Dosya yoksa / bozuksa None."""
+    if not os.path.exists(state_path):
+        return None
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        print(f"[UYARI] Incremental durum dosyası okunamadı, tam tarama yapılacak: {state_path}")
+        return None
+    if state.get("format") != STATE_FORMAT:
+        return None
+    return state
+
+
+def save_state(state_path: str, files: dict, results: dict, threshold_percent: float, k: int):
+    """
+    Durum dosyası:
+        {
+          "format": 2, "normalizer_version": "...", "k": 3, "threshold_percent": 80.0,
+          "files": {"ogrenci": {"path": ..., "paths": [...], "mtime": [...], "size": [...], "sha256": ...}},
+          "pairs": [["ogrenciA", "ogrenciB", 85.3], ...]   (A < B, her çift bir kez)
+        }
+    """
+    pairs = []
+    for student in sorted(results):
+        for other, sim in results[student]:
+            if student < other:
+                pairs.append([student, other, sim])
+
+    state = {
+        "format": STATE_FORMAT,
+        "normalizer_version": NORMALIZER_VERSION,
+        "k": k,
+        "threshold_percent": threshold_percent,
+        "files": files,
+        "pairs": pairs,
+    }
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, state_path)
+
+
+def _file_info(paths):
+    stats = [os.stat(path) for path in paths]
+    return {
+        "path": paths[0],
+        "paths": list(paths),
+        "mtime": [st.st_mtime for st in stats],
+        "size": [st.st_size for st in stats],
+    }
+
+
+def detect_changes(root_dir: str, state, records=None, k=3, cache=None, workers=DEFAULT_LOAD_WORKERS,
+                   regions=False):
+    """
+    Öğrenci klasörlerini önceki durumla karşılaştırır.
+
+    Dosya listesi ve her dosyanın mtime / boyutu aynı olan öğrenciler okunmadan
+    "değişmemiş" sayılır; aksi halde içerik hash'i karşılaştırılır (sadece
+    dokunulmuş ama aynı kalmış dosyalar böylece değişmiş sayılmaz).
+
+    records (dict) verilirse okunması gereken öğrencilerin Submission kayıtları
+    hash için okunan aynı baytlardan (cache'e bakarak) üretilip oraya yazılır;
+    dosyalar ikinci kez okunmaz (regions=True ise bölgeler de aynı baytlardan
+    üretilir). Okuma işleri workers adet thread'de yapılır.
+
+    Dönüş: (files, added, changed, removed)
+        files -> {"ogrenci": {"path", "paths", "mtime", "size", "sha256"}}  (güncel durum)
+        added / changed / removed -> öğrenci adı kümeleri
+    """
+    old_files = (state or {}).get("files", {})
+    files = {}
+    to_read = []
+
+    for student, paths in find_student_files(root_dir):
+        info = _file_info(paths)
+        old = old_files.get(student)
+
+        if old and old["paths"] == info["paths"] and old["mtime"] == info["mtime"] and old["size"] == info["size"]:
+            info["sha256"] = old["sha256"]
+            info["path"] = old["path"]
+        else:
+            to_read.append(student)
+
+        files[student] = info
+
+    def read(student):
+        paths = files[student]["paths"]
+        raws = [read_student_file(path) for path in paths]
+        if records is None:
+            return submission_hash(paths, raws), None
+        record = build_student_record(paths, raws, k=k, cache=cache, regions=regions)
+        return record.sha256, record
+
+    added, changed = set(), set()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for student, (sha256, record) in zip(to_read, pool.map(read, to_read)):
+            info = files[student]
+            info["sha256"] = sha256
+            if record is not None:
+                info["path"] = record.path
+                records[student] = record
+            old = old_files.get(student)
+            if old is None:
+                added.add(student)
+            elif old["sha256"] != sha256:
+                changed.add(student)
+
+    removed = set(old_files) - set(files)
+    return files, added, changed, removed
+
+
+def _load(paths, k, cache, regions=False):
+    raws = [read_student_file(path) for path in paths]
+    return build_student_record(paths, raws, k=k, cache=cache, regions=regions)
+
+
+def _state_matches(state, threshold_percent: float, k: int):
+    return (
+        state is not None
+        and state.get("normalizer_version") == NORMALIZER_VERSION
+        and state.get("k") == k
+        and state.get("threshold_percent") == threshold_percent
+    )
+
+
+def incremental_similarities(root_dir: str, state_path: str, threshold_percent: float, k=3, cache_dir=None,
+                             workers=DEFAULT_LOAD_WORKERS, regions=False):
+    """
+    Önceki çalıştırmanın çift skorlarını saklayıp sadece eklenen / değişen
+    öğrencilerin satırlarını hesaplar. Silinen öğrencilerin çiftleri atılır.
+
+    Skorlama her zaman tam n-gram Jaccard ile (exact engine, tek süreç) yapılır;
+    workers sadece dosya okuma / normalize thread sayısıdır. regions=True ise
+    okunan öğrencilerin bölgeleri de aynı okumadan üretilir.
+
+    Önceki durum yoksa ya da k / threshold / normalizer sürümü farklıysa
+    tam hesaplama yapılır. Sonuç, tam çalıştırmayla birebir aynı sözlüktür.
+
+    Dönüş: (students, results, stats)
+        stats -> {"added", "changed", "removed", "comparisons", "full_run"}
+    """
+    state = load_state(state_path)
+    if not _state_matches(state, threshold_percent, k):
+        state = None
+
+    # Okunan (yeni / dokunulmuş) öğrenciler hash'lenirken yüklenir, kalanlar
+    # cache'ten (dosya okunmadan); cache'te olmayanlar dosyadan yüklenir
+    cache = NormalizeCache(cache_dir) if cache_dir else None
+    loaded = {}
+    try:
+        files, added, changed, removed = detect_changes(
+            root_dir, state, records=loaded, k=k, cache=cache, workers=workers, regions=regions
+        )
+        affected = added | changed
+
+        students = {}
+        missing = []
+        for student in files:
+            info = files[student]
+            record = loaded.get(student)
+            if record is None:
+                record = load_cached_student(info["paths"], info["sha256"], k, cache, path=info["path"])
+            if record is None:
+                missing.append(student)
+            students[student] = record
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                jobs = [pool.submit(_load, files[student]["paths"], k, cache, regions) for student in missing]
+                for student, job in zip(missing, jobs):
+                    record = job.result()
+                    files[student]["sha256"] = record.sha256
+                    files[student]["path"] = record.path
+                    students[student] = record
+    finally:
+        if cache is not None:
+            close_cache(cache)
+
+    names = sorted(students)
+    stats = {
+        "added": sorted(added),
+        "changed": sorted(changed),
+        "removed": sorted(removed),
+        "comparisons": 0,
+        "full_run": state is None,
+    }
+
+    if state is None:
+        results = compute_pairwise_similarities(students, threshold_percent, k=k)
+        stats["comparisons"] = len(names) * (len(names) - 1) // 2
+        save_state(state_path, files, results, threshold_percent, k)
+        return students, results, stats
+
+    position = {name: idx for idx, name in enumerate(names)}
+    fingerprints = get_fingerprints(students, names, k=k)
+
+    # 1) Eski çiftlerden hâlâ geçerli olanlar (iki taraf da mevcut ve değişmemiş)
+    pairs = []
+    for a, b, sim in state["pairs"]:
+        if a in position and b in position and a not in affected and b not in affected:
+            pairs.append((position[a], position[b], sim))
+
+    # 2) Etkilenen öğrencilerin satırları (etkilenen-etkilenen çiftleri bir kez)
+    for student in sorted(affected):
+        i = position[student]
+        for j, other in enumerate(names):
+            if j == i or (other in affected and other < student):
+                continue
+            stats["comparisons"] += 1
+            sim_percent = jaccard_similarity(fingerprints[i].ngrams, fingerprints[j].ngrams) * 100.0
+            if sim_percent >= threshold_percent:
+                pairs.append((min(i, j), max(i, j), sim_percent))
+
+    pairs.sort(key=lambda item: (item[0], item[1]))
+    results = pairs_to_results(names, pairs)
+    save_state(state_path, files, results, threshold_percent, k)
+    return students, results, stats
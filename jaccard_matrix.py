@@ -0,0 +1,132 @@
+import time
+
+try:
+    import numpy as np
+except ImportError:  # numpy opsiyonel: yoksa saf Python bitset yoluna düşülür
+    np = None
+
+
+# Bir satır bloğu için (blok x N x W byte) geçici AND dizisinin üst sınırı
+_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+def intern_ngrams(fingerprints):
+    """
+    Her opcode n-gram'ına bir tamsayı ID verir.
+
+    Dönüş: (vocab, rows)
+        vocab -> {ngram: id}
+        rows  -> her fingerprint için sıralı ID listesi
+    """
+    vocab = {}
+    rows = []
+    for fp in fingerprints:
+        ids = []
+        for gram in fp.ngrams:
+            gram_id = vocab.get(gram)
+            if gram_id is None:
+                gram_id = len(vocab)
+                vocab[gram] = gram_id
+            ids.append(gram_id)
+        ids.sort()
+        rows.append(ids)
+    return vocab, rows
+
+
+def matrix_pairs(fingerprints, threshold_percent: float, use_numpy=None, stats=None):
+    """
+    Tüm çiftlerin Jaccard değerini n-gram ID'leri üzerinden toplu hesaplar.
+    Çıktı: (i, j, sim_percent), (i, j) sırasında; brute-force döngüsüyle birebir aynıdır.
+
+    |A ∩ B| bitset AND + popcount ile bulunur, |A ∪ B| = |A| + |B| - |A ∩ B|.
+    numpy varsa satırlar paketlenmiş bitset (uint8) matrisi olur ve bloklar
+    halinde vektörel işlenir; yoksa her satır bir Python int bitset'idir.
+
+    Her çift skorlandığı için stats verilirse "candidates" n * (n - 1) / 2 olur;
+    "candidate_seconds" ID'lere çevirme + bitset matrisinin kurulma süresidir.
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise RuntimeError("matrix engine için numpy kurulu değil (use_numpy=False ile saf Python yolu kullanılabilir)")
+
+    start = time.perf_counter()
+    _, rows = intern_ngrams(fingerprints)
+    if stats is not None:
+        n = len(rows)
+        stats["candidates"] = n * (n - 1) // 2
+    if use_numpy:
+        return _numpy_pairs(rows, threshold_percent, stats, start)
+    return _bitset_pairs(rows, threshold_percent, stats, start)
+
+
+def _bitset_pairs(rows, threshold_percent: float, stats=None, start=0.0):
+    bitsets = []
+    for ids in rows:
+        bits = 0
+        for gram_id in ids:
+            bits |= 1 << gram_id
+        bitsets.append(bits)
+    sizes = [len(ids) for ids in rows]
+    if stats is not None:
+        stats["candidate_seconds"] = time.perf_counter() - start
+
+    n = len(rows)
+    for i in range(n):
+        bits_i = bitsets[i]
+        size_i = sizes[i]
+        for j in range(i + 1, n):
+            inter = (bits_i & bitsets[j]).bit_count()
+            union = size_i + sizes[j] - inter
+            sim_percent = (inter / union if union else 0.0) * 100.0
+            if sim_percent >= threshold_percent:
+                yield i, j, sim_percent
+
+
+def _numpy_pairs(rows, threshold_percent: float, stats=None, start=0.0):
+    n = len(rows)
+    if n < 2:
+        if stats is not None:
+            stats["candidate_seconds"] = time.perf_counter() - start
+        return
+
+    # Her satır uint64 bloklarına paketlenmiş bitset: (N x W)
+    vocab_size = max((ids[-1] + 1 for ids in rows if ids), default=0)
+    words = max(1, (vocab_size + 63) // 64)
+    dense = np.zeros((n, words * 64), dtype=bool)
+    for idx, ids in enumerate(rows):
+        dense[idx, ids] = True
+    packed = np.packbits(dense, axis=1).view(np.uint64)
+    del dense
+
+    sizes = np.array([len(ids) for ids in rows], dtype=np.int64)
+    popcount = _popcount_function()
+    if stats is not None:
+        stats["candidate_seconds"] = time.perf_counter() - start
+
+    block = max(1, _BLOCK_BYTES // packed.nbytes)
+    for start in range(0, n - 1, block):
+        stop = min(start + block, n - 1)
+        # (blok x N) kesişim sayıları
+        inter = popcount(packed[start:stop, None, :] & packed[None, :, :]).sum(axis=2, dtype=np.int64)
+        union = sizes[start:stop, None] + sizes[None, :] - inter
+
+        sim = np.zeros(inter.shape, dtype=np.float64)
+        np.divide(inter, union, out=sim, where=union > 0)
+        sim_percent = sim * 100.0
+
+        # Sadece üst üçgen (j > i)
+        col = np.arange(n)[None, :]
+        row = np.arange(start, stop)[:, None]
+        mask = (col > row) & (sim_percent >= threshold_percent)
+
+        for r, j in zip(*np.nonzero(mask)):
+            yield start + int(r), int(j), float(sim_percent[r, j])
+
+
+def _popcount_function():
+    if hasattr(np, "bitwise_count"):  # numpy >= 2.0
+        return np.bitwise_count
+    # Eski numpy: uint64 blokları byte'lara bakılarak tablo ile sayılır
+    table = np.array([bin(v).count("1") for v in range(256)], dtype=np.uint8)
+    return lambda arr: table[arr.view(np.uint8)]
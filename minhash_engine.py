@@ -0,0 +1,126 @@
+import hashlib
+import random
+import time
+from collections import defaultdict
+
+from plagiarism_core import jaccard_similarity
+
+
+# Mersenne asal (2^61 - 1): (a * x + b) mod P evrensel hash ailesi için
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = _MERSENNE_PRIME
+
+
+def ngram_hash(gram) -> int:
+    """
+    Bir opcode n-gram'ı için süreçten bağımsız (PYTHONHASHSEED'den etkilenmeyen)
+    64-bit hash. Paketlenmiş n-gram tamsayısı (Fingerprint.ngrams) ya da
+    ("MOV", "ADD", "CMP") gibi mnemonic tuple'ı -> int
+    """
+    if isinstance(gram, int):
+        data = gram.to_bytes(8, "little")
+    else:
+        data = "\x1f".join(gram).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def make_permutations(num_perm: int, seed: int = 1):
+    """MinHash için num_perm adet (a, b) katsayı çifti üretir."""
+    rng = random.Random(seed)
+    return [
+        (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+        for _ in range(num_perm)
+    ]
+
+
+def minhash_signature(ngrams, permutations):
+    """
+    Fingerprint.ngrams (n-gram kümesi) için MinHash imzası.
+    Boş küme için her pozisyon _MAX_HASH olur.
+    """
+    hashes = [ngram_hash(gram) for gram in ngrams]
+    if not hashes:
+        return [_MAX_HASH] * len(permutations)
+    return [
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+        for a, b in permutations
+    ]
+
+
+def lsh_candidates(signatures, bands: int, rows: int):
+    """
+    Bantlı LSH: imza bands adet rows uzunluklu parçaya bölünür,
+    herhangi bir bantta aynı kovaya düşen çiftler aday olur.
+
+    Dönüş: {(i, j), ...}  (i < j)
+    """
+    candidates = set()
+    for band in range(bands):
+        start = band * rows
+        buckets = defaultdict(list)
+        for idx, sig in enumerate(signatures):
+            buckets[tuple(sig[start:start + rows])].append(idx)
+
+        for ids in buckets.values():
+            if len(ids) < 2:
+                continue
+            for a_pos in range(len(ids) - 1):
+                for b in ids[a_pos + 1:]:
+                    candidates.add((ids[a_pos], b))
+    return candidates
+
+
+def minhash_pairs(fingerprints, threshold_percent: float, bands: int = 16, rows: int = 4, seed: int = 1,
+                  stats=None):
+    """
+    MinHash/LSH ile aday çiftleri bulur, adayları tam Jaccard ile yeniden doğrular.
+    Çıktı: (i, j, sim_percent), (i, j) sırasında; skorlar tam değerdir,
+    ama LSH'nin kaçırdığı çiftler sonuçta yer almaz (yaklaşık recall).
+
+    bands * rows = imza uzunluğu. Bant sayısı arttıkça recall artar, hız düşer;
+    yaklaşık eşik (1 / bands) ** (1 / rows) civarındadır.
+
+    stats verilirse "candidates" ve "candidate_seconds" yazılır.
+    """
+    start = time.perf_counter()
+    permutations = make_permutations(bands * rows, seed=seed)
+    signatures = [minhash_signature(fp.ngrams, permutations) for fp in fingerprints]
+    candidates = sorted(lsh_candidates(signatures, bands, rows))
+    if stats is not None:
+        stats["candidates"] = len(candidates)
+        stats["candidate_seconds"] = time.perf_counter() - start
+
+    for i, j in candidates:
+        sim_percent = jaccard_similarity(fingerprints[i].ngrams, fingerprints[j].ngrams) * 100.0
+        if sim_percent >= threshold_percent:
+            yield i, j, sim_percent
+
+
+def minhash_recall(fingerprints, threshold_percent: float, bands: int = 16, rows: int = 4, seed: int = 1):
+    """
+    MinHash yolunu tam (brute-force) yolla karşılaştırır.
+
+    Dönüş:
+        {
+          "exact_pairs": ..., "minhash_pairs": ..., "recall": ...,
+          "exact_seconds": ..., "minhash_seconds": ...
+        }
+    """
+    t0 = time.perf_counter()
+    exact = set()
+    for i in range(len(fingerprints)):
+        for j in range(i + 1, len(fingerprints)):
+            sim_percent = jaccard_similarity(fingerprints[i].ngrams, fingerprints[j].ngrams) * 100.0
+            if sim_percent >= threshold_percent:
+                exact.add((i, j))
+    t1 = time.perf_counter()
+    approx = {(i, j) for i, j, _ in minhash_pairs(fingerprints, threshold_percent, bands, rows, seed)}
+    t2 = time.perf_counter()
+
+    return {
+        "exact_pairs": len(exact),
+        "minhash_pairs": len(approx),
+        "recall": (len(exact & approx) / len(exact)) if exact else 1.0,
+        "exact_seconds": t1 - t0,
+        "minhash_seconds": t2 - t1,
+    }
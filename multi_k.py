@@ -0,0 +1,165 @@
+from array import array
+
+from opcode_table import encode_opcodes, split_segments
+from plagiarism_core import extract_opcodes, jaccard_similarity
+
+
+# Varsayılan olarak birlikte hesaplanan n-gram uzunlukları
+DEFAULT_K_VALUES = (2, 3, 4, 5, 6)
+
+# Rolling hash modülü (Mersenne asal 2^61 - 1) ve tabanı
+_MOD = (1 << 61) - 1
+_BASE = 1_000_003
+
+
+def rolling_ngram_hashes(opcodes, k_values=DEFAULT_K_VALUES):
+    """
+    Opcode ID dizisi (array('H'); mnemonic listesi de olur) üzerinde tek
+    geçişte, her k için o uzunluktaki tüm pencerelerin polinom rolling
+    hash'lerini üretir.
+
+    Her pozisyonda k başına bir çarpma / çıkarma yapılır; n-gram tuple'ları
+    hiç oluşturulmaz. Dönüş: {k: {hash, ...}}
+    """
+    k_values = tuple(sorted(set(k_values)))
+    ids = opcodes if isinstance(opcodes, array) else encode_opcodes(opcodes)
+    hashes = {k: set() for k in k_values}
+    rolling = {k: 0 for k in k_values}
+    # Pencereden çıkan sembolün katsayısı: BASE^(k-1)
+    drop_factor = {k: pow(_BASE, k - 1, _MOD) for k in k_values}
+
+    for pos, symbol in enumerate(ids):
+        for k in k_values:
+            h = rolling[k]
+            if pos >= k:
+                h -= ids[pos - k] * drop_factor[k]
+            h = (h * _BASE + symbol) % _MOD
+            rolling[k] = h
+            if pos >= k - 1:
+                hashes[k].add(h)
+    return hashes
+
+
+class MultiKFingerprint:
+    """
+    Bir teslimin birden fazla n-gram uzunluğu için hash kümeleri.
+
+    - opcodes:  opcode ID dizisi (Fingerprint.opcodes)
+    - k_values: hesaplanan k değerleri (sıralı)
+    - hashes:   {k: n-gram hash kümesi}
+    - sizes:    {k: küme boyutu}
+
+    Jaccard değerleri pack_ngrams ile hesaplananlarla aynıdır (hash çakışması
+    olasılığı 2^61 modülüyle ihmal edilebilir düzeydedir). breaks
+    (Fingerprint.breaks) verilirse n-gram'lar dosya sınırını aşmaz.
+    """
+
+    def __init__(self, opcodes, k_values=DEFAULT_K_VALUES, breaks=()):
+        self.opcodes = opcodes
+        self.hashes = None
+        for segment in split_segments(opcodes, breaks):
+            segment_hashes = rolling_ngram_hashes(segment, k_values)
+            if self.hashes is None:
+                self.hashes = segment_hashes
+            else:
+                for k, grams in segment_hashes.items():
+                    self.hashes[k] |= grams
+        self.k_values = tuple(self.hashes)
+        self.sizes = {k: len(grams) for k, grams in self.hashes.items()}
+
+
+def build_multi_k_fingerprint(fp, k_values=DEFAULT_K_VALUES):
+    """Mevcut bir Fingerprint'in opcode dizisinden MultiKFingerprint üretir."""
+    return MultiKFingerprint(fp.opcodes, k_values=k_values, breaks=fp.breaks)
+
+
+def get_multi_k_fingerprints(students: dict, names, k_values=DEFAULT_K_VALUES):
+    """
+    names sırasıyla her öğrencinin MultiKFingerprint'i. Yüklemede üretilmiş
+    fingerprint varsa opcode dizisi ondan alınır (k'sı ne olursa olsun).
+    """
+    mfps = []
+    for name in names:
+        submission = students[name]
+        fp = submission.fp
+        if fp is None:
+            mfps.append(MultiKFingerprint(extract_opcodes(submission.norm), k_values=k_values))
+        else:
+            mfps.append(MultiKFingerprint(fp.opcodes, k_values=k_values, breaks=fp.breaks))
+    return mfps
+
+
+def compare_multi_k(mfp1, mfp2, weights=None):
+    """
+    İki MultiKFingerprint'i ortak k değerlerinin hepsi için tek çağrıda karşılaştırır.
+
+    weights: {k: ağırlık}; verilmezse ortak k'lar eşit ağırlıklıdır.
+    Dönüş:
+        {
+          "per_k":   {2: 0.91, 3: 0.84, ...},   # Jaccard (0..1)
+          "blended": 0.83,                       # per_k'nın ağırlıklı ortalaması
+        }
+    """
+    per_k = {}
+    for k in mfp1.k_values:
+        if k in mfp2.hashes:
+            per_k[k] = jaccard_similarity(mfp1.hashes[k], mfp2.hashes[k])
+    if not per_k:
+        raise ValueError("Fingerprint'lerin ortak k değeri yok")
+
+    if weights is None:
+        weights = {k: 1.0 for k in per_k}
+    total_weight = sum(weights.get(k, 0.0) for k in per_k)
+    if total_weight <= 0:
+        raise ValueError("Ortak k değerleri için ağırlık toplamı pozitif olmalı")
+    blended = sum(per_k[k] * weights.get(k, 0.0) for k in per_k) / total_weight
+
+    return {"per_k": per_k, "blended": blended}
+
+
+def multi_k_pairs(mfps, threshold_percent: float = 0.0, weights=None):
+    """
+    Tüm i<j çiftleri için compare_multi_k sonucu; blend skoru (yüzde)
+    threshold_percent altında kalan çiftler atlanır.
+
+    Dönüş: (i, j, {"per_k": ..., "blended": ...}) üreteci
+    """
+    for i in range(len(mfps)):
+        for j in range(i + 1, len(mfps)):
+            scores = compare_multi_k(mfps[i], mfps[j], weights=weights)
+            if scores["blended"] * 100.0 >= threshold_percent:
+                yield i, j, scores
+
+
+def compute_multi_k_similarities(students: dict, k_values=DEFAULT_K_VALUES, threshold_percent: float = 0.0,
+                                 weights=None):
+    """
+    k taraması için: öğrenciler bir kere yüklenir, her çift tek geçişte
+    tüm k değerleri için skorlanır.
+
+    Dönüş:
+        {
+          ("ogrenci1", "ogrenci2"): {"per_k": {2: 0.91, ...}, "blended": 0.83},
+          ...
+        }
+    """
+    names = sorted(students.keys())
+    mfps = get_multi_k_fingerprints(students, names, k_values)
+    return {
+        (names[i], names[j]): scores
+        for i, j, scores in multi_k_pairs(mfps, threshold_percent, weights=weights)
+    }
+
+
+def score_named_pairs(students: dict, pairs, k_values=DEFAULT_K_VALUES, weights=None):
+    """
+    Verilen (ogrenci1, ogrenci2) çiftlerini (ör. raporlanan eşik üstü çiftler)
+    tüm k değerleri için skorlar. MultiKFingerprint'ler sadece çiftlerde geçen
+    öğrenciler için bir kere üretilir.
+
+    Dönüş: compute_multi_k_similarities ile aynı biçimde {(ogrenci1, ogrenci2): scores}
+    """
+    pairs = list(pairs)
+    names = sorted({name for pair in pairs for name in pair})
+    mfps = dict(zip(names, get_multi_k_fingerprints(students, names, k_values)))
+    return {(a, b): compare_multi_k(mfps[a], mfps[b], weights=weights) for a, b in pairs}
@@ -0,0 +1,94 @@
+import time
+from collections import defaultdict
+
+from plagiarism_core import jaccard_similarity
+
+
+def build_inverted_index(fingerprints, max_postings=None):
+    """
+    Opcode n-gram -> o n-gram'ı içeren öğrencilerin indeks listesi.
+
+    fingerprints: Fingerprint listesi (indeksler bu listedeki sıradır).
+    max_postings: Bir n-gram bundan fazla öğrencide geçiyorsa "stop-gram"
+                  sayılır ve indekse alınmaz (ör. MOV MOV MOV kalıbı).
+                  int ise öğrenci sayısı, 0-1 arası float ise oran.
+
+    Dönüş: (index, stop_grams)
+        index      -> {ngram: [i1, i2, ...]}  (artan sırada)
+        stop_grams -> indekse alınmayan n-gram kümesi
+    """
+    postings = defaultdict(list)
+    for idx, fp in enumerate(fingerprints):
+        for gram in fp.ngrams:
+            postings[gram].append(idx)
+
+    limit = _postings_limit(max_postings, len(fingerprints))
+    stop_grams = set()
+    if limit is not None:
+        for gram in [g for g, ids in postings.items() if len(ids) > limit]:
+            stop_grams.add(gram)
+            del postings[gram]
+
+    return dict(postings), stop_grams
+
+
+def _postings_limit(max_postings, n):
+    if max_postings is None:
+        return None
+    if isinstance(max_postings, float) and 0.0 < max_postings <= 1.0:
+        return max(1, int(max_postings * n))
+    return int(max_postings)
+
+
+def candidate_intersections(index, n):
+    """
+    Posting listelerinden aday çiftleri ve ortak n-gram sayılarını biriktirir.
+    Sadece en az bir n-gram paylaşan çiftlere dokunulur.
+
+    Dönüş: {i * n + j: |A ∩ B|}  (i < j)
+    """
+    counts = defaultdict(int)
+    for ids in index.values():
+        if len(ids) < 2:
+            continue
+        for a_pos in range(len(ids) - 1):
+            base = ids[a_pos] * n
+            for b in ids[a_pos + 1:]:
+                counts[base + b] += 1
+    return counts
+
+
+def index_pairs(fingerprints, threshold_percent: float, max_postings=None, stats=None):
+    """
+    Inverted index ile eşik üstü çiftleri üretir: (i, j, sim_percent), (i, j) sırasında.
+
+    Stop-gram yoksa sonuç brute-force döngüsüyle birebir aynıdır: Jaccard için
+    |A ∩ B| posting'lerden, |A| ve |B| fingerprint'ten gelir.
+    Stop-gram varsa adaylar tam kümelerle yeniden doğrulanır; ama sadece
+    stop-gram paylaşan çiftler aday olamayacağı için sonuç yaklaşık olur.
+
+    stats verilirse "candidates", "stop_grams" ve "candidate_seconds" yazılır.
+    """
+    n = len(fingerprints)
+    start = time.perf_counter()
+    index, stop_grams = build_inverted_index(fingerprints, max_postings=max_postings)
+    counts = candidate_intersections(index, n)
+    if stats is not None:
+        stats["candidates"] = len(counts)
+        stats["stop_grams"] = len(stop_grams)
+        stats["candidate_seconds"] = time.perf_counter() - start
+
+    for key in sorted(counts):
+        i, j = divmod(key, n)
+        fp1 = fingerprints[i]
+        fp2 = fingerprints[j]
+
+        if stop_grams:
+            sim = jaccard_similarity(fp1.ngrams, fp2.ngrams)
+        else:
+            inter = counts[key]
+            sim = inter / (fp1.n_ngrams + fp2.n_ngrams - inter)
+
+        sim_percent = sim * 100.0
+        if sim_percent >= threshold_percent:
+            yield i, j, sim_percent
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from array import array
+
+from asm_processing import NORMALIZER_VERSION
+from opcode_table import MAX_PACKED_K, StoredOpcodeIds, split_segments
+
+
+DEFAULT_CACHE_FILE = "normalize_cache.sqlite"
+
+# Saklanan opcode / n-gram biçimi (4: dosya başına opcode ID listeleri + paketlenmiş
+# n-gram tamsayıları, bilinmeyen mnemonic ID'leri cache'in kendi tablosundan).
+# Değişince eski kayıtlar okunmaz ve evict() ile silinir.
+CACHE_FORMAT = "4"
+
+# Bu kadar gündür kullanılmayan kayıtlar evict() ile silinir
+DEFAULT_MAX_AGE_DAYS = 60
+
+# Yazmalar (put / last_used güncellemesi) en geç bu kadar saniyede bir commit edilir;
+# izleme daemon'u ile toplu çalıştırma aynı cache'i paylaşırken yazma kilidi
+# uzun süre tutulmaz, süreç öldürülürse en fazla bu kadarlık kayıt kaybolur.
+COMMIT_INTERVAL = 0.5
+
+# Başka bir süreç yazarken kilidin bırakılması için beklenen süre (saniye);
+# aşılırsa sqlite3.OperationalError ("database is locked") yükselir
+DEFAULT_TIMEOUT = 5.0
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class NormalizeCache:
+    """
+    Normalize edilmiş teslimlerin SQLite üzerinde kalıcı cache'i.
+
+    Anahtar: (dosya içeriğinin SHA-256'sı, NORMALIZER_VERSION + CACHE_FORMAT, n-gram k)
+    Değer:   normalize satırlar, dosya başına opcode ID dizileri ve paketlenmiş n-gram kümesi.
+
+    Bilinmeyen mnemonic'lerin ID'leri çalıştırmaya özgü olduğundan cache
+    kendi (mnemonic, ID) tablosunu saklar (mnemonics, sadece sona eklenir);
+    süreç tablosuyla çakışan ID'ler okurken / yazarken çevrilir
+    (bkz. opcode_table.StoredOpcodeIds). Çeviri gerekip n-gram'ları hash'li
+    (k > 4) kayıtlar çevrilemediği için kullanılmaz.
+
+    Aynı içerikli dosya tekrar çalıştırmada okunup normalize edilmez;
+    sadece yeni / değişen dosyalar için iş yapılır.
+
+    Yükleyici thread'lerinden aynı anda kullanılabilir (bağlantı bir kilitle korunur).
+    Birden fazla süreç (ör. izleme daemon'u + toplu çalıştırma) aynı dosyayı
+    paylaşabilir: yazmalar COMMIT_INTERVAL'da bir (ve commit() / close() ile)
+    commit edilir, kilitli veritabanında timeout saniye beklenir. Bekleme
+    aşılırsa get / put sqlite3.Error yükseltir; çağıran cache'siz devam edebilir
+    (bkz. student_io.build_student_record).
+    """
+
+    def __init__(self, cache_dir: str, version: str = NORMALIZER_VERSION, timeout: float = DEFAULT_TIMEOUT):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, DEFAULT_CACHE_FILE)
+        self.version = f"{version}/{CACHE_FORMAT}"
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._dirty_since = None  # commit edilmemiş ilk yazmanın zamanı
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=timeout)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                sha256    TEXT NOT NULL,
+                version   TEXT NOT NULL,
+                k         INTEGER NOT NULL,
+                norm      TEXT NOT NULL,
+                opcodes   TEXT NOT NULL,
+                ngrams    TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (sha256, version, k)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS mnemonics (name TEXT PRIMARY KEY, opcode_id INTEGER NOT NULL UNIQUE)"
+        )
+        self._conn.commit()
+        self.opcode_ids = StoredOpcodeIds(
+            self._conn.execute("SELECT name, opcode_id FROM mnemonics ORDER BY opcode_id")
+        )
+
+    def get(self, sha256: str, k: int):
+        """Dönüş: (norm, opcodes, ngrams, breaks) ya da kayıt yoksa None."""
+        with self._lock:
+            row = None
+            if self.opcode_ids.identity or k <= MAX_PACKED_K:
+                row = self._conn.execute(
+                    "SELECT norm, opcodes, ngrams FROM entries WHERE sha256 = ? AND version = ? AND k = ?",
+                    (sha256, self.version, k),
+                ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE entries SET last_used = ? WHERE sha256 = ? AND version = ? AND k = ?",
+                (time.time(), sha256, self.version, k),
+            )
+            self._wrote()
+            self.hits += 1
+        norm = json.loads(row[0])
+        opcodes = array("H")
+        breaks = []
+        for segment in json.loads(row[1]):
+            if opcodes:
+                breaks.append(len(opcodes))
+            opcodes.extend(segment)
+        opcodes = self.opcode_ids.process_opcodes(opcodes)
+        ngrams = self.opcode_ids.process_ngrams(set(json.loads(row[2])), k)
+        return norm, opcodes, ngrams, tuple(breaks)
+
+    def put(self, sha256: str, k: int, norm, opcodes, ngrams, breaks=()):
+        with self._lock:
+            added = self.opcode_ids.register(opcodes)
+            if added:
+                try:
+                    self._conn.executemany("INSERT INTO mnemonics VALUES (?, ?)", added)
+                except sqlite3.Error:
+                    self.opcode_ids.unregister(added)
+                    raise
+            stored_ngrams = self.opcode_ids.store_ngrams(ngrams, k)
+            if stored_ngrams is None:
+                return  # hash'li n-gram'lar cache'in ID'lerine çevrilemiyor
+            segments = split_segments(self.opcode_ids.store_opcodes(opcodes), breaks)
+            row = (
+                sha256,
+                self.version,
+                k,
+                json.dumps(norm, ensure_ascii=False),
+                json.dumps([segment.tolist() for segment in segments]),
+                json.dumps(sorted(stored_ngrams)),
+                time.time(),
+            )
+            self._conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+            self._wrote()
+
+    def _wrote(self):
+        # Kilit tutulurken çağrılır
+        now = time.monotonic()
+        if self._dirty_since is None:
+            self._dirty_since = now
+        elif now - self._dirty_since >= COMMIT_INTERVAL:
+            self._conn.commit()
+            self._dirty_since = None
+
+    def commit(self):
+        """Bekleyen yazmaları hemen commit eder (yazma kilidi bırakılır)."""
+        with self._lock:
+            self._conn.commit()
+            self._dirty_since = None
+
+    def evict(self, max_age_days: float = DEFAULT_MAX_AGE_DAYS):
+        """
+        Eski normalizer sürümüne / cache biçimine ait ve max_age_days gündür kullanılmayan
+        kayıtları siler. Dönüş: silinen kayıt sayısı.
+        """
+        cutoff = time.time() - max_age_days * 86400
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM entries WHERE version != ? OR last_used < ?",
+                (self.version, cutoff),
+            )
+            self._conn.commit()
+            self._dirty_since = None
+        return cur.rowcount
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.commit()
+            finally:
+                self._conn.close()
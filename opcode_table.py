@@ -0,0 +1,286 @@
+import hashlib
+import threading
+from array import array
+
+
+# MSP430 / MSP430X mnemonic'leri (çekirdek + emulated komutlar).
+# Sıra değiştirilmemeli: ID'ler bu sıradan gelir ve cache'te / kalıcı
+# fingerprint'lerde saklanır. Yeni mnemonic sadece sona eklenmeli.
+MSP430_MNEMONICS = (
+    # Çift operandlı
+    "MOV", "ADD", "ADDC", "SUB", "SUBC", "CMP", "DADD", "BIT", "BIC", "BIS", "XOR", "AND",
+    # Tek operandlı
+    "RRC", "RRA", "PUSH", "SWPB", "CALL", "RETI", "SXT",
+    # Atlamalar
+    "JMP", "JC", "JNC", "JZ", "JNZ", "JEQ", "JNE", "JN", "JGE", "JL", "JHS", "JLO",
+    # Emulated
+    "ADC", "DADC", "DEC", "DECD", "INC", "INCD", "SBC", "INV", "RLA", "RLC", "CLR",
+    "CLRC", "CLRN", "CLRZ", "POP", "SETC", "SETN", "SETZ", "TST", "BR", "DINT", "EINT",
+    "NOP", "RET",
+    # MSP430X
+    "MOVA", "ADDA", "SUBA", "CMPA", "CALLA", "RETA", "BRA", "PUSHM", "POPM",
+    "RRCM", "RRAM", "RLAM", "RRUM", "MOVX", "ADDX", "ADDCX", "SUBX", "SUBCX", "CMPX",
+    "DADDX", "BITX", "BICX", "BISX", "XORX", "ANDX", "RRCX", "RRAX", "RRUX", "SWPBX",
+    "SXTX", "PUSHX", "POPX", "CLRX", "INCX", "DECX", "INVX", "TSTX", "RLAX", "RLCX",
+)
+
+# Tabloda olmayan mnemonic'ler (makrolar, yazım hataları, ':' unutulmuş label'lar...)
+# bu aralıktan ilk görülme sırasıyla ID alır
+_UNKNOWN_BASE = 0x8000
+_UNKNOWN_LAST = 0xFFFF
+
+# k bu değere kadar olan n-gram'lar 16 bit/opcode ile 64-bit tamsayıya birebir paketlenir
+MAX_PACKED_K = 4
+
+
+class OpcodeTable:
+    """
+    Mnemonic <-> 16-bit opcode ID eşlemesi.
+
+    Bilinen mnemonic'ler tablodaki sırayla 1'den başlayan ID'leri alır (0 ayrılmış).
+    Bilinmeyenler ilk görüldüklerinde 0x8000-0xFFFF aralığındaki ilk boş ID'yi
+    alır (intern); iki farklı mnemonic hiçbir zaman aynı ID'yi paylaşmaz.
+    Bu ID'ler çalıştırmaya özgüdür: kalıcı depolar (normalize cache, arşiv)
+    kendi tablolarını saklar ve açılırken adopt ile süreç tablosuna alır
+    (bkz. StoredOpcodeIds). 32768 bilinmeyen mnemonic'ten sonrası ValueError verir.
+
+    Yükleyici thread'lerinden aynı anda kullanılabilir.
+    """
+
+    def __init__(self, mnemonics=MSP430_MNEMONICS):
+        self._ids = {name: idx for idx, name in enumerate(mnemonics, start=1)}
+        self._names = {idx: name for name, idx in self._ids.items()}
+        self._next_unknown = _UNKNOWN_BASE
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def id_of(self, mnemonic: str) -> int:
+        opcode_id = self._ids.get(mnemonic)
+        if opcode_id is None:
+            with self._lock:
+                opcode_id = self._intern(mnemonic)
+        return opcode_id
+
+    def adopt(self, mnemonic: str, stored_id: int) -> int:
+        """
+        Bir depoda stored_id ile saklanmış bilinmeyen mnemonic'i tabloya alır.
+        Mnemonic süreçte henüz yoksa ve stored_id boşsa aynı ID kullanılır;
+        aksi halde süreçteki (gerekirse yeni verilen) ID döner.
+        """
+        with self._lock:
+            opcode_id = self._ids.get(mnemonic)
+            if opcode_id is not None:
+                return opcode_id
+            if _UNKNOWN_BASE <= stored_id <= _UNKNOWN_LAST and stored_id not in self._names:
+                self._ids[mnemonic] = stored_id
+                self._names[stored_id] = mnemonic
+                return stored_id
+            return self._intern(mnemonic)
+
+    def _intern(self, mnemonic: str) -> int:
+        # Kilit tutulurken çağrılır
+        opcode_id = self._ids.get(mnemonic)
+        if opcode_id is not None:
+            return opcode_id
+        opcode_id = self._next_unknown
+        while opcode_id in self._names:
+            opcode_id += 1
+        if opcode_id > _UNKNOWN_LAST:
+            raise ValueError(f"Bilinmeyen mnemonic ID aralığı doldu, '{mnemonic}' kodlanamıyor")
+        self._next_unknown = opcode_id + 1
+        self._ids[mnemonic] = opcode_id
+        self._names[opcode_id] = mnemonic
+        return opcode_id
+
+    def name_of(self, opcode_id: int) -> str:
+        return self._names.get(opcode_id, f"?{opcode_id:04X}")
+
+    def encode(self, mnemonics) -> array:
+        """["MOV", "ADD", ...] -> array('H', [1, 2, ...])"""
+        ids = self._ids
+        id_of = self.id_of
+        return array("H", [ids.get(m) or id_of(m) for m in mnemonics])
+
+    def decode(self, opcode_ids):
+        return [self.name_of(opcode_id) for opcode_id in opcode_ids]
+
+
+# Bütün fingerprint'lerin paylaştığı tablo
+OPCODE_TABLE = OpcodeTable()
+
+
+class StoredOpcodeIds:
+    """
+    Kalıcı bir deponun (normalize cache, arşiv) sadece sona eklenen bilinmeyen
+    mnemonic tablosu ile süreç tablosu (OPCODE_TABLE) arasındaki çeviri.
+
+    items: depodaki (mnemonic, ID) satırları. Depo açılırken bunlar adopt ile
+    süreç tablosuna alınır; bir ID süreçte başka bir mnemonic'e verilmişse
+    (ör. yükleme sırasında görülmüş) mnemonic süreçte farklı bir ID alır ve
+    iki yönlü çeviri tutulur. Çeviri yoksa (identity) depodaki veri olduğu gibi
+    kullanılır. Depoya yazmadan önce register ile yeni mnemonic'ler depo
+    tablosuna eklenir.
+    """
+
+    def __init__(self, items=(), table=None):
+        self.table = OPCODE_TABLE if table is None else table
+        self._stored = {}
+        self._taken = set()
+        self._next = _UNKNOWN_BASE
+        self.to_process = {}  # depo ID'si -> süreç ID'si (farklı olanlar)
+        self.to_store = {}    # süreç ID'si -> depo ID'si (farklı olanlar)
+        for mnemonic, stored_id in items:
+            self._add(mnemonic, stored_id, self.table.adopt(mnemonic, stored_id))
+
+    @property
+    def identity(self):
+        return not self.to_process
+
+    def _add(self, mnemonic, stored_id, process_id):
+        self._stored[mnemonic] = stored_id
+        self._taken.add(stored_id)
+        if stored_id != process_id:
+            self.to_process[stored_id] = process_id
+            self.to_store[process_id] = stored_id
+
+    def register(self, opcode_ids):
+        """
+        opcode_ids'deki (süreç ID'leri) depoda olmayan bilinmeyen mnemonic'lere
+        depo ID'si verir. Dönüş: depoya eklenmesi gereken [(mnemonic, ID), ...]
+        """
+        added = []
+        for process_id in sorted({opcode_id for opcode_id in opcode_ids if opcode_id >= _UNKNOWN_BASE}):
+            mnemonic = self.table.name_of(process_id)
+            if mnemonic in self._stored:
+                continue
+            stored_id = process_id
+            if stored_id in self._taken:
+                stored_id = self._next
+                while stored_id in self._taken:
+                    stored_id += 1
+                if stored_id > _UNKNOWN_LAST:
+                    raise ValueError(f"Depodaki bilinmeyen mnemonic ID aralığı doldu, '{mnemonic}' saklanamıyor")
+                self._next = stored_id + 1
+            self._add(mnemonic, stored_id, process_id)
+            added.append((mnemonic, stored_id))
+        return added
+
+    def unregister(self, added):
+        """register ile eklenip depoya yazılamayan satırları geri alır."""
+        for mnemonic, stored_id in added:
+            del self._stored[mnemonic]
+            self._taken.discard(stored_id)
+            process_id = self.to_process.pop(stored_id, None)
+            if process_id is not None:
+                del self.to_store[process_id]
+
+    def process_opcodes(self, opcode_ids) -> array:
+        return _remap_ids(opcode_ids, self.to_process)
+
+    def store_opcodes(self, opcode_ids) -> array:
+        return _remap_ids(opcode_ids, self.to_store)
+
+    def process_ngrams(self, grams, k=3):
+        """Depodaki paketlenmiş n-gram'lar süreç ID'leriyle; hash'li n-gram'lar (k > 4) çevrilemez -> None."""
+        return remap_ngrams(grams, self.to_process, k)
+
+    def store_ngrams(self, grams, k=3):
+        return remap_ngrams(grams, self.to_store, k)
+
+
+def _remap_ids(opcode_ids, mapping) -> array:
+    if not mapping:
+        return opcode_ids
+    return array("H", [mapping.get(opcode_id, opcode_id) for opcode_id in opcode_ids])
+
+
+def remap_ngrams(grams, mapping, k=3):
+    """
+    Paketlenmiş n-gram'ların opcode ID'lerini mapping ile değiştirir (kümenin
+    boyu değişmez). k > MAX_PACKED_K için n-gram'lar hash olduğundan, çeviri
+    gerekiyorsa None döner.
+    """
+    if not mapping:
+        return grams
+    if k > MAX_PACKED_K:
+        return None
+    # Sadece bilinmeyen (0x8000+) ID içeren n-gram'lar çevrilir
+    unknown_bits = sum(_UNKNOWN_BASE << (16 * pos) for pos in range(k))
+    remapped = set()
+    for gram in grams:
+        if gram & unknown_bits:
+            value = 0
+            for pos in range(k - 1, -1, -1):
+                opcode_id = (gram >> (16 * pos)) & 0xFFFF
+                value = (value << 16) | mapping.get(opcode_id, opcode_id)
+            gram = value
+        remapped.add(gram)
+    return remapped
+
+
+def encode_opcodes(mnemonics) -> array:
+    return OPCODE_TABLE.encode(mnemonics)
+
+
+def decode_opcodes(opcode_ids):
+    return OPCODE_TABLE.decode(opcode_ids)
+
+
+def split_segments(opcode_ids, breaks=()):
+    """
+    Opcode dizisini breaks konumlarından (birden fazla dosyalı teslimlerde
+    ikinci, üçüncü... dosyanın başladığı konumlar) dosya başına dilimlere böler.
+    """
+    if not breaks:
+        return [opcode_ids]
+    bounds = (0, *breaks, len(opcode_ids))
+    return [opcode_ids[start:stop] for start, stop in zip(bounds, bounds[1:])]
+
+
+def pack_ngrams(opcode_ids, k=3, breaks=()):
+    """
+    Opcode ID dizisinin k-gram'larını 64-bit tamsayı kümesi olarak döner.
+    breaks verilirse dizi o konumlardan bölünür, n-gram'lar dilim sınırını aşmaz
+    (dilimlerin kümelerinin birleşimi).
+
+    k <= MAX_PACKED_K: her ID 16 bit, n-gram birebir paketlenir (çakışma yok).
+    k >  MAX_PACKED_K: pencerenin baytlarının 8 baytlık blake2b hash'i
+                       (çalıştırmalar arasında kararlı, çakışma olasılığı ~2^-64).
+    """
+    if breaks:
+        grams = set()
+        for segment in split_segments(opcode_ids, breaks):
+            grams |= pack_ngrams(segment, k=k)
+        return grams
+
+    n = len(opcode_ids)
+    if n < k:
+        return set()
+
+    if k <= MAX_PACKED_K:
+        grams = set()
+        mask = (1 << (16 * k)) - 1
+        value = 0
+        for pos, opcode_id in enumerate(opcode_ids):
+            value = ((value << 16) | opcode_id) & mask
+            if pos >= k - 1:
+                grams.add(value)
+        return grams
+
+    ids = opcode_ids if isinstance(opcode_ids, array) else array("H", opcode_ids)
+    data = ids.tobytes()
+    blake2b = hashlib.blake2b
+    return {
+        int.from_bytes(blake2b(data[2 * i:2 * (i + k)], digest_size=8).digest(), "little")
+        for i in range(n - k + 1)
+    }
+
+
+def unpack_ngram(gram: int, k=3):
+    """pack_ngrams (k <= MAX_PACKED_K) tamsayısından mnemonic tuple'ı; raporlama / debug için."""
+    if k > MAX_PACKED_K:
+        raise ValueError(f"k={k} için n-gram'lar hash'lenir, geri açılamaz")
+    ids = [(gram >> (16 * (k - 1 - pos))) & 0xFFFF for pos in range(k)]
+    return tuple(decode_opcodes(ids))
@@ -0,0 +1,185 @@
+import csv
+import json
+from array import array
+
+
+class PairStore:
+    """
+    Eşik üstü çiftlerin kompakt, kanonik deposu.
+
+    Öğrenciler sıralı names listesindeki indeksleriyle tutulur; her çift
+    (i < j) sadece bir kere, üç paralel dizide saklanır:
+        left  -> array('I')  i
+        right -> array('I')  j
+        score -> array('d')  benzerlik yüzdesi
+
+    A→B / B→A çift kaydı ve tuple listeleri yerine kenar başına ~16 byte tutar.
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.left = array('I')
+        self.right = array('I')
+        self.score = array('d')
+        self._sorted = True
+
+    @classmethod
+    def from_pairs(cls, names, pairs):
+        """(i, j, sim_percent) üreten bir iterable'dan depo oluşturur."""
+        store = cls(names)
+        for i, j, sim_percent in pairs:
+            store.add(i, j, sim_percent)
+        return store
+
+    def add(self, i: int, j: int, sim_percent: float):
+        if i > j:
+            i, j = j, i
+        if self.left and (i, j) < (self.left[-1], self.right[-1]):
+            self._sorted = False
+        self.left.append(i)
+        self.right.append(j)
+        self.score.append(sim_percent)
+
+    def __len__(self):
+        return len(self.left)
+
+    def _ensure_sorted(self):
+        if self._sorted:
+            return
+        order = sorted(range(len(self.left)), key=lambda e: (self.left[e], self.right[e]))
+        self.left = array('I', (self.left[e] for e in order))
+        self.right = array('I', (self.right[e] for e in order))
+        self.score = array('d', (self.score[e] for e in order))
+        self._sorted = True
+
+    def iter_pairs(self):
+        """(i, j, sim_percent) çiftlerini (i, j) sırasında üretir."""
+        self._ensure_sorted()
+        return zip(self.left, self.right, self.score)
+
+    def iter_named_pairs(self):
+        names = self.names
+        for i, j, sim_percent in self.iter_pairs():
+            yield names[i], names[j], sim_percent
+
+    def degrees(self):
+        """Her öğrencinin eşik üstü eşleşme sayısı (names sırasında)."""
+        counts = array('I', bytes(4 * len(self.names)))
+        for i in self.left:
+            counts[i] += 1
+        for j in self.right:
+            counts[j] += 1
+        return counts
+
+    def adjacency(self):
+        """
+        Öğrenci başına kenar listeleri (CSR): idx öğrencisinin kenar indeksleri
+        edges[offsets[idx]:offsets[idx + 1]], diğer öğrencinin indeksine göre artan.
+        Dönüş: (offsets, edges)  ikisi de array('I')
+        """
+        self._ensure_sorted()
+        offsets = array('I', bytes(4 * (len(self.names) + 1)))
+        for idx, degree in enumerate(self.degrees()):
+            offsets[idx + 1] = offsets[idx] + degree
+
+        fill = offsets[:-1]
+        edges = array('I', bytes(8 * len(self.left)))
+        for e, (i, j) in enumerate(zip(self.left, self.right)):
+            edges[fill[i]] = e
+            fill[i] += 1
+            edges[fill[j]] = e
+            fill[j] += 1
+        return offsets, edges
+
+    def to_results(self):
+        """Eski simetrik {ogrenci: [(diger, yuzde), ...]} sözlüğünü üretir."""
+        results = {name: [] for name in self.names}
+        for s1, s2, sim_percent in self.iter_named_pairs():
+            results[s1].append((s2, sim_percent))
+            results[s2].append((s1, sim_percent))
+        return results
+
+
+def write_text_report(store: PairStore, output_path: str, threshold_percent: float):
+    """
+    save_results ile aynı formatta text raporu, simetrik sözlük kurmadan
+    doğrudan depodan akıtarak yazar.
+    Dönüş: eşik üstü çift varsa True
+    """
+    names = store.names
+    counts = store.degrees()
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(f"Plagiarism results (threshold = {threshold_percent:.1f}%)\n")
+        f.write("=====================================================\n\n")
+
+        f.write("Summary: number of matches per student (above threshold)\n")
+        f.write("--------------------------------------------------------\n")
+
+        any_flagged = False
+        for idx, student in enumerate(names):
+            if counts[idx] > 0:
+                any_flagged = True
+                f.write(f"{student}: {counts[idx]} match(es)\n")
+
+        if not any_flagged:
+            f.write("\nNo pairs above the threshold were found.\n")
+            return False
+
+        f.write("\n\n")
+
+        f.write("Detailed similar pairs (each pair listed only once)\n")
+        f.write("--------------------------------------------------------\n\n")
+
+        # Kenarlar (i, j) sırasında: her öğrencinin "yeni" çiftleri j > i olanlardır
+        current = None
+        group = []
+        for i, j, sim_percent in store.iter_pairs():
+            if i != current:
+                _write_group(f, names, current, group)
+                current = i
+                group = []
+            group.append((j, sim_percent))
+        _write_group(f, names, current, group)
+    return True
+
+
+def _write_group(f, names, i, group):
+    if not group:
+        return
+    f.write(f"Student: {names[i]}\n")
+    for j, sim_percent in sorted(group, key=lambda x: -x[1]):
+        f.write(f"  -> Similar to: {names[j]}   ({sim_percent:.1f}%)\n")
+    f.write("\n")
+
+
+def write_csv(store: PairStore, output_path: str, multi_k=None, k_values=()):
+    """
+    multi_k ({(a, b): {"per_k": ..., "blended": ...}}, bkz. multi_k.score_named_pairs)
+    verilirse her k için ve blend skoru için birer yüzde sütunu eklenir.
+    """
+    with open(output_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        header = ["student_a", "student_b", "similarity_percent"]
+        if multi_k is not None:
+            header += [f"k{k}_percent" for k in k_values] + ["blended_percent"]
+        writer.writerow(header)
+        for s1, s2, sim_percent in store.iter_named_pairs():
+            row = [s1, s2, f"{sim_percent:.4f}"]
+            if multi_k is not None:
+                scores = multi_k[(s1, s2)]
+                row += [f"{scores['per_k'][k] * 100.0:.4f}" for k in k_values]
+                row.append(f"{scores['blended'] * 100.0:.4f}")
+            writer.writerow(row)
+
+
+def write_jsonl(store: PairStore, output_path: str, multi_k=None):
+    """multi_k verilirse satırlara "per_k" ({k: yüzde}) ve "blended" (yüzde) eklenir."""
+    with open(output_path, "w", encoding="utf-8") as f:
+        for s1, s2, sim_percent in store.iter_named_pairs():
+            row = {"a": s1, "b": s2, "similarity": sim_percent}
+            if multi_k is not None:
+                scores = multi_k[(s1, s2)]
+                row["per_k"] = {str(k): value * 100.0 for k, value in scores["per_k"].items()}
+                row["blended"] = scores["blended"] * 100.0
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
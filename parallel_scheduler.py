@@ -0,0 +1,97 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Worker süreçlerinde initializer ile bir kere kurulan veri
+_WORKER_NGRAMS = None
+_WORKER_THRESHOLD = None
+
+
+def make_tiles(n: int, tile_size: int):
+    """
+    Üst üçgen (i < j) çift uzayını tile_size x tile_size karelere böler.
+
+    Dönüş: [(row_start, row_stop, col_start, col_stop), ...]
+    Köşegen üzerindeki kareler yarım dolu olur, diğerleri tam dolu.
+    """
+    tiles = []
+    for row_start in range(0, n, tile_size):
+        row_stop = min(row_start + tile_size, n)
+        for col_start in range(row_start, n, tile_size):
+            col_stop = min(col_start + tile_size, n)
+            tiles.append((row_start, row_stop, col_start, col_stop))
+    return tiles
+
+
+def choose_tile_size(n: int, workers: int, tiles_per_worker: int = 8):
+    """Her worker'a yaklaşık tiles_per_worker kadar iş birimi düşecek kare boyutu."""
+    total_pairs = n * (n - 1) // 2
+    target_tiles = max(1, workers * tiles_per_worker)
+    pairs_per_tile = max(1, total_pairs // target_tiles)
+    return max(1, int(pairs_per_tile ** 0.5))
+
+
+def _tile_pairs(tile):
+    row_start, row_stop, col_start, col_stop = tile
+    return sum(max(0, col_stop - max(col_start, i + 1)) for i in range(row_start, row_stop))
+
+
+def _init_worker(ngram_sets, threshold_percent):
+    global _WORKER_NGRAMS, _WORKER_THRESHOLD
+    _WORKER_NGRAMS = ngram_sets
+    _WORKER_THRESHOLD = threshold_percent
+
+
+def _score_tile(tile):
+    row_start, row_stop, col_start, col_stop = tile
+    ngrams = _WORKER_NGRAMS
+    threshold_percent = _WORKER_THRESHOLD
+
+    found = []
+    for i in range(row_start, row_stop):
+        set_i = ngrams[i]
+        for j in range(max(col_start, i + 1), col_stop):
+            set_j = ngrams[j]
+            if not set_i and not set_j:
+                sim = 0.0
+            else:
+                inter = len(set_i & set_j)
+                sim = inter / (len(set_i) + len(set_j) - inter)
+
+            sim_percent = sim * 100.0
+            if sim_percent >= threshold_percent:
+                found.append((i, j, sim_percent))
+    return found
+
+
+def parallel_pairs(fingerprints, threshold_percent: float, workers=None, tile_size=None, progress=None):
+    """
+    Tüm i<j çiftlerini süreç havuzunda, karelere (tile) bölünmüş iş birimleriyle skorlar.
+
+    Worker'lara sadece n-gram kümeleri, havuz kurulurken initializer ile bir kere
+    gönderilir; iş birimi olarak sadece kare sınırları gider. Kare sonuçları
+    (i, j) sırasına göre birleştirilir, böylece çıktı seri döngüyle birebir aynıdır.
+    progress verilirse her kare bittiğinde o karedeki çift sayısı kadar ilerletilir.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    n = len(fingerprints)
+    if tile_size is None:
+        tile_size = choose_tile_size(n, workers)
+
+    ngram_sets = [fp.ngrams for fp in fingerprints]
+    tiles = make_tiles(n, tile_size)
+
+    found = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(ngram_sets, threshold_percent),
+    ) as pool:
+        for tile, tile_found in zip(tiles, pool.map(_score_tile, tiles)):
+            found.extend(tile_found)
+            if progress is not None:
+                progress.advance(_tile_pairs(tile))
+
+    found.sort(key=lambda item: (item[0], item[1]))
+    return found
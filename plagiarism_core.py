@@ -1,4 +1,8 @@
-import difflib
+from array import array
+from collections.abc import Mapping
+
+from opcode_table import encode_opcodes, decode_opcodes, pack_ngrams
+from seq_similarity import get_sequence_engine
 
 def extract_opcodes(norm_lines):
     """
@@ -25,6 +29,22 @@ def extract_opcodes(norm_lines):
     return opcodes
 
 
+def extract_opcodes_from_tokens(token_lines):
+    """
+    extract_opcodes'un tokenize_asm çıktısı üzerinde çalışan hali:
+    satırlar tekrar birleştirilip bölünmez, doğrudan ilk token okunur.
+    """
+    opcodes = []
+    for tokens in token_lines:
+        if not tokens:
+            continue
+        first = tokens[0]
+        if first.startswith('#BLOCK_START') or first.startswith('.'):
+            continue
+        opcodes.append(first.split('.')[0])  # "ADD.W" -> "ADD"
+    return opcodes
+
+
 def make_ngrams(seq, k=3):
     if len(seq) < k:
         return set()
@@ -39,27 +59,133 @@ def jaccard_similarity(set_a, set_b):
     return intersection / union
 
 
-def compare_normalized(norm1, norm2, k=3):
+class Fingerprint:
     """
-    İki normalize edilmiş kod listesi için farklı benzerlik skorları döner.
-    Threshold için -> opcode_n_gram_jaccard.
+    Tek bir teslimin karşılaştırmada kullanılan, bir kere hesaplanan özeti.
+
+    - norm:     normalize_asm çıktısı (satır listesi)
+    - opcodes:  opcode ID dizisi, array('H') (bkz. opcode_table; isimler için opcode_names())
+    - ngrams:   64-bit tamsayıya paketlenmiş opcode n-gram kümesi (k uzunluklu)
+    - breaks:   birden fazla dosyalı teslimde sonraki dosyaların opcodes içindeki
+                başlangıç konumları; n-gram'lar dosya sınırını aşmaz
+    - k:        n-gram uzunluğu
+    - n_opcodes / n_ngrams: kardinaliteler
+
+    opcodes / ngrams önceden hesaplanmışsa (ör. cache'ten) verilebilir;
+    opcodes mnemonic listesi olarak da verilebilir, ID'lere çevrilir.
+    """
+
+    __slots__ = ("norm", "k", "opcodes", "breaks", "ngrams", "n_opcodes", "n_ngrams")
+
+    def __init__(self, norm, k=3, opcodes=None, ngrams=None, breaks=()):
+        self.norm = norm
+        self.k = k
+        if opcodes is None:
+            opcodes = extract_opcodes(norm)
+        self.opcodes = opcodes if isinstance(opcodes, array) else encode_opcodes(opcodes)
+        self.breaks = tuple(breaks)
+        self.ngrams = pack_ngrams(self.opcodes, k=k, breaks=self.breaks) if ngrams is None else ngrams
+        self.n_opcodes = len(self.opcodes)
+        self.n_ngrams = len(self.ngrams)
+
+    def opcode_names(self):
+        return decode_opcodes(self.opcodes)
+
+
+def build_fingerprint(norm_lines, k=3):
+    return Fingerprint(norm_lines, k=k)
+
+
+SCORE_KEYS = ("line_similarity", "opcode_sequence_similarity", "opcode_ngram_jaccard")
+
+
+def line_similarity(fp1, fp2, seq_engine="difflib"):
+    # Satır bazlı benzerlik (varsayılan difflib, pahalı)
+    return get_sequence_engine(seq_engine).ratio(fp1.norm, fp2.norm)
+
+
+def opcode_sequence_similarity(fp1, fp2, seq_engine="difflib"):
+    # Opcode dizisi benzerliği (varsayılan difflib, pahalı)
+    return get_sequence_engine(seq_engine).ratio(fp1.opcodes, fp2.opcodes)
+
+
+class LazyScores(Mapping):
+    """
+    compare_fingerprints(lazy=True) dönüşü.
+
+    Normal dict gibi okunur; opcode_ngram_jaccard hemen hesaplanır,
+    iki SequenceMatcher skoru ise sadece ilk okunduklarında hesaplanıp saklanır.
     """
-    # 1) Satır bazlı benzerlik
-    line_sim = difflib.SequenceMatcher(None, norm1, norm2).ratio()
 
-    # 2) Opcode dizileri
-    ops1 = extract_opcodes(norm1)
-    ops2 = extract_opcodes(norm2)
+    _LAZY = {
+        "line_similarity": line_similarity,
+        "opcode_sequence_similarity": opcode_sequence_similarity,
+    }
+
+    def __init__(self, fp1, fp2, jaccard, seq_engine="difflib"):
+        self._fp1 = fp1
+        self._fp2 = fp2
+        self._seq_engine = seq_engine
+        self._values = {"opcode_ngram_jaccard": jaccard}
+
+    def __getitem__(self, key):
+        if key not in self._values:
+            if key not in self._LAZY:
+                raise KeyError(key)
+            self._values[key] = self._LAZY[key](self._fp1, self._fp2, self._seq_engine)
+        return self._values[key]
 
-    opcode_seq_sim = difflib.SequenceMatcher(None, ops1, ops2).ratio()
+    def __iter__(self):
+        return iter(SCORE_KEYS)
 
-    # 3) Opcode n-gram Jaccard (logic pattern)
-    ngrams1 = make_ngrams(ops1, k=k)
-    ngrams2 = make_ngrams(ops2, k=k)
-    opcode_ngram_jacc = jaccard_similarity(ngrams1, ngrams2)
+    def __len__(self):
+        return len(SCORE_KEYS)
+
+    def is_computed(self, key):
+        return key in self._values
+
+    def __repr__(self):
+        shown = {key: (self._values[key] if key in self._values else "<lazy>") for key in SCORE_KEYS}
+        return f"LazyScores({shown})"
+
+
+def compare_fingerprints(fp1, fp2, lazy=False, seq_engine="difflib"):
+    """
+    İki Fingerprint için farklı benzerlik skorları döner.
+    Opcode/n-gram üretimi tekrar yapılmaz, fingerprint'ten okunur.
+    Threshold için -> opcode_n_gram_jaccard.
+
+    lazy=True ise iki difflib skoru (line / opcode sequence) hesaplanmaz;
+    dönen LazyScores bunları sadece okunduklarında hesaplar.
+
+    seq_engine: line / opcode sequence skorları için dizi benzerliği engine'i
+    ("difflib" eski raporlarla birebir aynı, "lcs" bit-paralel ve hızlı;
+    bkz. seq_similarity).
+    """
+    seq_engine = get_sequence_engine(seq_engine)
+    if fp1.k != fp2.k:
+        raise ValueError(f"Farklı n-gram uzunlukları karşılaştırılamaz: {fp1.k} != {fp2.k}")
+
+    # Opcode n-gram Jaccard (logic pattern)
+    opcode_ngram_jacc = jaccard_similarity(fp1.ngrams, fp2.ngrams)
+
+    if lazy:
+        return LazyScores(fp1, fp2, opcode_ngram_jacc, seq_engine)
 
     return {
-        "line_similarity": line_sim,
-        "opcode_sequence_similarity": opcode_seq_sim,
+        "line_similarity": line_similarity(fp1, fp2, seq_engine),
+        "opcode_sequence_similarity": opcode_sequence_similarity(fp1, fp2, seq_engine),
         "opcode_ngram_jaccard": opcode_ngram_jacc,
     }
+
+
+def compare_normalized(norm1, norm2, k=3, lazy=False, seq_engine="difflib"):
+    """
+    İki normalize edilmiş kod listesi için farklı benzerlik skorları döner.
+    Threshold için -> opcode_n_gram_jaccard.
+
+    Çok sayıda karşılaştırmada build_fingerprint + compare_fingerprints tercih edilmeli.
+    """
+    return compare_fingerprints(
+        build_fingerprint(norm1, k=k), build_fingerprint(norm2, k=k), lazy=lazy, seq_engine=seq_engine
+    )
@@ -0,0 +1,83 @@
+import math
+import time
+from collections import defaultdict
+
+
+# Filtrelerde kayan nokta yuvarlamasına karşı pay: filtreler biraz gevşek tutulur,
+# kesin karar her zaman tam Jaccard ile verilir.
+_EPS = 1e-9
+
+
+def prefix_length(size: int, t: float) -> int:
+    """Jaccard >= t için gereken prefix uzunluğu: |x| - ceil(t * |x|) + 1."""
+    return max(1, min(size, size - math.ceil(t * size) + 1))
+
+
+def prefix_filter_pairs(fingerprints, threshold_percent: float, stats=None):
+    """
+    Boyut sınırı + sıralı prefix filtresi (AllPairs / PPJoin) ile eşik üstü çiftleri üretir.
+    Çıktı: (i, j, sim_percent), (i, j) sırasında; brute-force döngüsüyle birebir aynıdır.
+
+    1) Jaccard(A, B) <= min(|A|,|B|) / max(|A|,|B|): kayıtlar boyuta göre sıralı işlenir,
+       |B| < t * |A| olan çiftlere hiç bakılmaz.
+    2) N-gram'lar tüm korpusta nadirden yaygına sıralanır. Jaccard >= t olan iki
+       kaydın ilk |x| - ceil(t|x|) + 1 n-gram'ı (prefix) mutlaka ortak bir n-gram içerir;
+       prefix'lerinde ortak n-gram olmayan çiftler elenir.
+
+    Eşik <= 0 ise (her çift geçer) filtre anlamsızdır; çağıran tam döngüye düşmelidir.
+    stats verilirse {"candidates": ..., "pruned": ..., "candidate_seconds": ...} yazılır;
+    adaylar doğrulamayla iç içe üretildiğinden candidate_seconds sadece global
+    sıranın kurulma süresidir.
+    """
+    n = len(fingerprints)
+    t = threshold_percent / 100.0 - _EPS
+    if t <= 0:
+        raise ValueError("prefix filtresi sadece pozitif eşikle kullanılabilir")
+
+    # Global sıra: doküman frekansı artan (nadir n-gram önce), eşitlikte n-gram'ın kendisi
+    start = time.perf_counter()
+    df = defaultdict(int)
+    for fp in fingerprints:
+        for gram in fp.ngrams:
+            df[gram] += 1
+    rank = {gram: r for r, gram in enumerate(sorted(df, key=lambda g: (df[g], g)))}
+
+    order = sorted((idx for idx in range(n) if fingerprints[idx].n_ngrams > 0),
+                   key=lambda idx: fingerprints[idx].n_ngrams)
+    order_seconds = time.perf_counter() - start
+
+    index = defaultdict(list)  # n-gram sırası -> prefix'inde onu içeren kayıtlar
+    found = []
+    candidates_seen = 0
+
+    for x in order:
+        fp_x = fingerprints[x]
+        size_x = fp_x.n_ngrams
+        tokens = sorted(rank[gram] for gram in fp_x.ngrams)
+        prefix = tokens[:prefix_length(size_x, t)]
+        min_size = t * size_x
+
+        candidates = set()
+        for token in prefix:
+            postings = index[token]
+            for y in postings:
+                # Boyuta göre artan sırada işlendiği için |y| <= |x|
+                if fingerprints[y].n_ngrams >= min_size:
+                    candidates.add(y)
+            postings.append(x)
+
+        candidates_seen += len(candidates)
+        for y in candidates:
+            fp_y = fingerprints[y]
+            inter = len(fp_x.ngrams & fp_y.ngrams)
+            sim_percent = inter / (size_x + fp_y.n_ngrams - inter) * 100.0
+            if sim_percent >= threshold_percent:
+                found.append((min(x, y), max(x, y), sim_percent))
+
+    if stats is not None:
+        stats["candidates"] = candidates_seen
+        stats["pruned"] = n * (n - 1) // 2 - candidates_seen
+        stats["candidate_seconds"] = order_seconds
+
+    found.sort(key=lambda item: (item[0], item[1]))
+    return found
@@ -0,0 +1,280 @@
+import os
+import time
+from array import array
+
+from asm_processing import MAIN_LOOP_END, MAIN_LOOP_START, match_label, tokenize_asm
+from ngram_index import build_inverted_index, candidate_intersections
+from plagiarism_core import Fingerprint, extract_opcodes_from_tokens, jaccard_similarity
+
+
+REGION_KINDS = ("main", "subroutine", "isr")
+
+# Bundan az opcode'lu bölgeler (tek satırlık yardımcılar, boş ISR'ler) eşleştirilmez;
+# neredeyse her teslimde aynı oldukları için yalancı eşleşme üretirler.
+MIN_REGION_OPCODES = 6
+
+# Bölgeyi kapatan komutlar: RET/RETA -> alt program, RETI -> kesme rutini
+_RETURNS = {"RET": "subroutine", "RETA": "subroutine", "RETI": "isr"}
+
+# Arkasından gelen label'ın yeni bir bölge başlattığı koşulsuz atlamalar
+_UNCONDITIONAL_JUMPS = {"JMP", "BR", "BRA"}
+
+
+class Region:
+    """
+    Bir teslimdeki tek bir kod bölgesi.
+
+    - kind: "main" (dosyanın ana akışı), "subroutine" (RET ile biten) ya da "isr" (RETI ile biten)
+    - name: bölgeyi açan label (main için "main")
+    - file: bölgenin bulunduğu dosyanın adı
+    - norm: normalize satırlar
+    - fp:   Fingerprint
+    """
+
+    __slots__ = ("kind", "name", "file", "norm", "fp")
+
+    def __init__(self, kind, name, file, lines, k=3):
+        token_lines = tokenize_asm('\n'.join(lines))
+        self.kind = kind
+        self.name = name
+        self.file = file
+        self.norm = [' '.join(tokens) for tokens in token_lines]
+        self.fp = Fingerprint(self.norm, k=k, opcodes=extract_opcodes_from_tokens(token_lines))
+
+    def rebuild(self, k):
+        """Fingerprint'i başka bir k ile normalize satırlardan yeniden üretir (dosya okunmaz)."""
+        self.fp = Fingerprint(self.norm, k=k, opcodes=self.fp.opcodes)
+
+    @property
+    def label(self):
+        return f"{self.file}:{self.name}"
+
+    def __repr__(self):
+        return f"Region({self.kind!r}, {self.label!r}, n_opcodes={self.fp.n_opcodes})"
+
+
+def _mnemonic(code: str):
+    # "mov.w #1, R5" -> "MOV"; label'lı satırlarda label'dan sonrası verilmeli
+    parts = code.split(None, 1)
+    if not parts:
+        return None
+    return parts[0].upper().split('.', 1)[0]
+
+
+def segment_lines(lines):
+    """
+    Ham satırları label / dönüş komutlarına göre bölgelere ayırır.
+
+    Açık bölge yokken gelen label yeni bölge açar; RET/RETA alt program,
+    RETI kesme rutini olarak kapatır. Koşulsuz atlamadan (JMP/BR) sonra gelen
+    label, açık bölgeyi ana akışa geri verir (ör. "loop: ... jmp loop") ve
+    yeni bölge açar. Kapanmadan dosya biten bölge de ana akışa sayılır.
+
+    Dönüş: (regions, main_lines)
+        regions    -> [(kind, name, [satırlar]), ...]  dosyadaki sırasıyla
+        main_lines -> hiçbir bölgeye girmeyen satırlar
+    """
+    regions = []
+    main_lines = []
+    current = None  # (name, [satırlar])
+    after_jump = False
+
+    for raw in lines:
+        code = raw.split(';', 1)[0].strip()
+        if not code:
+            continue
+
+        label = match_label(code)
+        if label is not None:
+            name, code = label
+            if current is None:
+                current = (name, [])
+            elif after_jump:
+                main_lines.extend(current[1])
+                current = (name, [])
+
+        if current is None:
+            main_lines.append(raw)
+        else:
+            current[1].append(raw)
+
+        mnemonic = _mnemonic(code)
+        if mnemonic is None:
+            continue
+        after_jump = mnemonic in _UNCONDITIONAL_JUMPS
+        kind = _RETURNS.get(mnemonic)
+        if kind is not None and current is not None:
+            regions.append((kind, current[0], current[1]))
+            current = None
+            after_jump = False
+
+    if current is not None:
+        main_lines.extend(current[1])
+    return regions, main_lines
+
+
+def split_file_regions(text: str):
+    """
+    Bir dosyanın bölgeleri: [(kind, name, [satırlar]), ...]
+
+    Main loop işaretleri olan dosyalarda işaretlerin arası bölgelere ayrılır,
+    kalan kod "main" olur; işaretlerin dışından (şablon kodu) sadece RET/RETI
+    ile kapanan alt programlar / kesme rutinleri alınır. İşaretsiz dosyalarda
+    dosyanın tamamı aynı şekilde bölünür.
+    """
+    lines = text.splitlines()
+    if MAIN_LOOP_START not in text:
+        regions, main_lines = segment_lines(lines)
+        if main_lines:
+            regions.insert(0, ("main", "main", main_lines))
+        return regions
+
+    inside, outside = [], []
+    state = 0  # 0: işaretten önce, 1: main loop içinde, 2: main loop'tan sonra
+    for line in lines:
+        if state == 0 and MAIN_LOOP_START in line:
+            state = 1
+            continue
+        if state == 1 and MAIN_LOOP_END in line:
+            state = 2
+        (inside if state == 1 else outside).append(line)
+
+    regions, main_lines = segment_lines(inside)
+    outside_regions, _ = segment_lines(outside)
+    if main_lines:
+        regions.insert(0, ("main", "main", main_lines))
+    return regions + outside_regions
+
+
+def file_regions(asm_file_paths, texts, k=3):
+    """Okunmuş dosya metinlerinin bölgeleri (Region listesi), dosya sırasıyla."""
+    regions = []
+    for path, text in zip(asm_file_paths, texts):
+        file_name = os.path.basename(path)
+        for kind, name, lines in split_file_regions(text):
+            regions.append(Region(kind, name, file_name, lines, k=k))
+    return regions
+
+
+def build_regions(submission, k=3):
+    """
+    Teslimin bütün dosyalarının bölgeleri (Region listesi); sonuç submission.regions'ta
+    saklanır. Yüklemede üretilmişse (load_all_students(regions=True)) dosyalar
+    tekrar okunmaz; k farklıysa bölge fingerprint'leri normalize satırlardan
+    yeniden üretilir.
+    """
+    regions = submission.regions
+    if regions is None:
+        texts = []
+        for path in submission.paths:
+            with open(path, "rb") as f:
+                texts.append(f.read().decode("utf-8", errors="ignore"))
+        regions = submission.regions = file_regions(submission.paths, texts, k=k)
+
+    for region in regions:
+        if region.fp.k != k:
+            region.rebuild(k)
+    return regions
+
+
+def collect_regions(students: dict, names, k=3, min_opcodes=MIN_REGION_OPCODES):
+    """
+    names sırasıyla öğrencilerin eşleştirilecek bölgeleri.
+    Dönüş: (regions, owners)  owners[r] -> bölgenin öğrencisinin names'teki indeksi
+    """
+    regions = []
+    owners = array("I")
+    for idx, name in enumerate(names):
+        try:
+            student_regions = build_regions(students[name], k=k)
+        except OSError as exc:
+            print(f"[UYARI] '{name}' bölgeleri okunamadı, atlanıyor: {exc}")
+            continue
+        for region in student_regions:
+            if region.fp.n_opcodes >= min_opcodes and region.fp.ngrams:
+                regions.append(region)
+                owners.append(idx)
+    return regions, owners
+
+
+def region_pairs(regions, owners, threshold_percent: float, max_postings=None, stats=None):
+    """
+    Farklı öğrencilere ait, n-gram Jaccard'ı eşiği geçen bölge çiftleri:
+    (r1, r2, sim_percent), (r1, r2) sırasında.
+
+    Bütün bölgeler tek bir inverted index'e girer; sadece n-gram paylaşan bölge
+    çiftlerine dokunulur, iş dosya sayısının karesiyle değil ortak n-gram'lı
+    bölge çiftleriyle büyür. Stop-gram yoksa |A ∩ B| posting'lerden gelir
+    (bkz. ngram_index.index_pairs); varsa adaylar tam kümelerle doğrulanır.
+
+    stats verilirse "regions", "candidates" ve "candidate_seconds" yazılır.
+    """
+    n = len(regions)
+    fingerprints = [region.fp for region in regions]
+    start = time.perf_counter()
+    index, stop_grams = build_inverted_index(fingerprints, max_postings=max_postings)
+    counts = candidate_intersections(index, n)
+    if stats is not None:
+        stats["regions"] = n
+        stats["candidates"] = len(counts)
+        stats["candidate_seconds"] = time.perf_counter() - start
+
+    for key in sorted(counts):
+        r1, r2 = divmod(key, n)
+        if owners[r1] == owners[r2]:
+            continue
+        a = fingerprints[r1].ngrams
+        b = fingerprints[r2].ngrams
+        if stop_grams:
+            sim_percent = jaccard_similarity(a, b) * 100.0
+        else:
+            inter = counts[key]
+            sim_percent = inter / (len(a) + len(b) - inter) * 100.0
+        if sim_percent >= threshold_percent:
+            yield r1, r2, sim_percent
+
+
+def compute_region_similarities(students: dict, threshold_percent: float, k=3, min_opcodes=MIN_REGION_OPCODES,
+                                max_postings=None, stats=None):
+    """
+    Bölgeden bölgeye benzerlikler; bütün teslimler tek dosyaymış gibi
+    karşılaştırıldığında gözden kaçan (ör. ayrı dosyaya taşınmış ya da başka
+    bir kesme rutinine gömülmüş) kopyalar için.
+
+    Dönüş:
+        {
+          ("ogrenci1", "ogrenci2"): [("main.asm:delay", "util.asm:wait", 92.3), ...],
+          ...
+        }
+        Anahtarlar sıralı, her çiftin eşleşmeleri azalan benzerlikte.
+    """
+    names = sorted(students.keys())
+    regions, owners = collect_regions(students, names, k=k, min_opcodes=min_opcodes)
+
+    results = {}
+    for r1, r2, sim_percent in region_pairs(regions, owners, threshold_percent, max_postings=max_postings,
+                                            stats=stats):
+        key = (names[owners[r1]], names[owners[r2]])
+        results.setdefault(key, []).append((regions[r1].label, regions[r2].label, sim_percent))
+
+    for matches in results.values():
+        matches.sort(key=lambda item: (-item[2], item[0], item[1]))
+    return dict(sorted(results.items()))
+
+
+def save_region_results(results: dict, output_path: str, threshold_percent: float):
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(f"Region matches (threshold = {threshold_percent:.1f}%)\n")
+        f.write("=====================================================\n\n")
+
+        if not results:
+            f.write("No regions above the threshold were found.\n")
+            return
+
+        for (a, b), matches in results.items():
+            f.write(f"{a} <-> {b}\n")
+            for label_a, label_b, sim_percent in matches:
+                f.write(f"  {label_a}  ~  {label_b}   ({sim_percent:.1f}%)\n")
+            f.write("\n")
+
+    print(f"Bölge sonuçları kaydedildi: {output_path}")
@@ -0,0 +1,133 @@
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class ProgressReporter:
+    """
+    stderr'e tek satırlık canlı ilerleme yazar: adet, yüzde, hız ve ETA.
+    Çok sık çağrılsa bile en fazla interval saniyede bir yazar.
+    total bilinmiyorsa (None) sadece adet ve hız gösterilir.
+    """
+
+    def __init__(self, label: str, total=None, unit="items", stream=None, interval=0.5):
+        self.label = label
+        self.total = total
+        self.unit = unit
+        self.stream = stream if stream is not None else sys.stderr
+        self.interval = interval
+        self.done = 0
+        self._start = time.perf_counter()
+        self._last_print = 0.0
+        self._printed = False
+
+    def advance(self, n=1):
+        self.update(self.done + n)
+
+    def update(self, done):
+        self.done = done
+        now = time.perf_counter()
+        if now - self._last_print >= self.interval:
+            self._last_print = now
+            self._write(now)
+
+    def finish(self):
+        self._write(time.perf_counter())
+        if self._printed:
+            self.stream.write("\n")
+            self.stream.flush()
+
+    def _write(self, now):
+        elapsed = now - self._start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        text = f"[{self.label}] {self.done}"
+        if self.total:
+            text += f"/{self.total} ({100.0 * self.done / self.total:5.1f}%)"
+        text += f"  {rate:,.0f} {self.unit}/s"
+        if self.total and rate > 0 and self.done < self.total:
+            text += f"  ETA {_format_seconds((self.total - self.done) / rate)}"
+        text += f"  elapsed {_format_seconds(elapsed)}"
+        self.stream.write("\r" + text.ljust(78))
+        self.stream.flush()
+        self._printed = True
+
+
+def _format_seconds(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours:d}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
+class RunMetrics:
+    """
+    Bir çalıştırmanın aşama süreleri ve sayaçları.
+
+        metrics = RunMetrics()
+        with metrics.stage("load"):
+            ...
+        metrics.count("pairs_scored", 1234)
+        metrics.write_json("results/metrics.json")
+
+    track_memory=True ise her aşamanın tracemalloc tepe belleği de kaydedilir.
+    """
+
+    def __init__(self, track_memory=False):
+        self.track_memory = track_memory
+        self.stages = {}
+        self.counters = {}
+        self.info = {}
+        self._started = time.time()
+
+    @contextmanager
+    def stage(self, name: str):
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = {"seconds": round(time.perf_counter() - start, 4)}
+            if self.track_memory:
+                entry["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+            self.stages[name] = entry
+
+    def count(self, name: str, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name: str, value):
+        self.info[name] = value
+
+    def rate(self, counter: str, stage: str):
+        seconds = self.stages.get(stage, {}).get("seconds")
+        if not seconds:
+            return None
+        return self.counters.get(counter, 0) / seconds
+
+    def to_dict(self):
+        return {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self._started)),
+            "stages": self.stages,
+            "counters": self.counters,
+            "info": self.info,
+        }
+
+    def write_json(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+    def summary_lines(self):
+        lines = [f"  {name:<18} {entry['seconds']:>9.3f}s" + (
+            f"  peak {entry['peak_mb']:.1f} MB" if "peak_mb" in entry else ""
+        ) for name, entry in self.stages.items()]
+        for name, value in self.counters.items():
+            lines.append(f"  {name:<18} {value}")
+        for name, value in self.info.items():
+            lines.append(f"  {name:<18} {value}")
+        return lines
@@ -1,6 +1,25 @@
-from student_io import load_all_students, compute_pairwise_similarities, save_results
-from html_report import generate_html_report
+from student_io import (
+    load_all_students, compute_pair_store, save_results, LoadStats, ENGINES, APPROXIMATE_ENGINES, DEFAULT_LOAD_WORKERS
+)
+from pair_store import write_csv, write_jsonl
+from topk import compute_top_k_similarities
+from multi_k import score_named_pairs
+from html_report import generate_html_report, REPORT_MODES, DIFF_SCOPES
+from incremental import incremental_similarities
+from clustering import clusters_from_results
+from corpus_store import CorpusStore, compute_archive_similarities, save_archive_results
+from regions import compute_region_similarities, save_region_results
+from watch_daemon import watch, WATCH_LOG_FILE, DEFAULT_POLL_INTERVAL, DEFAULT_DEBOUNCE
+from run_metrics import RunMetrics, ProgressReporter
+from seq_similarity import SEQUENCE_ENGINES
+import argparse
+import cProfile
 import os
+import pstats
+import sys
+
+# Aşağıdaki değerler komut satırı seçenekleri / CheckConfig için varsayılanlardır.
+# Ör: python run_plagiarism_check.py odev1/submissions -t 75 --engine prefix --workers 4
 
 # Bütün öğrenci klasörlerinin bulunduğu klasör
 # Ör: "C:/projeler/odev1/submissions"
@@ -12,45 +31,553 @@ THRESHOLD_PERCENT = 80.0
 # Opcode n-gram uzunluğu (logic pattern için)
 NGRAM_K = 3
 
-# Sonuçların yazılacağı klasör ve dosyalar
+# Sonuçların yazılacağı klasör ve dosyalar (dosya adları RESULT_DIR'e göre)
 RESULT_DIR = "./results"
-TEXT_RESULT_FILE = os.path.join(RESULT_DIR, "plagiarism_results.txt")
-HTML_RESULT_FILE = os.path.join(RESULT_DIR, "report.html")
+TEXT_RESULT_FILE = "plagiarism_results.txt"
+HTML_RESULT_FILE = "report.html"
+
+# Çift skorlama engine'i (student_io.ENGINES) ve skorlamada kullanılacak süreç sayısı
+# (1 => seri; "exact" dışındaki engine'ler kendi yöntemlerini kullanır)
+ENGINE = "exact"
+WORKERS = 1
+
+# HTML diff tablolarını üreten süreç sayısı (None => WORKERS ile aynı)
+REPORT_WORKERS = None
+
+# Dosya okuma / normalize için thread sayısı
+LOAD_WORKERS = DEFAULT_LOAD_WORKERS
+
+# Opcode dizisi eşiği: None değilse Jaccard eşiğini geçen çiftlerin opcode dizisi
+# benzerliği de (SEQ_ENGINE ile) en az bu yüzde olmalı. Ucuz üst sınırlar önce
+# denenir, çoğu çift için asıl oran hesaplanmaz.
+SEQ_THRESHOLD_PERCENT = None
+
+# Sıra benzerliği (SEQ_THRESHOLD_PERCENT için) hesaplayıcısı: "difflib" (eski
+# SequenceMatcher.ratio ile aynı) ya da "lcs" (bit-paralel LCS, daha hızlı)
+SEQ_ENGINE = "difflib"
+
+# Top-K modu: None değilse eşik yerine her öğrencinin en benzer TOP_K komşusu raporlanır
+# (THRESHOLD_PERCENT o zaman alt sınır olarak kullanılır)
+TOP_K = None
+
+# Ek çift dışa aktarımları (boş => sadece text + HTML). Seçenekler: "csv", "jsonl"
+EXPORT_FORMATS = ()
+
+# Çok-k karşılaştırması: None değilse raporlanan çiftler bu n-gram uzunluklarının
+# hepsi için tek geçişte de skorlanır (bkz. multi_k); k başına ve blend (eşit
+# ağırlıklı ortalama) skorları dışa aktarımlara ek sütun olarak yazılır
+K_VALUES = None
+
+# Normalize cache'i (değişmeyen dosyalar tekrar normalize edilmez; RESULT_DIR'e göre).
+# None => cache yok
+CACHE_DIR = "cache"
+
+# HTML rapor modu: "inline" (tek dosya) ya da "lazy" (diff'ler report_files/ altında,
+# tıklanınca yüklenir; büyük sınıflar / düşük eşik için)
+REPORT_MODE = "inline"
+
+# Raporların düzeni: "cluster" (eşik üstü çiftlerin bağlı bileşenleri; kopya halkaları
+# tek grupta, muhtemel kaynakla) ya da "student" (öğrenci başına liste, eski düzen).
+# Top-K modunda her zaman "student": komşu grafiği neredeyse hep bağlıdır, kümeler anlamsızdır
+GROUP_BY = "cluster"
+GROUP_BY_CHOICES = ("cluster", "student")
+
+# HTML diff kapsamı: "full" (iki listenin tamamı) ya da "spans" (sadece winnowing ile
+# bulunan eşleşen satır aralıkları; kopyalanan yeri gösterir, rapor küçülür)
+DIFF_SCOPE = "full"
+
+# Incremental mod: önceki çalıştırmanın skorları saklanır, sadece eklenen /
+# değişen öğrenciler yeniden karşılaştırılır.
+INCREMENTAL = False
+STATE_FILE = "incremental_state.json"
 
+# Bölge kontrolü: her dosyanın main loop'u, alt programları ve kesme rutinleri ayrı
+# fingerprint'lenir, farklı öğrencilerin bölgeleri birbiriyle karşılaştırılır
+# (ayrı dosyaya / başka rutine taşınmış kopyalar için). False => sadece bütün teslim
+REGION_CHECK = False
+REGION_RESULT_FILE = "region_results.txt"
 
-def main():
-    print(f"Kök klasör: {ROOT_DIR}")
-    print(f"Eşik (threshold): %{THRESHOLD_PERCENT:.1f}")
+# Geçmiş dönem arşivi (bkz. corpus_store). ARCHIVE_DIR verilirse sınıf arşivdeki
+# teslimlerle de karşılaştırılır; ARCHIVE_TERM verilirse kontrolden sonra bu sınıf
+# o dönem adıyla arşive eklenir. None => arşiv kullanılmaz
+ARCHIVE_DIR = None
+ARCHIVE_TERM = None
+ARCHIVE_RESULT_FILE = "archive_results.txt"
+
+# İzleme modu (--watch): ROOT_DIR her POLL_INTERVAL saniyede taranır, DEBOUNCE saniyedir
+# değişmeyen yeni teslimler anında skorlanır; olaylar RESULT_DIR/WATCH_LOG_FILE'a (JSONL)
+POLL_INTERVAL = DEFAULT_POLL_INTERVAL
+DEBOUNCE = DEFAULT_DEBOUNCE
+
+# Aşama süreleri / sayaçlar (ve --profile ile cProfile çıktısı) buraya yazılır
+METRICS_FILE = "metrics.json"
+PROFILE_FILE = "profile.pstats"
+
+EXPORT_CHOICES = ("csv", "jsonl")
+
+
+class CheckConfig:
+    """
+    Bir kontrol çalıştırmasının tüm ayarları. Verilmeyen değerler modül
+    sabitlerinden alınır; göreli dosya adları result_dir altına yazılır.
+
+        config = CheckConfig("odev1/submissions", result_dir="odev1/results", engine="prefix")
+        results, metrics = run_check(config)
+
+    Farklı result_dir'lerle aynı süreçte / aynı anda birden fazla kontrol
+    çalıştırılabilir; modül düzeyinde değişen durum yoktur.
+    """
+
+    def __init__(self, root_dir=None, threshold_percent=None, ngram_k=None, result_dir=None,
+                 engine=None, workers=None, load_workers=None, report_workers=None, seq_engine=None,
+                 seq_threshold_percent=None, top_k=None, k_values=None,
+                 export_formats=None, cache_dir=None, report_mode=None, diff_scope=None, group_by=None,
+                 incremental=None, region_check=None,
+                 archive_dir=None, archive_terms=None, archive_term=None,
+                 profile=False, track_memory=False, show_progress=True):
+        self.root_dir = root_dir if root_dir is not None else ROOT_DIR
+        self.threshold_percent = float(threshold_percent if threshold_percent is not None else THRESHOLD_PERCENT)
+        self.ngram_k = ngram_k if ngram_k is not None else NGRAM_K
+        self.result_dir = result_dir if result_dir is not None else RESULT_DIR
+        self.engine = engine if engine is not None else ENGINE
+        self.workers = workers if workers is not None else WORKERS
+        self.load_workers = load_workers if load_workers is not None else LOAD_WORKERS
+        if report_workers is None:
+            report_workers = REPORT_WORKERS if REPORT_WORKERS is not None else self.workers
+        self.report_workers = report_workers
+        self.seq_engine = seq_engine if seq_engine is not None else SEQ_ENGINE
+        if seq_threshold_percent is None:
+            seq_threshold_percent = SEQ_THRESHOLD_PERCENT
+        self.seq_threshold_percent = None if seq_threshold_percent is None else float(seq_threshold_percent)
+        self.top_k = top_k if top_k is not None else TOP_K
+        if k_values is None:
+            k_values = K_VALUES
+        self.k_values = None if not k_values else tuple(sorted(set(k_values)))
+        self.export_formats = tuple(export_formats if export_formats is not None else EXPORT_FORMATS)
+        # cache_dir: None => CACHE_DIR sabiti (result_dir'e göre), "" => cache yok
+        if cache_dir is None and CACHE_DIR:
+            cache_dir = os.path.join(self.result_dir, CACHE_DIR)
+        self.cache_dir = cache_dir or None
+        self.report_mode = report_mode if report_mode is not None else REPORT_MODE
+        self.diff_scope = diff_scope if diff_scope is not None else DIFF_SCOPE
+        if group_by is None:
+            group_by = "student" if self.top_k else GROUP_BY
+        self.group_by = group_by
+        self.incremental = incremental if incremental is not None else INCREMENTAL
+        self.region_check = region_check if region_check is not None else REGION_CHECK
+        self.archive_dir = archive_dir if archive_dir is not None else ARCHIVE_DIR
+        self.archive_terms = tuple(archive_terms) if archive_terms else ()
+        self.archive_term = archive_term if archive_term is not None else ARCHIVE_TERM
+        self.profile = profile
+        self.track_memory = track_memory
+        self.show_progress = show_progress
+
+    def path(self, file_name: str) -> str:
+        return os.path.join(self.result_dir, file_name)
+
+    def validate(self):
+        """Geçersiz ayar varsa ValueError fırlatır."""
+        if self.engine not in ENGINES:
+            raise ValueError(f"Bilinmeyen engine: {self.engine!r} (seçenekler: {', '.join(ENGINES)})")
+        if self.seq_engine not in SEQUENCE_ENGINES:
+            raise ValueError(f"Bilinmeyen seq_engine: {self.seq_engine!r}")
+        if self.report_mode not in REPORT_MODES:
+            raise ValueError(f"Bilinmeyen rapor modu: {self.report_mode!r}")
+        if self.diff_scope not in DIFF_SCOPES:
+            raise ValueError(f"Bilinmeyen diff kapsamı: {self.diff_scope!r}")
+        if self.group_by not in GROUP_BY_CHOICES:
+            raise ValueError(f"Bilinmeyen rapor düzeni: {self.group_by!r}")
+        for fmt in self.export_formats:
+            if fmt not in EXPORT_CHOICES:
+                raise ValueError(f"Bilinmeyen dışa aktarım biçimi: {fmt!r}")
+        if not 0.0 <= self.threshold_percent <= 100.0:
+            raise ValueError("threshold_percent 0 ile 100 arasında olmalı")
+        if self.ngram_k < 1:
+            raise ValueError("ngram_k en az 1 olmalı")
+        if self.top_k is not None and self.top_k < 1:
+            raise ValueError("top_k en az 1 olmalı")
+        if self.k_values is not None:
+            if min(self.k_values) < 1:
+                raise ValueError("k_values'taki her k en az 1 olmalı")
+            if not self.export_formats:
+                raise ValueError("k_values skorları dışa aktarıma yazılır: export_formats (csv / jsonl) gerekli")
+            if self.top_k or self.incremental:
+                raise ValueError("k_values top_k / incremental ile birlikte kullanılamaz")
+        if self.workers < 1 or self.load_workers < 1 or self.report_workers < 1:
+            raise ValueError("workers, load_workers ve report_workers en az 1 olmalı")
+        if self.incremental and self.top_k:
+            raise ValueError("incremental mod top_k ile birlikte kullanılamaz")
+        if self.top_k and self.group_by == "cluster":
+            raise ValueError("top_k ile group_by='cluster' kullanılamaz (komşu grafiği tek bir dev küme olur)")
+        if self.seq_threshold_percent is not None:
+            if not 0.0 <= self.seq_threshold_percent <= 100.0:
+                raise ValueError("seq_threshold_percent 0 ile 100 arasında olmalı")
+            if self.top_k or self.incremental:
+                raise ValueError("seq_threshold_percent top_k / incremental ile birlikte kullanılamaz")
+        if self.incremental and (self.engine != "exact" or self.workers > 1):
+            raise ValueError("incremental mod sadece exact engine ve workers=1 ile çalışır")
+        if (self.archive_terms or self.archive_term) and not self.archive_dir:
+            raise ValueError("archive_terms / archive_term için archive_dir gerekli")
+
+
+def run_check(config: CheckConfig):
+    """
+    Yükleme, skorlama ve raporlamayı config'e göre çalıştırır; metrics.json'u
+    (profile açıksa profile.pstats'ı da) result_dir'e yazar.
+
+    Dönüş: (results, metrics)
+        results -> PairStore (eşik modu) ya da sözlük (top-K / incremental);
+                   karşılaştırılacak 2 öğrenci yoksa None
+        metrics -> RunMetrics
+    """
+    config.validate()
 
     # results klasörünü oluştur (yoksa)
-    os.makedirs(RESULT_DIR, exist_ok=True)
+    os.makedirs(config.result_dir, exist_ok=True)
 
-    # Öğrencileri yükle
-    students = load_all_students(ROOT_DIR)
-    print(f"Bulunan öğrenci sayısı: {len(students)}")
+    metrics = RunMetrics(track_memory=config.track_memory)
+    if not config.profile:
+        results = _run(config, metrics)
+    else:
+        profiler = cProfile.Profile()
+        results = profiler.runcall(_run, config, metrics)
+        profile_path = config.path(PROFILE_FILE)
+        profiler.dump_stats(profile_path)
+        print(f"Profil kaydedildi: {profile_path}")
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(25)
 
-    if len(students) < 2:
-        print("Karşılaştırma yapmak için en az 2 öğrenci gerekli.")
-        return
+    metrics_path = config.path(METRICS_FILE)
+    metrics.write_json(metrics_path)
+    print("Aşama süreleri:")
+    for line in metrics.summary_lines():
+        print(line)
+    print(f"Metrikler kaydedildi: {metrics_path}")
+    return results, metrics
 
-    # Pairwise benzerlikleri hesapla
-    results = compute_pairwise_similarities(
-        students,
-        threshold_percent=THRESHOLD_PERCENT,
-        k=NGRAM_K,
-    )
+
+def _progress(config, label, total=None, unit="items"):
+    if not config.show_progress:
+        return None
+    return ProgressReporter(label, total=total, unit=unit)
+
+
+def _run(config, metrics):
+    print(f"Kök klasör: {config.root_dir}")
+    print(f"Eşik (threshold): %{config.threshold_percent:.1f}")
+
+    if config.incremental:
+        with metrics.stage("incremental"):
+            students, results, stats = incremental_similarities(
+                config.root_dir,
+                config.path(STATE_FILE),
+                threshold_percent=config.threshold_percent,
+                k=config.ngram_k,
+                cache_dir=config.cache_dir,
+                workers=config.load_workers,
+                regions=config.region_check,
+            )
+        metrics.count("students", len(students))
+        metrics.count("pairs_scored", stats["comparisons"])
+        print(f"Bulunan öğrenci sayısı: {len(students)}")
+        if stats["full_run"]:
+            print("Incremental: önceki durum yok/uyumsuz, tam karşılaştırma yapıldı.")
+        else:
+            print(
+                f"Incremental: {len(stats['added'])} yeni, {len(stats['changed'])} değişen, "
+                f"{len(stats['removed'])} silinen öğrenci; {stats['comparisons']} karşılaştırma."
+            )
+    else:
+        # Öğrencileri yükle
+        load_stats = LoadStats()
+        progress = _progress(config, "load", unit="files")
+        with metrics.stage("load"):
+            students = load_all_students(
+                config.root_dir,
+                k=config.ngram_k,
+                cache_dir=config.cache_dir,
+                workers=config.load_workers,
+                stats=load_stats,
+                progress=progress,
+                regions=config.region_check,
+            )
+        if progress is not None:
+            progress.finish()
+        print(f"Bulunan öğrenci sayısı: {len(students)}")
+        if load_stats.failures:
+            print(f"[UYARI] Okunamayan dosya sayısı: {len(load_stats.failures)}")
+
+        metrics.count("students", len(students))
+        metrics.count("load_failures", len(load_stats.failures))
+        metrics.set("read_seconds", round(load_stats.read_seconds, 4))
+        metrics.set("normalize_seconds", round(load_stats.normalize_seconds, 4))
+        cache_lookups = load_stats.cache_hits + load_stats.cache_misses
+        if cache_lookups:
+            metrics.set("cache_hit_rate", round(load_stats.cache_hits / cache_lookups, 4))
+
+        if len(students) < 2:
+            print("Karşılaştırma yapmak için en az 2 öğrenci gerekli.")
+            return None
+
+        n = len(students)
+        pair_stats = {}
+        if config.top_k:
+            # Her öğrenci için en benzer top_k komşu
+            with metrics.stage("score"):
+                results = compute_top_k_similarities(
+                    students,
+                    config.top_k,
+                    k=config.ngram_k,
+                    min_percent=config.threshold_percent,
+                    stats=pair_stats,
+                )
+            # top_k sıralı çiftleri (i, j ve j, i) ayrı sayar
+            metrics.count("pairs_scored", pair_stats["evaluated"])
+            metrics.count("pairs_pruned", pair_stats["pruned"])
+        else:
+            if config.engine in APPROXIMATE_ENGINES and config.threshold_percent > 0:
+                print(f"[UYARI] '{config.engine}' engine'i yaklaşıktır: eşiği geçen bazı çiftler "
+                      f"raporda olmayabilir, düşük eşiklerde kaçan çift sayısı çok artabilir "
+                      f"(tam sonuç için --engine exact / index / prefix).")
+
+            # Pairwise benzerlikleri hesapla (her çift bir kez, kompakt depoda)
+            progress = _progress(config, "score", total=n * (n - 1) // 2, unit="pairs")
+            with metrics.stage("score"):
+                results = compute_pair_store(
+                    students,
+                    threshold_percent=config.threshold_percent,
+                    k=config.ngram_k,
+                    engine=config.engine,
+                    workers=config.workers,
+                    seq_engine=config.seq_engine,
+                    seq_threshold_percent=config.seq_threshold_percent,
+                    stats=pair_stats,
+                    progress=progress,
+                )
+            if progress is not None:
+                progress.finish()
+            metrics.count("pairs_scored", pair_stats["candidates"])
+            metrics.count("pairs_pruned", pair_stats["pairs_pruned"])
+            metrics.set("candidate_seconds", round(pair_stats["candidate_seconds"], 4))
+            if "seq_rejected" in pair_stats:
+                metrics.count("pairs_seq_rejected", pair_stats["seq_rejected"])
+            metrics.count("pairs_reported", len(results))
+
+            # Raporlanan çiftlerin k başına / blend skorları (dışa aktarımlara ek sütun)
+            multi_k = None
+            if config.k_values:
+                with metrics.stage("multi_k"):
+                    multi_k = score_named_pairs(
+                        students, ((s1, s2) for s1, s2, _ in results.iter_named_pairs()), config.k_values
+                    )
+
+            if "csv" in config.export_formats:
+                write_csv(results, config.path("pairs.csv"), multi_k=multi_k, k_values=config.k_values)
+            if "jsonl" in config.export_formats:
+                write_jsonl(results, config.path("pairs.jsonl"), multi_k=multi_k)
+
+    pairs_per_second = metrics.rate("pairs_scored", "score")
+    if pairs_per_second is not None:
+        metrics.set("pairs_per_second", round(pairs_per_second, 1))
+
+    # Kopya halkaları: eşik üstü çift grafiğinin bağlı bileşenleri
+    clusters = None
+    if config.group_by == "cluster":
+        with metrics.stage("cluster"):
+            clusters = clusters_from_results(results)
+        metrics.count("clusters", len(clusters))
+        metrics.set("largest_cluster", clusters[0].size if clusters else 0)
+        print(f"Küme sayısı: {len(clusters)}")
 
     # 1) Text sonuç raporu
-    save_results(results, TEXT_RESULT_FILE, THRESHOLD_PERCENT)
+    with metrics.stage("text_report"):
+        save_results(results, config.path(TEXT_RESULT_FILE), config.threshold_percent, clusters=clusters)
 
     # 2) HTML raporu
-    generate_html_report(
-        students=students,
-        results=results,
-        output_path=HTML_RESULT_FILE,
-        threshold_percent=THRESHOLD_PERCENT,
-        ngram_k=NGRAM_K,
+    with metrics.stage("html_report"):
+        generate_html_report(
+            students=students,
+            results=results,
+            output_path=config.path(HTML_RESULT_FILE),
+            threshold_percent=config.threshold_percent,
+            ngram_k=config.ngram_k,
+            mode=config.report_mode,
+            workers=config.report_workers,
+            diff_scope=config.diff_scope,
+            clusters=clusters,
+        )
+
+    # 3) Bölgeden bölgeye eşleşmeler
+    if config.region_check:
+        _check_regions(config, metrics, students)
+
+    # 4) Geçmiş dönem arşivi
+    if config.archive_dir:
+        _check_archive(config, metrics, students)
+    return results
+
+
+def _check_regions(config, metrics, students):
+    region_stats = {}
+    with metrics.stage("regions"):
+        region_results = compute_region_similarities(
+            students,
+            config.threshold_percent,
+            k=config.ngram_k,
+            stats=region_stats,
+        )
+    save_region_results(region_results, config.path(REGION_RESULT_FILE), config.threshold_percent)
+    metrics.count("regions", region_stats.get("regions", 0))
+    metrics.count("region_candidates", region_stats.get("candidates", 0))
+    metrics.count("region_matches", sum(len(matches) for matches in region_results.values()))
+
+
+def _check_archive(config, metrics, students):
+    archive_stats = {}
+    with CorpusStore(config.archive_dir) as store:
+        with metrics.stage("archive"):
+            archive_results = compute_archive_similarities(
+                students,
+                store,
+                config.threshold_percent,
+                k=config.ngram_k,
+                terms=config.archive_terms,
+                stats=archive_stats,
+            )
+        save_archive_results(archive_results, config.path(ARCHIVE_RESULT_FILE), config.threshold_percent)
+        metrics.count("archive_entries", archive_stats.get("entries", 0))
+        metrics.count("archive_matches", sum(len(matches) for matches in archive_results.values()))
+
+        if config.archive_term:
+            added = store.add_students(config.archive_term, students, k=config.ngram_k)
+            print(f"Arşive eklenen teslim sayısı: {added} ({config.archive_term})")
+
+
+def run_watch(config: CheckConfig, poll_interval=POLL_INTERVAL, debounce=DEBOUNCE):
+    """
+    Toplu kontrol yerine izleme modu (bkz. watch_daemon): Ctrl+C'ye kadar
+    gelen teslimleri mevcutlarla karşılaştırır. config'ten root_dir,
+    threshold_percent, ngram_k, result_dir, cache_dir ve load_workers kullanılır.
+    """
+    config.validate()
+    os.makedirs(config.result_dir, exist_ok=True)
+    return watch(
+        config.root_dir,
+        config.path(WATCH_LOG_FILE),
+        threshold_percent=config.threshold_percent,
+        k=config.ngram_k,
+        poll_interval=poll_interval,
+        debounce=debounce,
+        cache_dir=config.cache_dir,
+        workers=config.load_workers,
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="MSP430 .asm ödevleri için benzerlik kontrolü")
+    parser.add_argument("root_dir", nargs="?", default=ROOT_DIR,
+                        help=f"öğrenci klasörlerinin bulunduğu klasör (varsayılan: {ROOT_DIR})")
+    parser.add_argument("-t", "--threshold", type=float, default=THRESHOLD_PERCENT,
+                        help=f"yüzde cinsinden eşik (varsayılan: {THRESHOLD_PERCENT})")
+    parser.add_argument("-k", "--ngram-k", type=int, default=NGRAM_K,
+                        help=f"opcode n-gram uzunluğu (varsayılan: {NGRAM_K})")
+    parser.add_argument("-o", "--result-dir", default=RESULT_DIR,
+                        help=f"raporların yazılacağı klasör (varsayılan: {RESULT_DIR})")
+    parser.add_argument("--engine", choices=ENGINES, default=ENGINE,
+                        help=f"çift skorlama engine'i (varsayılan: {ENGINE})")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help=f"skorlama süreç sayısı, exact engine için (varsayılan: {WORKERS})")
+    parser.add_argument("--load-workers", type=int, default=LOAD_WORKERS,
+                        help=f"dosya okuma / normalize thread sayısı (varsayılan: {LOAD_WORKERS})")
+    parser.add_argument("--report-workers", type=int, default=REPORT_WORKERS,
+                        help="HTML diff tablolarını üreten süreç sayısı (varsayılan: --workers ile aynı)")
+    parser.add_argument("--seq-engine", choices=sorted(SEQUENCE_ENGINES), default=SEQ_ENGINE,
+                        help=f"--seq-threshold için sıra benzerliği hesaplayıcısı (varsayılan: {SEQ_ENGINE})")
+    parser.add_argument("--seq-threshold", type=float, default=SEQ_THRESHOLD_PERCENT, metavar="PERCENT",
+                        help="çiftlerin opcode dizisi benzerliği de en az bu yüzde olmalı")
+    parser.add_argument("--top-k", type=int, default=TOP_K,
+                        help="eşik yerine her öğrencinin en benzer K komşusunu raporla")
+    parser.add_argument("--export", action="append", choices=EXPORT_CHOICES, default=None,
+                        help="ek çift dışa aktarımı (birden fazla verilebilir)")
+    parser.add_argument("--k-values", type=int, nargs="+", default=K_VALUES, metavar="K",
+                        help="raporlanan çiftleri bu n-gram uzunluklarıyla da skorla; k başına ve "
+                             "blend skorları --export dosyalarına ek sütun olarak yazılır")
+    parser.add_argument("--cache-dir", default=None,
+                        help="normalize cache klasörü (varsayılan: <result-dir>/cache)")
+    parser.add_argument("--no-cache", action="store_true", help="normalize cache'ini kullanma")
+    parser.add_argument("--report-mode", choices=REPORT_MODES, default=REPORT_MODE,
+                        help=f"HTML rapor modu (varsayılan: {REPORT_MODE})")
+    parser.add_argument("--diff-scope", choices=DIFF_SCOPES, default=DIFF_SCOPE,
+                        help=f"HTML diff kapsamı: tüm liste ya da sadece eşleşen aralıklar (varsayılan: {DIFF_SCOPE})")
+    parser.add_argument("--group-by", choices=GROUP_BY_CHOICES, default=None,
+                        help=f"raporları kopya kümelerine ya da öğrencilere göre düzenle "
+                             f"(varsayılan: {GROUP_BY}; --top-k ile student)")
+    parser.add_argument("--incremental", action="store_true", default=INCREMENTAL,
+                        help="önceki çalıştırmanın skorlarını kullan, sadece değişenleri karşılaştır")
+    parser.add_argument("--regions", dest="region_check", action="store_true", default=REGION_CHECK,
+                        help=f"main loop / alt program / kesme rutinlerini ayrıca bölge bölge karşılaştır "
+                             f"({REGION_RESULT_FILE})")
+    parser.add_argument("--archive", dest="archive_dir", default=ARCHIVE_DIR,
+                        help="geçmiş dönem arşivi klasörü; sınıf arşivle de karşılaştırılır")
+    parser.add_argument("--archive-terms", nargs="+", default=None,
+                        help="arşivde sadece bu dönemlerle karşılaştır")
+    parser.add_argument("--add-to-archive", dest="archive_term", default=ARCHIVE_TERM, metavar="TERM",
+                        help="kontrolden sonra bu sınıfı TERM adıyla arşive ekle")
+    parser.add_argument("--watch", action="store_true",
+                        help=f"toplu kontrol yerine klasörü izle, yeni teslimleri anında skorla ({WATCH_LOG_FILE})")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL,
+                        help=f"izleme modunda tarama aralığı, saniye (varsayılan: {POLL_INTERVAL:g})")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE,
+                        help=f"izleme modunda dosyaların değişmeden beklemesi gereken süre, saniye "
+                             f"(varsayılan: {DEBOUNCE:g})")
+    parser.add_argument("--no-progress", action="store_true", help="stderr'e ilerleme satırı basma")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"cProfile ile çalıştır, {PROFILE_FILE} dosyasına kaydet ve özet bas")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="her aşamanın tepe bellek kullanımını da ölç (yavaşlatır)")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    config = CheckConfig(
+        root_dir=args.root_dir,
+        threshold_percent=args.threshold,
+        ngram_k=args.ngram_k,
+        result_dir=args.result_dir,
+        engine=args.engine,
+        workers=args.workers,
+        load_workers=args.load_workers,
+        report_workers=args.report_workers,
+        seq_engine=args.seq_engine,
+        seq_threshold_percent=args.seq_threshold,
+        top_k=args.top_k,
+        k_values=args.k_values,
+        export_formats=args.export,
+        cache_dir="" if args.no_cache else args.cache_dir,
+        report_mode=args.report_mode,
+        diff_scope=args.diff_scope,
+        group_by=args.group_by,
+        incremental=args.incremental,
+        region_check=args.region_check,
+        archive_dir=args.archive_dir,
+        archive_terms=args.archive_terms,
+        archive_term=args.archive_term,
+        profile=args.profile,
+        track_memory=args.tracemalloc,
+        show_progress=not args.no_progress,
     )
+    try:
+        config.validate()
+        if args.watch and config.threshold_percent <= 0:
+            raise ValueError("izleme modunda eşik 0'dan büyük olmalı")
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.watch:
+        run_watch(config, poll_interval=args.poll_interval, debounce=args.debounce)
+    else:
+        run_check(config)
 
 
 if __name__ == "__main__":
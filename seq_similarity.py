@@ -0,0 +1,136 @@
+import difflib
+from abc import ABC, abstractmethod
+from collections import Counter
+
+
+class SequenceEngine(ABC):
+    """
+    Dizi benzerliği arayüzü (difflib.SequenceMatcher oranlarıyla aynı ölçek: 0..1).
+
+    - ratio(a, b):            asıl benzerlik
+    - quick_ratio(a, b):      ratio için ucuz üst sınır (ortak eleman sayısı)
+    - real_quick_ratio(a, b): daha da ucuz üst sınır (sadece uzunluklar)
+    - ratio_at_least(a, b, floor): üst sınırlar floor'un altındaysa ratio hiç
+      hesaplanmaz, None döner
+
+    Engine'ler durumsuzdur; get_sequence_engine her isim için tek nesne paylaştırır.
+    """
+
+    name = None
+
+    @abstractmethod
+    def ratio(self, a, b):
+        """a ve b dizilerinin 0..1 arası benzerliği."""
+
+    def quick_ratio(self, a, b):
+        total = len(a) + len(b)
+        if not total:
+            return 1.0
+        matches = sum((Counter(a) & Counter(b)).values())
+        return 2.0 * matches / total
+
+    def real_quick_ratio(self, a, b):
+        total = len(a) + len(b)
+        if not total:
+            return 1.0
+        return 2.0 * min(len(a), len(b)) / total
+
+    def ratio_at_least(self, a, b, floor):
+        if self.real_quick_ratio(a, b) < floor or self.quick_ratio(a, b) < floor:
+            return None
+        value = self.ratio(a, b)
+        return value if value >= floor else None
+
+
+class DifflibEngine(SequenceEngine):
+    """Eski raporlarla birebir süreklilik için difflib.SequenceMatcher.ratio()."""
+
+    name = "difflib"
+
+    def ratio(self, a, b):
+        return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+class LcsEngine(SequenceEngine):
+    """
+    Bit-paralel LCS (Allison-Dix / Hyyrö) ile 2 * LCS / (|a| + |b|).
+
+    Her karşılaştırmada iki dizinin satırları / opcode'ları önce küçük tamsayılara
+    çevrilir (intern), a dizisi için her sembolün konum bit maskesi çıkarılır; b'nin her elemanı için
+    tüm a üzerinde tek bir tamsayı toplama/çıkarma ile ilerlenir:
+    O(|a| * |b| / w), w = makine kelimesi.
+
+    Sonuç gerçek (en uzun) ortak alt diziye dayanır; difflib'in en uzun bitişik
+    blokları seçen eşleştirmesinden yüksek çıkabilir, hiçbir zaman düşük çıkmaz.
+    Eski raporlarla karşılaştırma gerekiyorsa "difflib" engine'i kullanılmalı.
+    """
+
+    name = "lcs"
+
+    @staticmethod
+    def encode(seq, ids):
+        """seq elemanlarını ids sözlüğünde (gerekirse ekleyerek) tamsayılara çevirir."""
+        out = []
+        for item in seq:
+            item_id = ids.get(item)
+            if item_id is None:
+                item_id = len(ids)
+                ids[item] = item_id
+            out.append(item_id)
+        return out
+
+    def lcs_length(self, a, b):
+        if not a or not b:
+            return 0
+        if len(a) < len(b):
+            a, b = b, a  # bit vektörü uzun dizi üzerinde
+
+        ids = {}
+        a_ids = self.encode(a, ids)
+        b_ids = self.encode(b, ids)
+
+        masks = {}
+        for pos, item_id in enumerate(a_ids):
+            masks[item_id] = masks.get(item_id, 0) | (1 << pos)
+
+        full = (1 << len(a_ids)) - 1
+        v = full
+        for item_id in b_ids:
+            m = masks.get(item_id)
+            if m is None:
+                continue
+            u = v & m
+            v = ((v + u) | (v - u)) & full
+
+        return len(a_ids) - v.bit_count()
+
+    def ratio(self, a, b):
+        total = len(a) + len(b)
+        if not total:
+            return 1.0
+        return 2.0 * self.lcs_length(a, b) / total
+
+
+SEQUENCE_ENGINES = {
+    DifflibEngine.name: DifflibEngine,
+    LcsEngine.name: LcsEngine,
+}
+
+
+# İsim -> paylaşılan engine nesnesi (engine'ler durumsuz, her çağrıda yenisi kurulmaz)
+_INSTANCES = {}
+
+
+def get_sequence_engine(engine="difflib"):
+    """İsimden (ya da hazır bir SequenceEngine nesnesinden) engine döner."""
+    if isinstance(engine, SequenceEngine):
+        return engine
+    instance = _INSTANCES.get(engine)
+    if instance is None:
+        try:
+            instance = _INSTANCES[engine] = SEQUENCE_ENGINES[engine]()
+        except KeyError:
+            raise ValueError(
+                f"Bilinmeyen dizi benzerliği engine'i: {engine!r} (seçenekler: {', '.join(SEQUENCE_ENGINES)})"
+            ) from None
+    return instance
@@ -1,61 +1,375 @@
 import os
-from asm_processing import extract_main_loop_region, normalize_asm
-from plagiarism_core import compare_normalized
-
-
-def load_all_students(root_dir: str):
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from asm_processing import extract_main_loop_region, has_main_loop_markers, tokenize_asm
+from plagiarism_core import Fingerprint, build_fingerprint, compare_fingerprints, extract_opcodes_from_tokens
+from normalize_cache import NormalizeCache, content_hash
+from ngram_index import index_pairs
+from minhash_engine import minhash_pairs
+from jaccard_matrix import matrix_pairs
+from parallel_scheduler import parallel_pairs
+from prefix_filter import prefix_filter_pairs
+from regions import file_regions
+from winnowing import winnow_pairs
+from pair_store import PairStore, write_text_report
+from clustering import write_cluster_report
+from seq_similarity import get_sequence_engine
+
+
+ENGINES = ("exact", "index", "minhash", "matrix", "prefix", "winnow")
+
+# Aday üretimi eşiği geçen bazı çiftleri kaçırabilen engine'ler
+APPROXIMATE_ENGINES = ("minhash", "winnow")
+
+# Yükleyicinin aynı anda okuyup normalize ettiği dosya sayısı (thread havuzu)
+DEFAULT_LOAD_WORKERS = 8
+
+
+def load_all_students(root_dir: str, k=3, cache_dir=None, workers=DEFAULT_LOAD_WORKERS, stats=None, progress=None,
+                      regions=False):
     """
     root_dir altındaki her klasörü bir öğrenci kabul eder.
-    Her klasördeki ilk .asm dosyasını bulur, okur, normalize eder.
+    Her klasördeki bütün .asm dosyalarını okur, normalize eder ve
+    karşılaştırmalar için fingerprint'ini (opcode + n-gram) bir kere üretir.
+    Birden fazla dosya varsa main loop bölgeleri (işareti olmayan dosyalarda
+    dosyanın tamamı) tek bir program olarak birleştirilir (bkz. build_student_record).
+
+    cache_dir verilirse normalize sonuçları orada bir SQLite cache'inde
+    (dosya SHA-256'sı + normalizer sürümü ile) saklanır; içeriği değişmeyen
+    dosyalar tekrar normalize edilmez.
+
+    Dosyalar iter_students ile workers adet thread'de okunur; stats verilirse
+    (LoadStats) dosya bazlı süreler ve hatalar oraya yazılır. regions=True ise
+    bölge fingerprint'leri de (bkz. regions.build_regions) aynı okumadan üretilir.
 
     Dönüş:
         {
-          "ogrenci_adi": {
-               "path": ".../ogrenci_adi/dosya.asm",
-               "norm": [... normalize satırlar ...]
-          },
+          "ogrenci_adi": Submission(
+               path   = ".../ogrenci_adi/dosya.asm",   (ana dosya)
+               paths  = [... öğrencinin bütün .asm dosyaları ...],
+               sha256 = "... dosya içeriklerinin hash'i ...",
+               norm   = [... normalize satırlar ...],
+               fp     = Fingerprint(...),
+          ),
           ...
         }
     """
     students = {}
+    cache = NormalizeCache(cache_dir) if cache_dir else None
+
+    try:
+        for student_name, record in iter_students(
+            root_dir, k=k, cache=cache, workers=workers, stats=stats, progress=progress, regions=regions
+        ):
+            students[student_name] = record
+    finally:
+        if cache is not None:
+            if stats is not None:
+                stats.cache_hits += cache.hits
+                stats.cache_misses += cache.misses
+            close_cache(cache)
 
-    for entry in os.listdir(root_dir):
-        student_dir = os.path.join(root_dir, entry)
-        if not os.path.isdir(student_dir):
-            continue  # sadece klasörler öğrenci sayılır
+    return students
 
-        student_name = entry  # klasör adı = öğrenci adı
 
-        # Klasördeki ilk .asm dosyasını bul
-        asm_file_path = None
-        for f in os.listdir(student_dir):
-            if f.lower().endswith(".asm"):
-                asm_file_path = os.path.join(student_dir, f)
-                break
+def close_cache(cache):
+    """
+    Eski kayıtları temizleyip cache'i kapatır. Cache başka bir süreç tarafından
+    kilitliyse uyarı verilir; temizlik sonraki çalıştırmaya kalır.
+    """
+    try:
+        cache.evict()
+    except sqlite3.Error as exc:
+        print(f"[UYARI] Normalize cache'i temizlenemedi, sonraki çalıştırmada tekrar denenecek: {exc}")
+    try:
+        cache.close()
+    except sqlite3.Error as exc:
+        print(f"[UYARI] Normalize cache'i kapatılırken son kayıtlar yazılamadı: {exc}")
 
-        if asm_file_path is None:
-            print(f"[UYARI] '{student_name}' klasöründe .asm dosyası bulunamadı, atlanıyor.")
-            continue
 
-        with open(asm_file_path, "r", encoding="utf-8", errors="ignore") as f:
-            asm_text = f.read()
+class Submission:
+    """
+    Tek bir öğrencinin yüklenmiş teslimi.
 
-        main_region = extract_main_loop_region(asm_text)
-        norm = normalize_asm(main_region)
+    - path:    ana .asm dosyasının yolu (main loop işaretlerini içeren ilk dosya)
+    - paths:   öğrencinin bütün .asm dosyaları (sıralı; tek dosyada [path])
+    - sha256:  dosya içeriklerinin hash'i (bkz. submission_hash)
+    - norm:    normalize satırlar (HTML diff ve satır benzerliği için)
+    - fp:      Fingerprint (opcode ID dizisi + paketlenmiş n-gram'lar)
+    - regions: bölge fingerprint'leri; ilk ihtiyaçta regions.build_regions doldurur
 
-        students[student_name] = {
-            "path": asm_file_path,
-            "norm": norm,
-        }
+    __slots__ ile tutulur: büyük sınıflarda her öğrenci için bir dict yerine
+    sabit alanlı küçük bir nesne.
+    """
 
-    return students
+    __slots__ = ("path", "paths", "sha256", "norm", "fp", "regions")
+
+    def __init__(self, path, sha256, norm, fp=None, paths=None):
+        self.path = path
+        self.paths = paths if paths is not None else [path]
+        self.sha256 = sha256
+        self.norm = norm
+        self.fp = fp
+        self.regions = None
 
+    def __repr__(self):
+        return f"Submission({self.path!r}, n_opcodes={self.fp.n_opcodes if self.fp else None})"
 
-def compute_pairwise_similarities(students: dict, threshold_percent: float, k=3):
+
+class LoadStats:
+    """
+    Yükleme istatistikleri.
+
+    - files:    [(ogrenci_adi, yol, saniye), ...]  başarıyla yüklenen öğrenciler
+                (yol: ilk .asm dosyası; süre bütün dosyalarının toplamı)
+    - failures: [(ogrenci_adi, yol, hata mesajı), ...]
+    - read_seconds / normalize_seconds: dosya okuma ve normalize (+ cache) süreleri
+      toplamı (thread'lerde paralel geçtiği için duvar saatinden büyük olabilir)
+    - cache_hits / cache_misses: normalize cache sayaçları
+    """
+
+    def __init__(self):
+        self.files = []
+        self.failures = []
+        self.read_seconds = 0.0
+        self.normalize_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def total_seconds(self):
+        return sum(seconds for _, _, seconds in self.files)
+
+    def slowest(self, n=5):
+        return sorted(self.files, key=lambda item: -item[2])[:n]
+
+
+def iter_students(root_dir: str, k=3, cache=None, workers=DEFAULT_LOAD_WORKERS, stats=None, max_in_flight=None,
+                  progress=None, regions=False):
+    """
+    Öğrencileri (ogrenci_adi, kayıt) olarak, klasör tarama sırasında üreten generator.
+
+    Dosya okuma + normalize işleri thread havuzunda yapılır (ağ paylaşımlarında
+    I/O gecikmesi böylece gizlenir). Aynı anda en fazla max_in_flight iş bekler,
+    ham dosya metni sadece kendi işi süresince bellekte tutulur.
+    Okunamayan dosyalar uyarı basılıp atlanır ve stats.failures'a eklenir.
+    progress verilirse (ör. run_metrics.ProgressReporter) her dosyada advance() çağrılır.
+    """
+    if max_in_flight is None:
+        max_in_flight = max(1, workers) * 4
+
+    def timed_load(paths):
+        start = time.perf_counter()
+        raws = [read_student_file(path) for path in paths]
+        read_done = time.perf_counter()
+        record = build_student_record(paths, raws, k=k, cache=cache, regions=regions)
+        return record, read_done - start, time.perf_counter() - read_done
+
+    def finish(student_name, paths, future):
+        path = paths[0]
+        if progress is not None:
+            progress.advance()
+        try:
+            record, read_seconds, normalize_seconds = future.result()
+        except (OSError, ValueError) as exc:
+            print(f"[UYARI] '{student_name}' dosyası okunamadı, atlanıyor: {exc}")
+            if stats is not None:
+                stats.failures.append((student_name, path, str(exc)))
+            return None
+        if stats is not None:
+            stats.files.append((student_name, path, read_seconds + normalize_seconds))
+            stats.read_seconds += read_seconds
+            stats.normalize_seconds += normalize_seconds
+        return record
+
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for student_name, paths in find_student_files(root_dir):
+            pending.append((student_name, paths, pool.submit(timed_load, paths)))
+
+            # Sırayı koruyarak, bekleyen iş sayısını sınırla
+            while len(pending) >= max_in_flight:
+                name, p, future = pending.popleft()
+                record = finish(name, p, future)
+                if record is not None:
+                    yield name, record
+
+        while pending:
+            name, p, future = pending.popleft()
+            record = finish(name, p, future)
+            if record is not None:
+                yield name, record
+
+
+def find_student_files(root_dir: str, warn=True):
+    """
+    root_dir altındaki öğrenci klasörlerini gezer, her biri için
+    (ogrenci_adi, [.asm dosyalarının yolları]) üretir; yollar ada göre sıralıdır.
+    .asm dosyası olmayan ya da okunamayan (ör. tarama sırasında silinen) klasörler
+    atlanır (warn=True ise uyarı basılır).
+    """
+    with os.scandir(root_dir) as entries:
+        for entry in entries:
+            student_name = entry.name  # klasör adı = öğrenci adı
+            try:
+                if not entry.is_dir():
+                    continue  # sadece klasörler öğrenci sayılır
+                with os.scandir(entry.path) as files:
+                    asm_file_paths = sorted(
+                        f.path for f in files if f.name.lower().endswith(".asm") and f.is_file()
+                    )
+            except OSError as exc:
+                if warn:
+                    print(f"[UYARI] '{student_name}' klasörü okunamadı, atlanıyor: {exc}")
+                continue
+
+            if not asm_file_paths:
+                if warn:
+                    print(f"[UYARI] '{student_name}' klasöründe .asm dosyası bulunamadı, atlanıyor.")
+                continue
+
+            yield student_name, asm_file_paths
+
+
+def load_student_file(asm_file_path: str, k=3, cache=None):
+    """
+    Tek bir .asm dosyasını okur, normalize eder ve fingerprint'ini üretir.
+    Dönüş: Submission
+    """
+    return load_student_files([asm_file_path], k=k, cache=cache)
+
+
+def load_student_files(asm_file_paths, k=3, cache=None):
+    """Bir öğrencinin bütün .asm dosyalarını okuyup tek Submission üretir."""
+    raws = [read_student_file(path) for path in asm_file_paths]
+    return build_student_record(asm_file_paths, raws, k=k, cache=cache)
+
+
+def read_student_file(asm_file_path: str) -> bytes:
+    with open(asm_file_path, "rb") as f:
+        return f.read()
+
+
+def submission_hash(asm_file_paths, raws) -> str:
+    """
+    Teslimin içerik hash'i. Tek dosyada dosya içeriğinin hash'idir (eski cache
+    anahtarlarıyla aynı); birden fazla dosyada dosya adları + içerikleri
+    birlikte hash'lenir, dosyalardan biri değişince / eklenince hash değişir.
+    """
+    if len(raws) == 1:
+        return content_hash(raws[0])
+    parts = []
+    for path, raw in zip(asm_file_paths, raws):
+        parts.extend((os.path.basename(path).encode("utf-8"), b"\0", raw, b"\0"))
+    return content_hash(b"".join(parts))
+
+
+def primary_path(asm_file_paths, texts):
+    """Main loop işaretlerini içeren ilk dosya; hiçbirinde yoksa ilk dosya."""
+    for path, text in zip(asm_file_paths, texts):
+        if has_main_loop_markers(text):
+            return path
+    return asm_file_paths[0]
+
+
+def build_student_record(asm_file_paths, raws, k=3, cache=None, regions=False):
+    """
+    Okunmuş dosya içeriklerinden (cache'e bakarak) Submission kaydını üretir.
+
+    Her dosyanın main loop bölgesi alınır (işaretsiz dosyalarda dosyanın
+    tamamı), bölgeler dosya sırasıyla tek bir program olarak birleştirilir.
+    N-gram'lar her dosya için ayrı üretilip birleştirilir (Fingerprint.breaks);
+    dosya sınırını aşan, dosya sırasına bağlı n-gram oluşmaz.
+    regions=True ise bölgeler de (regions.file_regions) aynı metinlerden üretilir.
+    Tek dosya için str + bytes da verilebilir.
+    """
+    if isinstance(asm_file_paths, str):
+        asm_file_paths, raws = [asm_file_paths], [raws]
+    sha256 = submission_hash(asm_file_paths, raws)
+    texts = [raw.decode("utf-8", errors="ignore") for raw in raws]
+    path = primary_path(asm_file_paths, texts)
+
+    record = load_cached_student(asm_file_paths, sha256, k, cache, path=path)
+    if record is None:
+        token_lines = []
+        opcodes = []
+        breaks = []
+        for text in texts:
+            file_tokens = tokenize_asm(extract_main_loop_region(text))
+            file_opcodes = extract_opcodes_from_tokens(file_tokens)
+            if opcodes and file_opcodes:
+                breaks.append(len(opcodes))
+            token_lines.extend(file_tokens)
+            opcodes.extend(file_opcodes)
+        norm = [' '.join(tokens) for tokens in token_lines]
+        fp = Fingerprint(norm, k=k, opcodes=opcodes, breaks=breaks)
+
+        if cache is not None:
+            try:
+                cache.put(sha256, k, norm, fp.opcodes, fp.ngrams, fp.breaks)
+            except sqlite3.Error as exc:
+                # Kilitli / bozuk cache: kayıt cache'e yazılmadan devam edilir
+                print(f"[UYARI] Normalize cache'ine yazılamadı, cache'siz devam ediliyor: {exc}")
+        record = Submission(path, sha256, norm, fp, paths=list(asm_file_paths))
+
+    if regions:
+        record.regions = file_regions(asm_file_paths, texts, k=k)
+    return record
+
+
+def load_cached_student(asm_file_paths, sha256: str, k=3, cache=None, path=None):
+    """
+    İçerik hash'i bilinen bir teslimi dosyaları okumadan cache'ten yükler.
+    Cache yoksa, kayıt bulunamazsa ya da cache okunamazsa (ör. başka bir süreç
+    kilitli tutuyor) None döner; çağıran dosyadan normalize eder.
+    path (ana dosya) verilmezse ilk dosya kullanılır.
+    """
+    if cache is None:
+        return None
+    if isinstance(asm_file_paths, str):
+        asm_file_paths = [asm_file_paths]
+    try:
+        cached = cache.get(sha256, k)
+    except sqlite3.Error as exc:
+        print(f"[UYARI] Normalize cache'i okunamadı, cache'siz devam ediliyor: {exc}")
+        return None
+    if cached is None:
+        return None
+    norm, opcodes, ngrams, breaks = cached
+    fp = Fingerprint(norm, k=k, opcodes=opcodes, ngrams=ngrams, breaks=breaks)
+    return Submission(path or asm_file_paths[0], sha256, norm, fp, paths=list(asm_file_paths))
+
+
+def get_fingerprints(students: dict, names, k=3):
+    """
+    names sırasıyla öğrencilerin fingerprint listesini döner.
+    Yükleme sırasında üretilmiş fingerprint k uyuşuyorsa tekrar kullanılır,
+    yoksa (ör. farklı k ile çağrıldıysa) opcode dizisi ve dosya sınırlarından
+    bir kere üretilip kaydedilir.
+    """
+    fingerprints = []
+    for name in names:
+        submission = students[name]
+        fp = submission.fp
+        if fp is None:
+            fp = submission.fp = build_fingerprint(submission.norm, k=k)
+        elif fp.k != k:
+            fp = submission.fp = Fingerprint(submission.norm, k=k, opcodes=fp.opcodes, breaks=fp.breaks)
+        fingerprints.append(fp)
+    return fingerprints
+
+
+def compute_pairwise_similarities(students: dict, threshold_percent: float, k=3, lazy=True,
+                                  engine="exact", max_postings=None, minhash_bands=16, minhash_rows=4,
+                                  workers=1, seq_engine="difflib", seq_threshold_percent=None):
     """
     Her öğrenciyi diğer tüm öğrencilerle karşılaştırır.
     Sadece threshold'u geçen benzerlikleri döner.
 
+    Parametreler için bkz. iter_similar_pairs. Büyük sınıflarda simetrik sözlük
+    yerine compute_pair_store tercih edilmeli.
+
     Dönüş:
         {
           "ogrenci1": [("ogrenci2", 85.3), ("ogrenci5", 91.2)],
@@ -63,37 +377,222 @@ def compute_pairwise_similarities(students: dict, threshold_percent: float, k=3)
           ...
         }
     """
-    names = sorted(students.keys())
-    results = {name: [] for name in names}
+    names, pairs = iter_similar_pairs(
+        students, threshold_percent, k=k, lazy=lazy, engine=engine, max_postings=max_postings,
+        minhash_bands=minhash_bands, minhash_rows=minhash_rows, workers=workers, seq_engine=seq_engine,
+        seq_threshold_percent=seq_threshold_percent,
+    )
+    return pairs_to_results(names, pairs)
+
+
+def compute_pair_store(students: dict, threshold_percent: float, k=3, **options):
+    """
+    compute_pairwise_similarities ile aynı çiftleri, her çift bir kez ve tamsayı
+    öğrenci ID'leriyle tutan kompakt bir PairStore olarak döner.
+    options: iter_similar_pairs parametreleri (engine, workers, ...).
+    """
+    names, pairs = iter_similar_pairs(students, threshold_percent, k=k, **options)
+    return PairStore.from_pairs(names, pairs)
 
-    for i in range(len(names)):
-        for j in range(i + 1, len(names)):
-            s1 = names[i]
-            s2 = names[j]
 
-            norm1 = students[s1]["norm"]
-            norm2 = students[s2]["norm"]
+def iter_similar_pairs(students: dict, threshold_percent: float, k=3, lazy=True,
+                       engine="exact", max_postings=None, minhash_bands=16, minhash_rows=4,
+                       workers=1, seq_engine="difflib", seq_threshold_percent=None, stats=None, progress=None):
+    """
+    Eşik üstü çiftleri seçilen engine ile üretir.
+
+    lazy=True (varsayılan): threshold sadece opcode n-gram Jaccard'a bakar,
+    bu yüzden iki difflib skoru hiç hesaplanmaz. lazy=False eski davranıştır
+    (tüm skorlar her çift için hesaplanır). O durumda line / opcode sequence
+    skorları seq_engine ile hesaplanır (bkz. seq_similarity).
+
+    seq_threshold_percent verilirse Jaccard eşiğini geçen çiftler ayrıca opcode
+    dizisi benzerliğinin (seq_engine) bu yüzdeye ulaşmasını da sağlamalıdır
+    (ör. aynı komutları farklı sırada kullanan teslimleri elemek için).
+    Önce ucuz üst sınırlara bakılır (ratio_at_least); sınırı floor'un altında
+    kalan çiftler için asıl oran hiç hesaplanmaz.
+
+    engine:
+        "exact" -> tüm i<j çiftleri tek tek karşılaştırılır
+        "index" -> inverted n-gram index; sadece n-gram paylaşan çiftlere bakılır.
+                   max_postings verilirse çok yaygın n-gram'lar stop-gram olur
+                   (bkz. ngram_index.index_pairs).
+        "minhash" -> MinHash imzaları + bantlı LSH ile aday üretimi, adaylar tam
+                   Jaccard ile doğrulanır. Yaklaşıktır: minhash_bands arttıkça
+                   recall artar, minhash_rows arttıkça aday sayısı azalır.
+        "matrix" -> n-gram'lar tamsayı ID'lere çevrilir, kesişim matrisi bitset
+                   AND + popcount ile toplu hesaplanır (numpy varsa vektörel).
+        "prefix" -> boyut sınırı + sıralı prefix filtresi; eşiğe ulaşamayacak çiftler
+                   küme işlemi yapılmadan elenir, sonuç "exact" ile aynıdır.
+        "winnow" -> winnowing fingerprint'i (bkz. winnowing) paylaşan çiftler aday
+                   olur, adaylar tam Jaccard ile doğrulanır. Yaklaşıktır: hiç uzun
+                   ortak parçası olmayan çiftler kaçabilir; düşük eşiklerde çok
+                   sayıda çift kaçabilir.
+
+    "exact" döngüsü de Jaccard'ın min(|A|,|B|)/max(|A|,|B|) üst sınırı eşiğin
+    altında kalan çiftleri skorlamadan atlar.
+
+    workers > 1 ise "exact" engine çiftleri süreç havuzunda karelere bölerek
+    skorlar (bkz. parallel_scheduler); sonuç ve sıralama seri çalışmayla aynıdır.
+
+    stats (dict) verilirse pairs tüketildikten sonra şu sayaçlar yazılır:
+        pairs_total  -> n * (n - 1) / 2
+        candidates   -> gerçekten skorlanan çift sayısı
+        pairs_pruned -> skorlanmadan elenen çift sayısı
+        candidate_seconds -> aday üretimine harcanan süre (index / minhash / winnow / matrix /
+                             prefix; ayrı aday aşaması olmayan "exact" için 0)
+        seq_rejected -> (seq_threshold_percent ile) dizi benzerliği yüzünden elenen çiftler
+    progress verilirse (ör. run_metrics.ProgressReporter) skorlanan çift
+    sayısıyla güncellenir ("exact" satır satır, diğerleri bitişte).
+
+    Dönüş: (names, pairs)
+        names -> sıralı öğrenci adları
+        pairs -> (i, j, sim_percent) iterable'ı, i < j, (i, j) sırasında
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Bilinmeyen engine: {engine!r} (seçenekler: {', '.join(ENGINES)})")
+
+    names = sorted(students.keys())
+    fingerprints = get_fingerprints(students, names, k=k)
+    engine_stats = {} if stats is None else stats
+    seq_engine = get_sequence_engine(seq_engine)
+    seq_floor = None if seq_threshold_percent is None else seq_threshold_percent / 100.0
+
+    # Eşik 0 ise hiç n-gram paylaşmayan çiftler de (Jaccard = 0) rapora girer,
+    # index/minhash/prefix/winnow bunları üretemeyeceği için tam döngüye düşülür.
+    if engine == "index" and threshold_percent > 0:
+        pairs = index_pairs(fingerprints, threshold_percent, max_postings=max_postings, stats=engine_stats)
+    elif engine == "minhash" and threshold_percent > 0:
+        pairs = minhash_pairs(
+            fingerprints, threshold_percent, bands=minhash_bands, rows=minhash_rows, stats=engine_stats
+        )
+    elif engine == "matrix":
+        pairs = matrix_pairs(fingerprints, threshold_percent, stats=engine_stats)
+    elif engine == "prefix" and threshold_percent > 0:
+        pairs = prefix_filter_pairs(fingerprints, threshold_percent, stats=engine_stats)
+    elif engine == "winnow" and threshold_percent > 0:
+        pairs = winnow_pairs(fingerprints, threshold_percent, stats=engine_stats)
+    elif workers and workers > 1 and len(fingerprints) > 1:
+        pairs = parallel_pairs(fingerprints, threshold_percent, workers=workers, progress=progress)
+    else:
+        pairs = _exact_pairs(
+            fingerprints, threshold_percent, lazy=lazy, seq_engine=seq_engine, seq_floor=seq_floor,
+            stats=engine_stats, progress=progress,
+        )
+        seq_floor = None  # _exact_pairs dizi eşiğini kendi uyguluyor
+
+    if seq_floor is not None:
+        pairs = _sequence_filter(pairs, fingerprints, seq_floor, seq_engine, engine_stats)
+
+    return names, _track_pairs(pairs, len(fingerprints), engine_stats, progress)
+
+
+def _sequence_filter(pairs, fingerprints, seq_floor: float, seq_engine, stats):
+    # Jaccard eşiğini geçmiş çiftlerden opcode dizisi benzerliği floor'un altında kalanları atar
+    rejected = 0
+    for i, j, sim_percent in pairs:
+        if seq_engine.ratio_at_least(fingerprints[i].opcodes, fingerprints[j].opcodes, seq_floor) is None:
+            rejected += 1
+            continue
+        yield i, j, sim_percent
+    stats["seq_rejected"] = rejected
+
+
+def _track_pairs(pairs, n, stats, progress=None):
+    # Engine'in çıktısını olduğu gibi aktarır, bitince sayaçları tamamlar
+    yield from pairs
+    total = n * (n - 1) // 2
+    stats["pairs_total"] = total
+    stats.setdefault("candidates", total)
+    stats.setdefault("candidate_seconds", 0.0)
+    stats["pairs_pruned"] = total - stats["candidates"]
+    if progress is not None:
+        progress.update(total)
+
+
+def _exact_pairs(fingerprints, threshold_percent: float, lazy=True, seq_engine="difflib", seq_floor=None,
+                 stats=None, progress=None):
+    n = len(fingerprints)
+    scored = 0
+    rejected = 0
+    for i in range(n):
+        size_i = fingerprints[i].n_ngrams
+        if progress is not None:
+            progress.update(i * n - i * (i + 1) // 2)
+        for j in range(i + 1, n):
+            # Boyut sınırı: Jaccard <= min/max, eşiğe ulaşamayacak çifti skorlama
+            if threshold_percent > 0 and _size_bound_percent(size_i, fingerprints[j].n_ngrams) < threshold_percent:
+                continue
 
-            scores = compare_normalized(norm1, norm2, k=k)
+            scored += 1
+            scores = compare_fingerprints(fingerprints[i], fingerprints[j], lazy=lazy, seq_engine=seq_engine)
 
             # Logic benzerlik için: opcode n-gram Jaccard
             sim_percent = scores["opcode_ngram_jaccard"] * 100.0
 
             # Eşik üstü ise kaydet
-            if sim_percent >= threshold_percent:
-                results[s1].append((s2, sim_percent))
-                results[s2].append((s1, sim_percent))
+            if sim_percent < threshold_percent:
+                continue
+            if seq_floor is not None:
+                if lazy:
+                    # Üst sınırlar yetmiyorsa asıl oran hesaplanmadan elenir
+                    seq_ok = seq_engine.ratio_at_least(
+                        fingerprints[i].opcodes, fingerprints[j].opcodes, seq_floor
+                    ) is not None
+                else:
+                    seq_ok = scores["opcode_sequence_similarity"] >= seq_floor
+                if not seq_ok:
+                    rejected += 1
+                    continue
+            yield i, j, sim_percent
+
+    if stats is not None:
+        stats["candidates"] = scored
+        if seq_floor is not None:
+            stats["seq_rejected"] = rejected
 
+
+def _size_bound_percent(size_a: int, size_b: int) -> float:
+    if size_a == 0 or size_b == 0:
+        return 0.0
+    return min(size_a, size_b) / max(size_a, size_b) * 100.0
+
+
+def pairs_to_results(names, pairs):
+    """
+    (i, j, sim_percent) çiftlerini (i < j, (i, j) sırasında) öğrenci bazlı
+    sonuç sözlüğüne çevirir. Sıralama tam döngünün ürettiği ile aynıdır.
+    """
+    results = {name: [] for name in names}
+    for i, j, sim_percent in pairs:
+        s1 = names[i]
+        s2 = names[j]
+        results[s1].append((s2, sim_percent))
+        results[s2].append((s1, sim_percent))
     return results
 
 
-def save_results(results: dict, output_path: str, threshold_percent: float):
+def save_results(results, output_path: str, threshold_percent: float, clusters=None):
     """
     Sonuç sözlüğünü tek bir text dosyasına yazar.
 
     - Her çift (A,B) sadece bir kere raporlanır (A→B ve B→A tekrar etmez).
     - Özet bölümünde her öğrencinin KAÇ kişiyle eşik üstü benzerliği olduğu gösterilir.
+
+    results bir PairStore ise rapor sözlük kurulmadan doğrudan depodan yazılır.
+    clusters verilirse (clustering.clusters_from_results) rapor öğrenci yerine
+    kümelere göre düzenlenir: küme özeti, kaynak ve küme içi çiftler.
     """
+    if clusters is not None:
+        if write_cluster_report(clusters, output_path, threshold_percent):
+            print(f"Sonuç dosyası kaydedildi: {output_path}")
+        return
+
+    if isinstance(results, PairStore):
+        if write_text_report(results, output_path, threshold_percent):
+            print(f"Sonuç dosyası kaydedildi: {output_path}")
+        return
+
     # Özet için: her öğrencinin kaç kişiyle benzerliği var?
     match_counts = {student: len(similars) for student, similars in results.items()}
 
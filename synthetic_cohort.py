@@ -0,0 +1,248 @@
+import json
+import os
+import random
+
+
+# Main loop içinde kullanılan, genel amaçlı register'lar (R0-R3 özel amaçlı)
+GENERAL_REGISTERS = [f"R{n}" for n in range(4, 16)]
+
+# Kontrol akışı komutları: bunlar yer değiştirmede sabit kalır
+_CONTROL_FLOW = {"JMP", "JNE", "JNZ", "JEQ", "JZ", "JC", "JNC", "JN", "JGE", "JL", "CALL", "RET", "RETI"}
+
+
+def _delay_loop(rng, reg, label):
+    return [
+        ("ins", "MOV.W", [f"#{rng.choice([5000, 10000, 25000, 50000])}", reg]),
+        ("label", label),
+        ("ins", "DEC.W", [reg]),
+        ("ins", "JNZ", [label]),
+    ]
+
+
+def _toggle_led(rng, reg, label):
+    bit = rng.choice(["BIT0", "BIT6", "BIT0+BIT6"])
+    return [
+        ("ins", "XOR.B", [f"#{bit}", "&P1OUT"]),
+        ("ins", "MOV.B", ["&P1OUT", reg]),
+    ]
+
+
+def _button_poll(rng, reg, label):
+    return [
+        ("label", label),
+        ("ins", "BIT.B", ["#BIT3", "&P1IN"]),
+        ("ins", "JNZ", [label]),
+        ("ins", "INC.W", [reg]),
+    ]
+
+
+def _array_sum(rng, reg, label):
+    other = rng.choice([r for r in GENERAL_REGISTERS if r != reg])
+    count = rng.choice(GENERAL_REGISTERS)
+    return [
+        ("ins", "CLR.W", [reg]),
+        ("ins", "MOV.W", ["#array", other]),
+        ("ins", "MOV.W", [f"#{rng.randint(4, 16)}", count]),
+        ("label", label),
+        ("ins", "ADD.W", [f"@{other}+", reg]),
+        ("ins", "DEC.W", [count]),
+        ("ins", "JNZ", [label]),
+    ]
+
+
+def _arith(rng, reg, label):
+    other = rng.choice([r for r in GENERAL_REGISTERS if r != reg])
+    ops = [
+        ("ins", "MOV.W", [f"#{rng.randint(0, 255)}", reg]),
+        ("ins", "MOV.W", [f"#0x{rng.randint(0, 0xFFFF):04X}", other]),
+    ]
+    for _ in range(rng.randint(2, 6)):
+        mnemonic = rng.choice(["ADD.W", "SUB.W", "AND.W", "XOR.W", "BIS.W", "BIC.W", "RLA.W", "RRA.W"])
+        if mnemonic in ("RLA.W", "RRA.W"):
+            ops.append(("ins", mnemonic, [rng.choice([reg, other])]))
+        else:
+            ops.append(("ins", mnemonic, [rng.choice([reg, other, f"#{rng.randint(1, 15)}"]), rng.choice([reg, other])]))
+    return ops
+
+
+def _compare_branch(rng, reg, label):
+    return [
+        ("ins", "CMP.W", [f"#{rng.randint(1, 100)}", reg]),
+        ("ins", rng.choice(["JEQ", "JNE", "JGE", "JL"]), [label]),
+        ("ins", "INC.W", [reg]),
+        ("label", label),
+    ]
+
+
+def _subroutine_call(rng, reg, label):
+    return [
+        ("ins", "PUSH.W", [reg]),
+        ("ins", "CALL", ["#" + rng.choice(["delay_ms", "read_adc", "update_display"])]),
+        ("ins", "POP.W", [reg]),
+    ]
+
+
+SNIPPETS = [_delay_loop, _toggle_led, _button_poll, _array_sum, _arith, _compare_branch, _subroutine_call]
+
+
+def random_program(rng, min_snippets=4, max_snippets=10):
+    """Şablon parçalardan rastgele bir main loop programı (yapısal liste) üretir."""
+    program = [("label", "main_loop")]
+    for idx in range(rng.randint(min_snippets, max_snippets)):
+        snippet = rng.choice(SNIPPETS)
+        program.extend(snippet(rng, rng.choice(GENERAL_REGISTERS), f"L{idx}_{rng.randint(0, 999)}"))
+    program.append(("ins", "JMP", ["main_loop"]))
+    return program
+
+
+# ───────────────────────────────────────────────
+# Kopya mutasyonları
+# ───────────────────────────────────────────────
+
+def rename_labels(rng, program):
+    labels = {item[1] for item in program if item[0] == "label"}
+    mapping = {name: f"{rng.choice(['loop', 'wait', 'lbl', 'next', 'skip'])}{n}" for n, name in enumerate(sorted(labels))}
+    out = []
+    for item in program:
+        if item[0] == "label":
+            out.append(("label", mapping[item[1]]))
+        else:
+            out.append(("ins", item[1], [mapping.get(op, op) for op in item[2]]))
+    return out
+
+
+def swap_registers(rng, program):
+    shuffled = GENERAL_REGISTERS[:]
+    rng.shuffle(shuffled)
+    mapping = dict(zip(GENERAL_REGISTERS, shuffled))
+
+    def remap(op):
+        for reg in sorted(mapping, key=len, reverse=True):
+            if op == reg or op == f"@{reg}+" or op == f"@{reg}":
+                return op.replace(reg, mapping[reg])
+        return op
+
+    return [item if item[0] == "label" else ("ins", item[1], [remap(op) for op in item[2]]) for item in program]
+
+
+def _touches(item):
+    return {op.strip("@+") for op in item[2]}
+
+
+def reorder_independent(rng, program, swaps=2):
+    """Bağımsız (ortak operandı olmayan, kontrol akışı olmayan) komşu komutların yerini değiştirir."""
+    out = list(program)
+    for _ in range(swaps):
+        spots = [
+            i for i in range(len(out) - 1)
+            if out[i][0] == "ins" and out[i + 1][0] == "ins"
+            and out[i][1].split(".")[0] not in _CONTROL_FLOW
+            and out[i + 1][1].split(".")[0] not in _CONTROL_FLOW
+            and not (_touches(out[i]) & _touches(out[i + 1]))
+        ]
+        if not spots:
+            break
+        i = rng.choice(spots)
+        out[i], out[i + 1] = out[i + 1], out[i]
+    return out
+
+
+def insert_nops(rng, program, count=2):
+    out = list(program)
+    for _ in range(count):
+        out.insert(rng.randint(1, len(out) - 1), ("ins", "NOP", []))
+    return out
+
+
+MUTATIONS = {
+    "rename_labels": rename_labels,
+    "swap_registers": swap_registers,
+    "reorder_independent": reorder_independent,
+    "insert_nops": insert_nops,
+}
+
+
+def mutate(rng, program):
+    """Rastgele bir mutasyon alt kümesi uygular. Dönüş: (program, uygulanan mutasyon adları)."""
+    applied = [name for name in MUTATIONS if rng.random() < 0.6] or [rng.choice(list(MUTATIONS))]
+    for name in applied:
+        program = MUTATIONS[name](rng, program)
+    return program, applied
+
+
+def render_asm(rng, program):
+    """Yapısal programı .asm dosyası metnine çevirir (öğrenciye özgü boşluk / yorum farklarıyla)."""
+    indent = rng.choice(["    ", "\t", "        "])
+    lines = [
+        ";-------------------------------------------------------------------------------",
+        "; MSP430 Assembler Code Template for use with TI Code Composer Studio",
+        ";-------------------------------------------------------------------------------",
+        "            .cdecls C,LIST,\"msp430.h\"",
+        "            .def    RESET",
+        "            .text",
+        "RESET       mov.w   #__STACK_END,SP",
+        "StopWDT     mov.w   #WDTPW|WDTHOLD,&WDTCTL",
+        "",
+        ";-------------------------------------------------------------------------------",
+        "; Main loop here",
+        ";-------------------------------------------------------------------------------",
+    ]
+    for item in program:
+        if item[0] == "label":
+            lines.append(f"{item[1]}:")
+        else:
+            text = f"{indent}{item[1].lower() if rng.random() < 0.5 else item[1]}"
+            if item[2]:
+                text += " " + ", ".join(item[2])
+            if rng.random() < 0.15:
+                text += rng.choice(["   ; loop", "  ; TODO", "   ; update"])
+            lines.append(text)
+    lines += [
+        "",
+        ";-------------------------------------------------------------------------------",
+        "; Stack Pointer definition",
+        ";-------------------------------------------------------------------------------",
+        "            .global __STACK_END",
+        "            .sect   .stack",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def generate_cohort(root_dir: str, size: int, copy_rate: float = 0.2, seed: int = 0):
+    """
+    root_dir altına size öğrencilik sentetik bir sınıf yazar
+    (her öğrenci bir klasör, içinde main.asm).
+
+    copy_rate oranındaki öğrenciler başka bir öğrencinin programını kopyalayıp
+    mutasyona uğratır (label değiştirme, register değiştirme, bağımsız komutların
+    yer değiştirmesi, NOP ekleme).
+
+    Dönüş: kopya çiftlerinin listesi [{"copier", "source", "mutations"}, ...]
+    (root_dir/ground_truth.json'a da yazılır).
+    """
+    rng = random.Random(seed)
+    os.makedirs(root_dir, exist_ok=True)
+
+    programs = {}
+    planted = []
+    width = max(4, len(str(size)))
+    for idx in range(size):
+        name = f"student{idx:0{width}d}"
+        if programs and rng.random() < copy_rate:
+            source = rng.choice(sorted(programs))
+            program, applied = mutate(rng, programs[source])
+            planted.append({"copier": name, "source": source, "mutations": applied})
+        else:
+            program = random_program(rng)
+        programs[name] = program
+
+        student_dir = os.path.join(root_dir, name)
+        os.makedirs(student_dir, exist_ok=True)
+        with open(os.path.join(student_dir, "main.asm"), "w", encoding="utf-8") as f:
+            f.write(render_asm(rng, program))
+
+    with open(os.path.join(root_dir, "ground_truth.json"), "w", encoding="utf-8") as f:
+        json.dump(planted, f, indent=2)
+
+    return planted
@@ -0,0 +1,100 @@
+import heapq
+
+from student_io import get_fingerprints
+
+
+def _size_bound(size_a: int, size_b: int) -> float:
+    # Jaccard üst sınırı: min(|A|, |B|) / max(|A|, |B|)
+    if size_a == 0 or size_b == 0:
+        return 0.0
+    return min(size_a, size_b) / max(size_a, size_b)
+
+
+def top_k_pairs(fingerprints, top_k: int, min_percent: float = 0.0, stats=None):
+    """
+    Her fingerprint için en benzer top_k komşuyu, satır başına sınırlı bir heap ile bulur.
+
+    Fingerprint'ler n-gram kümesi boyutuna göre sıralanır; her satır için bu sıralı
+    dizide kendi konumundan iki yöne doğru, Jaccard üst sınırı (boyut oranı) büyük
+    olan taraftan ilerlenir. Heap doluyken üst sınır heap'teki en küçük skorun
+    altına düştüğünde kalan adaylar hiç karşılaştırılmadan elenir.
+
+    min_percent: bu yüzdenin altındaki (ve her zaman %0'lık) komşular alınmaz.
+    stats verilirse {"evaluated": ..., "pruned": ...} sayaçları yazılır.
+
+    Dönüş: her satır için [(j, sim_percent), ...] listesi (yüksekten düşüğe;
+    eşitlikte küçük indeks önce).
+    """
+    n = len(fingerprints)
+    sizes = [fp.n_ngrams for fp in fingerprints]
+    order = sorted(range(n), key=lambda idx: sizes[idx])
+    position = {idx: pos for pos, idx in enumerate(order)}
+
+    evaluated = 0
+    rows = []
+    for i in range(n):
+        set_i = fingerprints[i].ngrams
+        size_i = sizes[i]
+        heap = []  # (sim, -j): heap[0] en kötü komşu
+
+        left = position[i] - 1
+        right = position[i] + 1
+        while left >= 0 or right < n:
+            left_bound = _size_bound(size_i, sizes[order[left]]) if left >= 0 else -1.0
+            right_bound = _size_bound(size_i, sizes[order[right]]) if right < n else -1.0
+            if left_bound >= right_bound:
+                j, bound = order[left], left_bound
+                left -= 1
+            else:
+                j, bound = order[right], right_bound
+                right += 1
+
+            bound_percent = bound * 100.0
+            if bound_percent <= 0.0 or bound_percent < min_percent:
+                break
+            if len(heap) == top_k and bound < heap[0][0]:
+                break
+
+            evaluated += 1
+            inter = len(set_i & fingerprints[j].ngrams)
+            if inter == 0:
+                continue
+            sim = inter / (size_i + sizes[j] - inter)
+            if sim * 100.0 < min_percent:
+                continue
+
+            item = (sim, -j)
+            if len(heap) < top_k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+        rows.append([(-neg_j, sim * 100.0) for sim, neg_j in sorted(heap, reverse=True)])
+
+    if stats is not None:
+        stats["evaluated"] = evaluated
+        stats["pruned"] = n * (n - 1) - evaluated
+
+    return rows
+
+
+def compute_top_k_similarities(students: dict, top_k: int, k=3, min_percent: float = 0.0, stats=None):
+    """
+    Her öğrenci için en benzer top_k öğrenciyi döner.
+    Sonuç compute_pairwise_similarities ile aynı biçimdedir, bu yüzden
+    save_results ve generate_html_report'a doğrudan verilebilir
+    (ilişki simetrik değildir: A'nın listesinde B olup B'ninkinde A olmayabilir).
+
+    Dönüş:
+        {
+          "ogrenci1": [("ogrenci2", 91.2), ("ogrenci5", 85.3)],   # en fazla top_k
+          ...
+        }
+    """
+    names = sorted(students.keys())
+    fingerprints = get_fingerprints(students, names, k=k)
+    rows = top_k_pairs(fingerprints, top_k, min_percent=min_percent, stats=stats)
+    return {
+        names[i]: [(names[j], sim_percent) for j, sim_percent in row]
+        for i, row in enumerate(rows)
+    }
@@ -0,0 +1,267 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from normalize_cache import NormalizeCache
+from student_io import DEFAULT_LOAD_WORKERS, find_student_files, load_student_files
+
+
+# Klasör bu aralıkla (saniye) taranır
+DEFAULT_POLL_INTERVAL = 2.0
+
+# Bir teslim, imzası (dosya listesi, mtime, boyut) ardışık taramalarda bu kadar
+# saniye aynı kaldıktan sonra işlenir (yükleme sürerken yarım dosya skorlanmasın).
+# mtime'ın yaşına bakılmaz: unzip, cp -p, rsync -t eski mtime'ları korur.
+DEFAULT_DEBOUNCE = 5.0
+
+WATCH_LOG_FILE = "watch_alerts.jsonl"
+
+
+def scan_submissions(root_dir: str):
+    """
+    Öğrenci klasörlerinin anlık görüntüsü.
+    Dönüş: {"ogrenci": ([yollar], imza)}  imza: ((yol, mtime_ns, boyut), ...)
+    Tarama sırasında silinen / taşınan klasör ve dosyalar bu turda atlanır.
+    """
+    snapshot = {}
+    for student, paths in find_student_files(root_dir, warn=False):
+        try:
+            signature = tuple((path, st.st_mtime_ns, st.st_size) for path, st in
+                              ((path, os.stat(path)) for path in paths))
+        except OSError:
+            continue  # tarama sırasında silinen / taşınan dosya; sonraki turda tekrar bakılır
+        snapshot[student] = (paths, signature)
+    return snapshot
+
+
+class SubmissionIndex:
+    """
+    Bellek içi n-gram -> öğrenci inverted index'i.
+
+    Yeni teslim sadece n-gram paylaştığı öğrencilerle skorlanır
+    (|A ∩ B| posting'lerden, Jaccard tam çalıştırmayla aynı). Öğrenci
+    güncellenince / silinince posting'leri de çıkarılır.
+    Tek bir event loop'tan kullanılmak üzere yazılmıştır (kilit yok).
+    """
+
+    def __init__(self):
+        self.submissions = {}
+        self._postings = defaultdict(set)
+
+    def __len__(self):
+        return len(self.submissions)
+
+    def __contains__(self, name):
+        return name in self.submissions
+
+    def score(self, submission, exclude=None):
+        """Dönüş: [(ogrenci, sim_percent), ...] azalan benzerlik; n-gram paylaşmayanlar yok."""
+        ngrams = submission.fp.ngrams
+        counts = defaultdict(int)
+        postings = self._postings
+        for gram in ngrams:
+            for other in postings.get(gram, ()):
+                counts[other] += 1
+
+        scores = []
+        for other, inter in counts.items():
+            if other == exclude:
+                continue
+            union = len(ngrams) + self.submissions[other].fp.n_ngrams - inter
+            scores.append((other, inter / union * 100.0))
+        scores.sort(key=lambda item: (-item[1], item[0]))
+        return scores
+
+    def add(self, name, submission):
+        self.remove(name)
+        self.submissions[name] = submission
+        for gram in submission.fp.ngrams:
+            self._postings[gram].add(name)
+
+    def remove(self, name):
+        old = self.submissions.pop(name, None)
+        if old is None:
+            return
+        for gram in old.fp.ngrams:
+            names = self._postings[gram]
+            names.discard(name)
+            if not names:
+                del self._postings[gram]
+
+
+class WatchDaemon:
+    """
+    Teslim penceresi açıkken root_dir'i izleyip gelen teslimleri anında skorlar.
+
+    Her turda klasör (executor'da) taranır; imzası ilk görüldüğünden beri en az
+    debounce saniye (yani en az bir sonraki taramada da) aynı kalan yeni /
+    değişen öğrenciler executor'da okunup normalize edilir, sonra event loop'ta
+    bellek içi index'e karşı skorlanır. Beklenmeyen tarama hataları loglanır,
+    izleme bir sonraki turda devam eder. Olaylar (JSONL) gerçekleştikleri anda
+    log_path'e eklenir:
+
+        {"time": ..., "event": "indexed", "student": ..., "files": 2, "matches": 1, "seconds": 0.01}
+        {"time": ..., "event": "alert", "student": ..., "other": ..., "similarity": 91.2, "threshold": 80.0}
+        {"time": ..., "event": "removed", "student": ...}
+        {"time": ..., "event": "error", "student": ..., "error": "..."}   (tarama hatasında student yok)
+
+    Başlangıçta klasörde olan teslimler de aynı yoldan indexlenir (aralarındaki
+    eşik üstü çiftler de alarm olarak yazılır). Sadece n-gram paylaşan çiftler
+    skorlandığından threshold_percent 0'dan büyük olmalı.
+    """
+
+    def __init__(self, root_dir: str, log_path: str, threshold_percent: float = 80.0, k=3,
+                 poll_interval=DEFAULT_POLL_INTERVAL, debounce=DEFAULT_DEBOUNCE, cache_dir=None,
+                 workers=DEFAULT_LOAD_WORKERS):
+        if threshold_percent <= 0:
+            raise ValueError("İzleme modunda threshold_percent 0'dan büyük olmalı")
+        self.root_dir = root_dir
+        self.log_path = log_path
+        self.threshold_percent = threshold_percent
+        self.k = k
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.index = SubmissionIndex()
+        self.stats = {"polls": 0, "indexed": 0, "alerts": 0, "removed": 0, "errors": 0}
+
+        self._signatures = {}  # işlenmiş öğrenci -> imza
+        self._pending = {}     # değişmiş öğrenci -> (imza, ilk görüldüğü an)
+        self._log = None
+        self._cache = None
+        self._executor = None
+
+    async def run(self, stop_event=None):
+        """stop_event set edilene (ya da görev iptal edilene) kadar izler."""
+        loop = asyncio.get_running_loop()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, self.workers))
+        self._cache = NormalizeCache(self.cache_dir) if self.cache_dir else None
+        self._log = open(self.log_path, "a", encoding="utf-8")
+        print(f"İzleniyor: {self.root_dir} (her {self.poll_interval:g} sn, debounce {self.debounce:g} sn)")
+        print(f"Olaylar: {self.log_path}")
+        try:
+            while stop_event is None or not stop_event.is_set():
+                try:
+                    await self.poll_once(loop)
+                except Exception as exc:  # ör. kök klasör geçici olarak erişilemez
+                    self.stats["errors"] += 1
+                    print(f"[UYARI] Tarama başarısız, sonraki turda tekrar denenecek: {exc}")
+                    self._emit("error", error=str(exc))
+                if stop_event is None:
+                    await asyncio.sleep(self.poll_interval)
+                else:
+                    try:
+                        await asyncio.wait_for(stop_event.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            self._executor.shutdown(wait=True)
+            if self._cache is not None:
+                self._cache.close()
+            self._log.close()
+
+    async def poll_once(self, loop=None):
+        """Klasörü bir kez tarar, hazır teslimleri işler. Dönüş: işlenen öğrenci sayısı."""
+        loop = loop or asyncio.get_running_loop()
+        snapshot = await loop.run_in_executor(self._executor, scan_submissions, self.root_dir)
+        self.stats["polls"] += 1
+        now = time.time()
+
+        for student in sorted(set(self._signatures) - set(snapshot)):
+            del self._signatures[student]
+            self.index.remove(student)
+            self.stats["removed"] += 1
+            self._emit("removed", student=student)
+        for student in set(self._pending) - set(snapshot):
+            del self._pending[student]
+
+        ready = []
+        for student, (paths, signature) in sorted(snapshot.items()):
+            if self._signatures.get(student) == signature:
+                self._pending.pop(student, None)
+                continue
+            pending = self._pending.get(student)
+            if pending is None or pending[0] != signature:
+                self._pending[student] = pending = (signature, now)
+            if now - pending[1] >= self.debounce:
+                del self._pending[student]
+                ready.append((student, paths, signature))
+
+        jobs = [self._load(loop, student, paths) for student, paths, _ in ready]
+        for (student, paths, signature), outcome in zip(ready, await asyncio.gather(*jobs)):
+            if isinstance(outcome, Exception):
+                # İmza kaydedilmez: öğrenci sonraki taramada yeniden beklemeye alınıp tekrar denenir
+                self.stats["errors"] += 1
+                print(f"[UYARI] '{student}' dosyası okunamadı, sonraki turda tekrar denenecek: {outcome}")
+                self._emit("error", student=student, error=str(outcome))
+            else:
+                self._signatures[student] = signature
+                self._index_submission(student, *outcome)
+
+        if ready and self._cache is not None:
+            # Yazma kilidi turlar arasında tutulmasın (aynı cache'i kullanan toplu çalıştırmalar için)
+            try:
+                await loop.run_in_executor(self._executor, self._cache.commit)
+            except sqlite3.Error as exc:
+                print(f"[UYARI] Normalize cache'i commit edilemedi, sonraki turda tekrar denenecek: {exc}")
+        return len(ready)
+
+    async def _load(self, loop, student, paths):
+        start = time.perf_counter()
+        try:
+            submission = await loop.run_in_executor(
+                self._executor, load_student_files, paths, self.k, self._cache
+            )
+        except (OSError, ValueError, sqlite3.Error) as exc:
+            return exc
+        return submission, time.perf_counter() - start
+
+    def _index_submission(self, student, submission, seconds):
+        previous = self.index.submissions.get(student)
+        if previous is not None and previous.sha256 == submission.sha256:
+            return  # dokunulmuş ama içeriği aynı
+
+        matches = [
+            (other, sim_percent)
+            for other, sim_percent in self.index.score(submission, exclude=student)
+            if sim_percent >= self.threshold_percent
+        ]
+        self.index.add(student, submission)
+        self.stats["indexed"] += 1
+        self._emit("indexed", student=student, files=len(submission.paths), matches=len(matches),
+                   seconds=round(seconds, 4))
+
+        for other, sim_percent in matches:
+            self.stats["alerts"] += 1
+            print(f"[ALARM] '{student}' <-> '{other}'   (%{sim_percent:.1f})")
+            self._emit("alert", student=student, other=other, similarity=round(sim_percent, 2),
+                       threshold=self.threshold_percent)
+
+    def _emit(self, event, **fields):
+        record = {"time": datetime.now().isoformat(timespec="seconds"), "event": event}
+        record.update(fields)
+        self._log.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._log.flush()
+
+
+def watch(root_dir: str, log_path: str, threshold_percent: float = 80.0, k=3, **options):
+    """
+    WatchDaemon'ı Ctrl+C'ye kadar çalıştırır. options: WatchDaemon parametreleri.
+    Dönüş: WatchDaemon (stats için)
+    """
+    daemon = WatchDaemon(root_dir, log_path, threshold_percent=threshold_percent, k=k, **options)
+    try:
+        asyncio.run(daemon.run())
+    except KeyboardInterrupt:
+        pass
+    print(
+        f"İzleme durduruldu: {daemon.stats['indexed']} teslim işlendi, "
+        f"{daemon.stats['alerts']} alarm, {daemon.stats['errors']} hata."
+    )
+    return daemon
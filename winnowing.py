@@ -0,0 +1,251 @@
+import time
+from array import array
+from collections import defaultdict, deque
+
+from ngram_index import candidate_intersections
+from opcode_table import encode_opcodes, split_segments
+from plagiarism_core import jaccard_similarity
+
+
+# Varsayılanlar: k opcode'luk pencere hash'leri, window ardışık hash'ten minimum seçilir.
+# window + k - 1 opcode ve üzeri ortak her parça en az bir ortak fingerprint bırakır
+# (eşleşen bölgeler için 8 opcode). winnow_pairs k'yi n-gram boyundan alır.
+WINNOW_K = 5
+WINNOW_WINDOW = 4
+
+# Bir hash'in dosyada bundan fazla geçtiği konumlar eşleştirmede kullanılmaz
+# (ör. uzun NOP dizileri; eşleşme sayısı patlamasın)
+_MAX_OCCURRENCES = 4
+
+# Eşleşme bölgeleri birleştirilirken izin verilen boşluk / kayma (opcode)
+_MAX_GAP = 3
+
+_MOD = (1 << 61) - 1
+_BASE = 1_000_003
+_MIX = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+
+
+def kgram_hashes(opcode_ids, k=WINNOW_K):
+    """
+    Opcode ID dizisinin ardışık k-gram'ları için rolling hash'ler (pozisyon sırasında).
+    Polinom hash sonradan karıştırılır; winnow'un minimum seçimi opcode
+    sırasına göre yanlı olmasın.
+    """
+    hashes = []
+    if len(opcode_ids) < k:
+        return hashes
+    drop_factor = pow(_BASE, k - 1, _MOD)
+    h = 0
+    for pos, symbol in enumerate(opcode_ids):
+        if pos >= k:
+            h -= opcode_ids[pos - k] * drop_factor
+        h = (h * _BASE + symbol) % _MOD
+        if pos >= k - 1:
+            mixed = (h * _MIX) & _MASK64
+            hashes.append(mixed ^ (mixed >> 29))
+    return hashes
+
+
+def winnow(hashes, window=WINNOW_WINDOW):
+    """
+    Robust winnowing: her window uzunluklu pencerede en küçük hash (eşitlikte
+    en sağdaki) seçilir; art arda aynı konum bir kez kaydedilir.
+    Pencere minimumu monoton kuyrukla bulunur, toplam iş O(n).
+
+    Dönüş: [(hash, pozisyon), ...] pozisyon sırasında
+    """
+    n = len(hashes)
+    if n == 0:
+        return []
+    window = min(window, n)
+
+    selected = []
+    candidates = deque()  # pencerede minimum olabilecek konumlar, hash'e göre artan
+    last = -1
+    for pos, h in enumerate(hashes):
+        while candidates and hashes[candidates[-1]] >= h:
+            candidates.pop()
+        candidates.append(pos)
+        if candidates[0] <= pos - window:
+            candidates.popleft()
+        if pos >= window - 1:
+            best = candidates[0]
+            if best != last:
+                selected.append((hashes[best], best))
+                last = best
+    return selected
+
+
+class WinnowFingerprint:
+    """
+    MOSS tarzı winnowing fingerprint'i.
+
+    - hashes:    seçilen k-gram hash'leri (array('Q'))
+    - positions: her hash'in opcode dizisindeki başlangıç konumu (array('I'))
+    - k, window: hash ve pencere uzunlukları
+
+    window + k - 1 opcode ve üzeri ortak her parça iki tarafta da en az bir
+    ortak hash bırakır; eşleşen bölgeler bu hash'lerin konumlarından bulunur.
+    breaks (Fingerprint.breaks) verilirse her dosya ayrı winnow'lanır, k-gram'lar
+    dosya sınırını aşmaz.
+    """
+
+    __slots__ = ("hashes", "positions", "k", "window")
+
+    def __init__(self, opcode_ids, k=WINNOW_K, window=WINNOW_WINDOW, breaks=()):
+        if not isinstance(opcode_ids, array):
+            opcode_ids = encode_opcodes(opcode_ids)
+        self.hashes = array("Q")
+        self.positions = array("I")
+        offset = 0
+        for segment in split_segments(opcode_ids, breaks):
+            for h, pos in winnow(kgram_hashes(segment, k), window):
+                self.hashes.append(h)
+                self.positions.append(offset + pos)
+            offset += len(segment)
+        self.k = k
+        self.window = window
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def occurrences(self):
+        """{hash: [pozisyon, ...]}"""
+        found = defaultdict(list)
+        for h, pos in zip(self.hashes, self.positions):
+            found[h].append(pos)
+        return found
+
+
+def build_winnow_fingerprints(fingerprints, k=WINNOW_K, window=WINNOW_WINDOW):
+    return [WinnowFingerprint(fp.opcodes, k=k, window=window, breaks=fp.breaks) for fp in fingerprints]
+
+
+def winnow_pairs(fingerprints, threshold_percent: float, k=None, window=WINNOW_WINDOW, stats=None):
+    """
+    En az bir winnowing fingerprint'i paylaşan çiftleri aday alır, adayları
+    tam n-gram Jaccard ile doğrular: (i, j, sim_percent), (i, j) sırasında.
+
+    k verilmezse fingerprint'lerin n-gram boyu kullanılır (daha uzun k, kısa
+    ortak parçalardan oluşan benzerlikleri hiç göremez).
+    Yaklaşıktır: hiç window + k - 1 opcode'luk ortak parçası olmayan (ama
+    n-gram Jaccard'ı eşiği geçen) çiftler aday olamaz. Recall korpusa
+    bağlıdır ve düşük eşiklerde (benzerliğin dağınık kısa parçalardan
+    geldiği çiftlerde) 1'in çok altına inebilir. Tam sonuç gerekiyorsa
+    "prefix" ya da "index" engine'i kullanılmalı.
+    stats verilirse "candidates" ve "candidate_seconds" yazılır.
+    """
+    n = len(fingerprints)
+    if k is None:
+        k = fingerprints[0].k if fingerprints else WINNOW_K
+    start = time.perf_counter()
+    postings = defaultdict(list)
+    for idx, wfp in enumerate(build_winnow_fingerprints(fingerprints, k=k, window=window)):
+        for h in set(wfp.hashes):
+            postings[h].append(idx)
+    counts = candidate_intersections(postings, n)
+    if stats is not None:
+        stats["candidates"] = len(counts)
+        stats["candidate_seconds"] = time.perf_counter() - start
+
+    for key in sorted(counts):
+        i, j = divmod(key, n)
+        sim_percent = jaccard_similarity(fingerprints[i].ngrams, fingerprints[j].ngrams) * 100.0
+        if sim_percent >= threshold_percent:
+            yield i, j, sim_percent
+
+
+def match_regions(wfp_a, wfp_b):
+    """
+    İki fingerprint'in ortak hash'lerinden eşleşen opcode bölgelerini bulur.
+
+    Ortak hash konum çiftleri A konumuna göre sıralanır; A'da ve B'de en fazla
+    _MAX_GAP opcode boşlukla, aynı kayma (pa - pb) civarında devam edenler tek
+    bölgede birleşir. Açık bölgeler güncel kaymalarına göre bir sözlükte
+    tutulur; her eşleşme sadece ±_MAX_GAP kaymadaki açık bölgelere bakar,
+    A'da geride kalan bölgeler kapanıp sözlükten çıkar. Böylece iş bölge
+    sayısıyla değil ortak fingerprint sayısıyla büyür.
+
+    Dönüş: [((a_start, a_stop), (b_start, b_stop)), ...]  opcode konumları, stop hariç
+    """
+    occ_b = wfp_b.occurrences()
+    matches = []
+    for h, positions_a in wfp_a.occurrences().items():
+        positions_b = occ_b.get(h)
+        if not positions_b:
+            continue
+        for pa in positions_a[:_MAX_OCCURRENCES]:
+            for pb in positions_b[:_MAX_OCCURRENCES]:
+                matches.append((pa, pb))
+    matches.sort()
+
+    k = wfp_a.k
+    reach = _MAX_GAP + k
+    regions = []  # [a_start, a_last, b_start, b_last], açılma sırasında
+    open_regions = {}  # kayma (a_last - b_last) -> açık bölgelerin regions indeksleri
+    for pa, pb in matches:
+        offset = pa - pb
+        best = None
+        for key in range(offset - _MAX_GAP, offset + _MAX_GAP + 1):
+            bucket = open_regions.get(key)
+            if bucket is None:
+                continue
+            # matches A'ya göre sıralı: A'da reach'ten geride kalan bölge bir daha uzayamaz
+            bucket[:] = [r for r in bucket if pa - regions[r][1] <= reach]
+            if not bucket:
+                del open_regions[key]
+                continue
+            for r in bucket:
+                # Uyanlardan en son açılanı seçilir
+                if (best is None or r > best) and regions[r][2] <= pb <= regions[r][3] + reach:
+                    best = r
+
+        if best is None:
+            open_regions.setdefault(offset, []).append(len(regions))
+            regions.append([pa, pa, pb, pb])
+            continue
+        region = regions[best]
+        old_key = region[1] - region[3]
+        region[1] = pa
+        region[3] = max(region[3], pb)
+        new_key = region[1] - region[3]
+        if new_key != old_key:
+            bucket = open_regions[old_key]
+            bucket.remove(best)
+            if not bucket:
+                del open_regions[old_key]
+            open_regions.setdefault(new_key, []).append(best)
+
+    return [((a_start, a_last + k), (b_start, b_last + k)) for a_start, a_last, b_start, b_last in regions]
+
+
+def opcode_line_index(norm_lines):
+    """
+    normalize satırlarında her opcode'un satır numarası (extract_opcodes ile
+    aynı satırlar atlanır: boş, #BLOCK_START ve directive'ler).
+    """
+    lines = []
+    for line_no, line in enumerate(norm_lines):
+        line = line.strip()
+        if not line or line.startswith('#BLOCK_START') or line.startswith('.'):
+            continue
+        lines.append(line_no)
+    return lines
+
+
+def match_line_spans(norm_a, norm_b, wfp_a, wfp_b):
+    """
+    Eşleşen bölgeleri normalize satır aralıklarına çevirir.
+    Dönüş: [((a_first, a_last), (b_first, b_last)), ...]  satır indeksleri, ikisi de dahil
+    """
+    lines_a = opcode_line_index(norm_a)
+    lines_b = opcode_line_index(norm_b)
+    spans = []
+    for (a_start, a_stop), (b_start, b_stop) in match_regions(wfp_a, wfp_b):
+        a_stop = min(a_stop, len(lines_a))
+        b_stop = min(b_stop, len(lines_b))
+        if a_start >= a_stop or b_start >= b_stop:
+            continue
+        spans.append(((lines_a[a_start], lines_a[a_stop - 1]), (lines_b[b_start], lines_b[b_stop - 1])))
+    return spans